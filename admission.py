@@ -0,0 +1,124 @@
+import os
+import time
+from contextlib import contextmanager
+from threading import Condition
+
+try:
+    import fcntl
+except ImportError:  # Windows (development)
+    fcntl = None
+
+
+# -----------------------------
+# ADMISSION CONTROL (ANTRIAN MULAI QUIZ)
+# -----------------------------
+class AdmissionGate:
+    """Batasi jumlah request yang berjalan bersamaan.
+
+    Request di atas `limit` menunggu paling lama `max_wait` detik. Jika slot
+    tidak juga kosong, request ditolak agar database tidak kebanjiran.
+    Dengan `lock_dir`, slot berupa `limit` lock file (flock) yang dipakai
+    bersama semua worker di satu host, sehingga batas berlaku lintas proses.
+    Tanpa `lock_dir` batas berlaku per proses.
+    """
+
+    def __init__(self, limit, max_wait, lock_dir=None):
+        self.limit = max(1, limit)
+        self.max_wait = max_wait
+        self.lock_dir = lock_dir if fcntl is not None else None
+        if self.lock_dir:
+            os.makedirs(self.lock_dir, exist_ok=True)
+        self._cond = Condition()
+        self._active = 0
+        self._waiting = 0
+        self._stats = {
+            "admitted": 0,
+            "rejected": 0,
+            "queued": 0,
+            "max_queue_depth": 0,
+            "max_wait_ms": 0.0,
+            "total_wait_ms": 0.0,
+        }
+
+    @contextmanager
+    def slot(self):
+        started = time.perf_counter()
+        deadline = time.monotonic() + self.max_wait
+        lock_file = None
+        admitted = self._acquire(deadline)
+        if admitted and self.lock_dir:
+            lock_file = self._acquire_shared(deadline)
+            if lock_file is None:
+                self._release()
+                admitted = False
+        self._record(admitted, started)
+        try:
+            yield admitted
+        finally:
+            if lock_file is not None:
+                lock_file.close()  # flock dilepas bersama file
+            if admitted:
+                self._release()
+
+    def _acquire(self, deadline):
+        with self._cond:
+            if self._active >= self.limit:
+                self._waiting += 1
+                self._stats["queued"] += 1
+                self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], self._waiting)
+                try:
+                    while self._active >= self.limit:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            return False
+                        self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+            self._active += 1
+            return True
+
+    def _acquire_shared(self, deadline):
+        """Ambil salah satu slot lock file; None bila semua terpakai sampai deadline."""
+        queued = False
+        while True:
+            for i in range(self.limit):
+                lock_file = open(os.path.join(self.lock_dir, "slot-%d.lock" % i), "a")
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    return lock_file
+                except OSError:
+                    lock_file.close()
+            if time.monotonic() >= deadline:
+                return None
+            if not queued:
+                queued = True
+                with self._cond:
+                    self._stats["queued"] += 1
+            time.sleep(0.005)
+
+    def _release(self):
+        with self._cond:
+            self._active -= 1
+            self._cond.notify()
+
+    def _record(self, admitted, started):
+        waited_ms = (time.perf_counter() - started) * 1000
+        with self._cond:
+            if not admitted:
+                self._stats["rejected"] += 1
+                return
+            self._stats["admitted"] += 1
+            self._stats["total_wait_ms"] += waited_ms
+            self._stats["max_wait_ms"] = max(self._stats["max_wait_ms"], round(waited_ms, 3))
+
+    def stats(self):
+        with self._cond:
+            data = dict(self._stats)
+            data["active"] = self._active
+            data["queue_depth"] = self._waiting
+        data["avg_wait_ms"] = round(data["total_wait_ms"] / data["admitted"], 3) if data["admitted"] else 0
+        data["total_wait_ms"] = round(data["total_wait_ms"], 3)
+        data["limit"] = self.limit
+        data["max_wait_s"] = self.max_wait
+        data["shared"] = bool(self.lock_dir)
+        return data
@@ -0,0 +1,229 @@
+import logging
+import os
+import time
+from collections import Counter
+from threading import Condition, Event, Lock, Thread
+
+from sqlalchemy import bindparam
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db
+from models import Submission, Answer
+from write_guard import is_lock_error
+
+logger = logging.getLogger(__name__)
+
+
+# -----------------------------
+# WRITE-BEHIND JAWABAN (GROUP COMMIT)
+# -----------------------------
+class AnswerWriteBuffer:
+    """Antrian insert Answer per worker yang di-flush per batch dalam satu transaksi.
+
+    Antrian hanya terlihat oleh worker (proses) yang menerimanya: worker lain
+    tidak tahu jawaban yang masih tertunda. Dengan lebih dari satu worker,
+    request harus menunggu batch-nya ter-commit (ANSWER_BUFFER_WAIT).
+
+    Batch ditulis setiap `interval_ms` atau saat antrian mencapai `max_rows`.
+    Setiap jawaban mendapat Event yang di-set setelah batch-nya ter-commit,
+    sehingga request bisa menunggu (group commit) atau langsung lanjut.
+    `on_flush(submission_ids)` dipanggil setelah setiap batch ter-commit.
+    Batch yang gagal karena database terkunci dikembalikan ke antrian; error
+    lain ditulis ulang per baris dan baris yang tetap gagal dibuang (`dropped`).
+    """
+
+    def __init__(self, app, interval_ms=50, max_rows=200, on_flush=None):
+        self.app = app
+        self.interval = interval_ms / 1000.0
+        self.max_rows = max_rows
+        self.on_flush = on_flush
+
+        self._cond = Condition()
+        self._flush_lock = Lock()
+        self._rows = []
+        self._pending = Counter()
+        self._pid = None
+        self._thread = None
+
+        self._stats = {
+            "flushes": 0,
+            "rows": 0,
+            "errors": 0,
+            "dropped": 0,
+            "last_batch_size": 0,
+            "max_batch_size": 0,
+            "last_flush_ms": 0.0,
+            "max_flush_ms": 0.0,
+            "total_flush_ms": 0.0,
+        }
+
+    # --- sisi request ---
+    def enqueue(self, submission_id, question_id, choice_id, is_correct):
+        self._ensure_thread()
+        done = Event()
+        with self._cond:
+            self._rows.append((submission_id, question_id, choice_id, bool(is_correct), done))
+            self._pending[submission_id] += 1
+            if len(self._rows) >= self.max_rows:
+                self._cond.notify()
+        return done
+
+    def pending_count(self, submission_id):
+        with self._cond:
+            return self._pending.get(submission_id, 0)
+
+    def pending_questions(self, submission_id):
+        """Id soal yang jawabannya masih di antrian untuk submission ini."""
+        with self._cond:
+            return {row[1] for row in self._rows if row[0] == submission_id}
+
+    def flush_submission(self, submission_id):
+        """Pastikan jawaban tertunda milik submission sudah tertulis. True bila ada yang di-flush.
+
+        Melempar OperationalError bila database terkunci (batch kembali ke antrian).
+        """
+        if not self.pending_count(submission_id):
+            return False
+        self.flush()
+        return True
+
+    def flush(self):
+        with self._flush_lock:
+            with self._cond:
+                batch, self._rows = self._rows, []
+            if batch:
+                self._write(batch)
+
+    def stats(self):
+        with self._cond:
+            data = dict(self._stats)
+            data["pending"] = len(self._rows)
+        data["avg_batch_size"] = round(data["rows"] / data["flushes"], 2) if data["flushes"] else 0
+        data["avg_flush_ms"] = round(data["total_flush_ms"] / data["flushes"], 3) if data["flushes"] else 0
+        data["total_flush_ms"] = round(data["total_flush_ms"], 3)
+        data["interval_ms"] = self.interval * 1000
+        data["max_rows"] = self.max_rows
+        return data
+
+    # --- sisi flusher ---
+    def _ensure_thread(self):
+        # Thread tidak ikut ter-fork oleh gunicorn, jadi dibuat ulang per proses
+        if self._pid == os.getpid() and self._thread is not None:
+            return
+        with self._cond:
+            if self._pid == os.getpid() and self._thread is not None:
+                return
+            self._pid = os.getpid()
+            self._rows = []
+            self._pending = Counter()
+            self._thread = Thread(target=self._run, name="answer-buffer", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait(self.interval)
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Flush answer buffer gagal")
+
+    def _write(self, batch):
+        started = time.perf_counter()
+        try:
+            self._insert(batch)
+        except Exception as e:
+            if is_lock_error(e):
+                # Database sementara terkunci: kembalikan ke depan antrian
+                self._requeue(batch)
+                raise
+            logger.warning("Batch %d jawaban gagal ditulis (%s); dicoba per baris", len(batch), e)
+            with self._cond:
+                self._stats["errors"] += 1
+        else:
+            self._done(batch, [], started)
+            return
+
+        # Error permanen (mis. soal sudah dihapus): tulis per baris, buang yang gagal
+        written, dropped = [], []
+        for i, row in enumerate(batch):
+            try:
+                self._insert([row])
+            except Exception as e:
+                if is_lock_error(e):
+                    self._requeue(batch[i:])
+                    self._done(written, dropped, started)
+                    raise
+                if isinstance(e, IntegrityError) and self._already_answered(row):
+                    # Soal ini sudah dijawab (kirim ganda): bukan kehilangan data
+                    logger.info("Jawaban ganda submission %s soal %s diabaikan", row[0], row[1])
+                else:
+                    logger.error("Jawaban submission %s soal %s dibuang: %s", row[0], row[1], e)
+                dropped.append(row)
+            else:
+                written.append(row)
+        self._done(written, dropped, started)
+
+    def _insert(self, rows):
+        per_submission = {}
+        for sid, _qid, _cid, correct, _done in rows:
+            n, c = per_submission.get(sid, (0, 0))
+            per_submission[sid] = (n + 1, c + int(correct))
+
+        sub = Submission.__table__
+        with self.app.app_context():
+            with db.engine.begin() as conn:
+                conn.execute(Answer.__table__.insert(), [
+                    {"submission_id": sid, "question_id": qid, "choice_id": cid}
+                    for sid, qid, cid, _correct, _done in rows
+                ])
+                conn.execute(
+                    sub.update()
+                    .where(sub.c.id == bindparam("sid"))
+                    .values(
+                        answered_count=sub.c.answered_count + bindparam("n"),
+                        correct_count=sub.c.correct_count + bindparam("c"),
+                    ),
+                    [{"sid": sid, "n": n, "c": c} for sid, (n, c) in per_submission.items()]
+                )
+
+    def _already_answered(self, row):
+        with self.app.app_context():
+            with db.engine.connect() as conn:
+                return conn.execute(
+                    Answer.__table__.select()
+                    .where(Answer.submission_id == row[0], Answer.question_id == row[1])
+                ).first() is not None
+
+    def _requeue(self, rows):
+        with self._cond:
+            self._rows[:0] = rows
+            self._stats["errors"] += 1
+
+    def _done(self, written, dropped, started):
+        """Catat baris yang selesai (tertulis atau dibuang) dan bangunkan penunggunya."""
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._cond:
+            for row in written + dropped:
+                self._pending[row[0]] -= 1
+                if self._pending[row[0]] <= 0:
+                    del self._pending[row[0]]
+            s = self._stats
+            s["dropped"] += len(dropped)
+            if written:
+                s["flushes"] += 1
+                s["rows"] += len(written)
+                s["last_batch_size"] = len(written)
+                s["max_batch_size"] = max(s["max_batch_size"], len(written))
+                s["last_flush_ms"] = round(elapsed_ms, 3)
+                s["max_flush_ms"] = max(s["max_flush_ms"], round(elapsed_ms, 3))
+                s["total_flush_ms"] += elapsed_ms
+
+        for row in written + dropped:
+            row[4].set()
+
+        if written and self.on_flush:
+            try:
+                self.on_flush(list({row[0] for row in written}))
+            except Exception:
+                logger.exception("Callback on_flush gagal")
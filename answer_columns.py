@@ -0,0 +1,155 @@
+import json
+import os
+import shutil
+import uuid
+from datetime import datetime
+
+import numpy as np
+from sqlalchemy import select
+
+from extensions import db
+from models import Answer, Choice, Quiz, Submission
+
+
+# -----------------------------
+# EKSPOR KOLOM JAWABAN (NUMPY .npy PER KOLOM)
+# -----------------------------
+# Satu folder per scope; setiap append menulis satu "part" berisi satu file
+# .npy per kolom. manifest.json adalah sumber kebenaran daftar part.
+COLUMNS = {
+    "answer_id": "int64",
+    "submission_id": "int32",
+    "user_id": "int32",
+    "question_id": "int32",
+    "choice_id": "int32",          # -1 bila kosong
+    "correct": "bool",
+    "finished_at": "datetime64[s]",
+}
+MANIFEST = "manifest.json"
+
+
+def _read_manifest(path):
+    try:
+        with open(os.path.join(path, MANIFEST)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _write_manifest(path, manifest):
+    tmp = os.path.join(path, "%s.%s.tmp" % (MANIFEST, uuid.uuid4().hex))
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, os.path.join(path, MANIFEST))
+
+
+def load_columns(path, mmap=True):
+    """Muat semua kolom sebagai array NumPy.
+
+    Dengan satu part, array di-memory-map langsung dari disk (tanpa parsing);
+    dengan beberapa part, hasilnya digabung.
+    """
+    manifest = _read_manifest(path)
+    if manifest is None:
+        raise FileNotFoundError(os.path.join(path, MANIFEST))
+
+    columns = {}
+    for name, dtype in manifest["columns"].items():
+        parts = [
+            np.load(os.path.join(path, part["name"], name + ".npy"), mmap_mode="r" if mmap else None)
+            for part in manifest["parts"]
+        ]
+        if not parts:
+            columns[name] = np.empty(0, dtype=dtype)
+        elif len(parts) == 1:
+            columns[name] = parts[0]
+        else:
+            columns[name] = np.concatenate(parts)
+    return columns
+
+
+def _scope_filter(scope, scope_id):
+    if scope == "quiz":
+        return Submission.quiz_id == scope_id
+    if scope == "category":
+        return Submission.quiz_id.in_(select(Quiz.id).where(Quiz.category_id == scope_id))
+    raise ValueError("scope harus 'quiz' atau 'category'")
+
+
+def _exported_submissions(path, manifest):
+    if not manifest or not manifest["parts"]:
+        return np.empty(0, dtype=np.int32)
+    return np.unique(load_columns(path)["submission_id"])
+
+
+def export_answers(path, scope, scope_id, full=False, chunk_rows=10000, id_batch=500):
+    """Tulis jawaban submission selesai yang belum diekspor sebagai part baru.
+
+    `full=True` menghapus ekspor lama dan mengekspor ulang semuanya.
+    Mengembalikan jumlah baris yang ditambahkan.
+    """
+    if full and os.path.isdir(path):
+        shutil.rmtree(path)
+    os.makedirs(path, exist_ok=True)
+
+    manifest = _read_manifest(path)
+    if manifest is None:
+        manifest = {"scope": scope, "scope_id": scope_id, "columns": COLUMNS, "parts": [], "rows": 0}
+    elif (manifest["scope"], manifest["scope_id"]) != (scope, scope_id):
+        raise ValueError("Folder %s berisi ekspor scope lain" % path)
+
+    # Submission baru = selesai di database tetapi belum ada di kolom submission_id.
+    # Selisih himpunan, jadi submission yang selesai terlambat (sweeper) tetap ikut.
+    finished = np.fromiter(db.session.execute(
+        select(Submission.id)
+        .where(_scope_filter(scope, scope_id), Submission.finished_at.isnot(None))
+    ).scalars(), dtype=np.int64)
+    new_ids = np.setdiff1d(finished, _exported_submissions(path, manifest))
+    if not len(new_ids):
+        return 0
+
+    chunks = {name: [] for name in COLUMNS}
+    for start in range(0, len(new_ids), id_batch):
+        batch = [int(i) for i in new_ids[start:start + id_batch]]
+        result = db.session.execute(
+            select(
+                Answer.id, Answer.submission_id, Submission.user_id,
+                Answer.question_id, Answer.choice_id, Choice.is_correct,
+                Submission.finished_at,
+            )
+            .join(Submission, Submission.id == Answer.submission_id)
+            .outerjoin(Choice, Choice.id == Answer.choice_id)
+            .where(Answer.submission_id.in_(batch))
+            .order_by(Answer.id)
+            .execution_options(yield_per=chunk_rows)
+        )
+        for rows in result.partitions():
+            cols = list(zip(*rows))
+            chunks["answer_id"].append(np.array(cols[0], dtype=np.int64))
+            chunks["submission_id"].append(np.array(cols[1], dtype=np.int32))
+            chunks["user_id"].append(np.array([u or -1 for u in cols[2]], dtype=np.int32))
+            chunks["question_id"].append(np.array([q or -1 for q in cols[3]], dtype=np.int32))
+            chunks["choice_id"].append(np.array([c or -1 for c in cols[4]], dtype=np.int32))
+            chunks["correct"].append(np.array([bool(c) for c in cols[5]], dtype=bool))
+            chunks["finished_at"].append(np.array(cols[6], dtype="datetime64[s]"))
+
+    n_rows = sum(len(c) for c in chunks["answer_id"])
+    if not n_rows:
+        return 0
+    part_name = "part-%05d" % len(manifest["parts"])
+    tmp_dir = os.path.join(path, part_name + ".tmp")
+    os.makedirs(tmp_dir, exist_ok=True)
+    for name, dtype in COLUMNS.items():
+        data = np.concatenate(chunks[name]) if chunks[name] else np.empty(0, dtype=dtype)
+        np.save(os.path.join(tmp_dir, name + ".npy"), data.astype(dtype, copy=False))
+    os.replace(tmp_dir, os.path.join(path, part_name))
+
+    manifest["parts"].append({
+        "name": part_name,
+        "rows": n_rows,
+        "submissions": int(len(new_ids)),
+        "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+    })
+    manifest["rows"] += n_rows
+    _write_manifest(path, manifest)
+    return n_rows
@@ -1,11 +1,13 @@
 import os
 import csv
+import click
+import logging
 import secrets
 from datetime import datetime
-from random import shuffle
 from flask import (
     Flask, render_template, redirect, url_for, flash,
-    request, send_from_directory
+    request, send_from_directory, abort, jsonify, make_response,
+    stream_with_context
 )
 from flask_login import (
     LoginManager, login_user, current_user,
@@ -19,20 +21,38 @@ from config import Config
 from extensions import db
 from models import (
     User, Role, Material, Category,
-    Quiz, Question, Choice, Submission, Answer
+    Quiz, Question, Choice, Submission, Answer, WeeklyScoreRollup
 )
+from quiz_cache import (
+    get_snapshot, bump_quiz_version, invalidate as invalidate_snapshot,
+    question_order, choice_order, warm_published
+)
+from scoring import record_answer, record_answers_bulk, finish_submission, answered_question_ids
+from answer_buffer import AnswerWriteBuffer
+from admission import AdmissionGate
+from quiz_codes import QuizCodeIndex
+from version_stamp import VersionStamp
+from deadline_sweeper import DeadlineSweeper, compute_deadline, is_expired, sweep_expired
+import rollup
+from item_analysis import get_item_analysis, invalidate as invalidate_item_analysis
+from leaderboard import LeaderboardService
+from quiz_ranking import ranked_page, my_rank, encode_cursor, decode_cursor
+from progress import student_progress, class_matrix
+import answer_columns
+from counters import detach_answers, recount_questions, repair_counters
+from progress_feed import ProgressFeed
+import sqlite_profile
+from write_guard import WriteCoordinator, WriteBusy, is_lock_error
+from read_routing import ReadRouter
+from reports import ReportService, ReportFailed, quiz_result_payload, student_progress_payload, class_progress_payloads
 from sqlalchemy import func, case, desc, cast, Float
 from sqlalchemy import Integer
+from sqlalchemy.exc import IntegrityError, OperationalError
 from flask import session
 from io import StringIO
 from flask import session, Response
 
 from flask import send_file
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib import colors
-from io import BytesIO
 
 
 
@@ -46,10 +66,31 @@ def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
 
+    # --- Profil engine database (pool per worker, pragma SQLite) ---
+    app.config.setdefault("SQLALCHEMY_ENGINE_OPTIONS", sqlite_profile.engine_options(
+        app.config["SQLALCHEMY_DATABASE_URI"],
+        pool_size=app.config["DB_POOL_SIZE"],
+        max_overflow=app.config["DB_MAX_OVERFLOW"],
+        pool_timeout=app.config["DB_POOL_TIMEOUT"],
+        pool_recycle=app.config["DB_POOL_RECYCLE"],
+        busy_timeout_ms=app.config["SQLITE_BUSY_TIMEOUT_MS"]
+    ))
+
     # --- Inisialisasi Database & Login ---
     db.init_app(app)
     Migrate(app, db)
 
+    sqlite_pragmas = {}
+    if app.config.get("SQLITE_PROFILE"):
+        sqlite_pragmas = sqlite_profile.pragmas_from_config(app.config)
+        with app.app_context():
+            if sqlite_profile.install(db.engine, sqlite_pragmas):
+                # Cek sekali saat start: pragma yang berlaku dicatat di log
+                try:
+                    sqlite_pragmas = sqlite_profile.check(db.engine, sqlite_pragmas)
+                except Exception:
+                    logging.getLogger(__name__).exception("Cek profil SQLite gagal")
+
     login_manager = LoginManager()
     login_manager.init_app(app)
     login_manager.login_view = "login"
@@ -68,12 +109,213 @@ def create_app():
     app.config["UPLOAD_FOLDER"] = upload_folder
     os.makedirs(upload_folder, exist_ok=True)
 
+    # --- Feed progres quiz untuk halaman guru (SSE) ---
+    progress_feed = ProgressFeed(
+        interval=app.config["PROGRESS_FEED_INTERVAL"],
+        max_age=app.config["PROGRESS_FEED_MAX_AGE"]
+    )
+
+    # --- Write-behind jawaban (opsional) ---
+    answer_buffer = None
+    if app.config.get("ANSWER_WRITE_BEHIND"):
+        if app.config["WEB_CONCURRENCY"] > 1 and not app.config["ANSWER_BUFFER_WAIT"]:
+            # Antrian per worker: tanpa menunggu commit, worker lain bisa
+            # menampilkan lagi soal yang jawabannya masih tertunda
+            logging.getLogger(__name__).warning(
+                "ANSWER_BUFFER_WAIT dipaksa aktif karena WEB_CONCURRENCY > 1"
+            )
+            app.config["ANSWER_BUFFER_WAIT"] = True
+        answer_buffer = AnswerWriteBuffer(
+            app,
+            interval_ms=app.config["ANSWER_FLUSH_INTERVAL_MS"],
+            max_rows=app.config["ANSWER_FLUSH_MAX_ROWS"],
+            on_flush=lambda ids: progress_feed.notify()
+        )
+    app.extensions["answer_buffer"] = answer_buffer
+
+    # --- Admission control mulai quiz & pre-warm snapshot ---
+    start_gate = AdmissionGate(
+        app.config["QUIZ_START_CONCURRENCY"],
+        app.config["QUIZ_START_MAX_WAIT"],
+        lock_dir=os.path.join(app.config["STAMP_DIR"], "quiz_start") if app.config["QUIZ_START_SHARED"] else None
+    )
+    warm_state = {"pid": None}
+
+    # --- Koordinasi tulis untuk route yang banyak menulis ---
+    writes = WriteCoordinator(
+        attempts=app.config["WRITE_RETRY_ATTEMPTS"],
+        base_ms=app.config["WRITE_RETRY_BASE_MS"],
+        max_ms=app.config["WRITE_RETRY_MAX_MS"],
+        max_wait=app.config["WRITE_MAX_WAIT"],
+        single_writer=app.config["WRITE_SINGLE_WRITER"],
+        lock_path=os.path.join(app.config["STAMP_DIR"], "writer.lock")
+    )
+    app.extensions["writes"] = writes
+
+    # --- Indeks kode quiz yang sudah dipublikasikan ---
+    code_index = QuizCodeIndex(
+        VersionStamp(app.config["STAMP_DIR"], "quiz_codes"),
+        negative_ttl=app.config["QUIZ_CODE_NEGATIVE_TTL"]
+    )
+
+    # --- Laporan PDF (process pool + cache disk) ---
+    reports = ReportService(
+        app.config["REPORT_CACHE_DIR"],
+        workers=app.config["REPORT_WORKERS"],
+        wait=app.config["REPORT_WAIT"],
+        keep=app.config["REPORT_KEEP"]
+    )
+
+    # --- Engine baca laporan guru (replika / snapshot SQLite / utama) ---
+    reads = ReadRouter(
+        app.config["SQLALCHEMY_DATABASE_URI"],
+        replica_url=app.config["REPORT_REPLICA_URL"] if app.config["REPORT_READ_ROUTING"] else None,
+        snapshot_path=app.config["REPORT_SNAPSHOT_PATH"] if app.config["REPORT_READ_ROUTING"] else None,
+        refresh=app.config["REPORT_SNAPSHOT_REFRESH"],
+        max_staleness=app.config["REPORT_MAX_STALENESS"],
+        engine_options=sqlite_profile.engine_options(
+            app.config["REPORT_REPLICA_URL"] or "",
+            pool_size=app.config["DB_POOL_SIZE"],
+            max_overflow=app.config["DB_MAX_OVERFLOW"],
+            pool_timeout=app.config["DB_POOL_TIMEOUT"],
+            pool_recycle=app.config["DB_POOL_RECYCLE"]
+        )
+    )
+    app.extensions["read_router"] = reads
+
+    # --- Leaderboard top-K per scope (global, quiz, kategori) ---
+    top_scores = LeaderboardService(
+        VersionStamp(app.config["STAMP_DIR"], "leaderboard"),
+        k=app.config["LEADERBOARD_SIZE"]
+    )
+
+    # --- Sweeper submission yang melewati batas waktu ---
+    deadline_grace = app.config["QUIZ_DEADLINE_GRACE"]
+    sweeper = DeadlineSweeper(
+        app,
+        app.config["DEADLINE_SWEEP_INTERVAL"],
+        os.path.join(app.config["STAMP_DIR"], "deadline_sweeper.lock"),
+        grace=deadline_grace,
+        on_swept=lambda ids: (top_scores.invalidate(), progress_feed.notify())
+    )
+
+    @app.before_request
+    def start_deadline_sweeper():
+        sweeper.ensure_started()
+
+    @app.cli.command("sweep-submissions")
+    def sweep_submissions_command():
+        """Tutup semua submission yang sudah melewati batas waktu."""
+        swept = sweep_expired(grace=deadline_grace)
+        if swept:
+            top_scores.invalidate()
+        click.echo(f"{len(swept)} submission ditutup.")
+
+    @app.cli.command("export-answer-columns")
+    @click.argument("out_dir")
+    @click.option("--quiz", "quiz_id", type=int, help="Ekspor satu quiz.")
+    @click.option("--category", "category_id", type=int, help="Ekspor semua quiz dalam satu kategori.")
+    @click.option("--full", is_flag=True, help="Hapus ekspor lama dan tulis ulang semuanya.")
+    def export_answer_columns_command(out_dir, quiz_id, category_id, full):
+        """Ekspor jawaban sebagai kolom NumPy (.npy) yang bisa di-memory-map; default menambah data baru."""
+        if (quiz_id is None) == (category_id is None):
+            raise click.UsageError("Pilih salah satu: --quiz atau --category.")
+        scope, scope_id = ("quiz", quiz_id) if quiz_id is not None else ("category", category_id)
+        try:
+            n = answer_columns.export_answers(out_dir, scope, scope_id, full=full)
+        except ValueError as e:
+            raise click.ClickException(str(e))
+        click.echo(f"{n} baris jawaban ditambahkan ke {out_dir}.")
+
+    @app.cli.command("repair-counters")
+    def repair_counters_command():
+        """Samakan counter soal/jawaban dengan isi tabel (setelah edit manual database)."""
+        fixed = repair_counters()
+        click.echo(f"Diperbaiki: {fixed['quiz']} quiz, {fixed['submission']} submission.")
+
+    @app.cli.command("rebuild-weekly-rollup")
+    def rebuild_weekly_rollup_command():
+        """Hitung ulang tabel rekap nilai mingguan dari seluruh jawaban."""
+        n = rollup.rebuild()
+        click.echo(f"{n} baris rekap mingguan dibangun ulang.")
+
+    @app.before_request
+    def prewarm_quiz_snapshots():
+        # Sekali per proses worker (setelah fork gunicorn)
+        if not app.config.get("QUIZ_PREWARM") or warm_state["pid"] == os.getpid():
+            return
+        warm_state["pid"] = os.getpid()
+        try:
+            warm_published()
+            top_scores.rebuild()
+        except Exception:
+            logging.getLogger(__name__).exception("Pre-warm snapshot quiz gagal")
+
     # ==============================================
     # Fungsi Utilitas
     # ==============================================
     def allowed_file(filename, allowed_set=ALLOWED_IMG):
         return bool(filename) and "." in filename and filename.rsplit(".", 1)[1].lower() in allowed_set
 
+    def question_images(question):
+        if question is None:
+            return []
+        names = [question.image_filename] + [c.image_filename for c in question.choices]
+        return list(dict.fromkeys(n for n in names if n))
+
+    def remaining_seconds(submission):
+        if submission.deadline_at is None:
+            return None
+        return max(0, int((submission.deadline_at - datetime.utcnow()).total_seconds()))
+
+    def report_pending():
+        # Laporan masih dirender: halaman ini memuat ulang URL yang sama
+        return render_template("teacher/report_pending.html"), 202
+
+    def flush_pending(submission_id):
+        """Tulis jawaban tertunda di buffer worker ini; True bila ada yang ditulis.
+
+        Melempar WriteBusy bila database masih terkunci (jawaban tetap di antrian).
+        """
+        if not answer_buffer:
+            return False
+        try:
+            return answer_buffer.flush_submission(submission_id)
+        except OperationalError as e:
+            if not is_lock_error(e):
+                raise
+            raise WriteBusy(str(e.orig)) from e
+
+    def write_busy():
+        # Database tetap terkunci: halaman ini mencoba ulang URL yang sama
+        response = make_response(render_template("student/write_busy.html"), 503)
+        response.headers["Retry-After"] = "3"
+        return response
+
+    def stream_table(filename, header, stmt, fmt):
+        """Response CSV/TSV yang membaca cursor server-side per potongan (yield_per)."""
+        delimiter = "\t" if fmt == "tsv" else ","
+        chunk_rows = app.config["EXPORT_CHUNK_ROWS"]
+
+        def generate():
+            buf = StringIO()
+            writer = csv.writer(buf, delimiter=delimiter)
+            writer.writerow(header)
+            yield buf.getvalue()
+
+            result = db.session.execute(stmt.execution_options(yield_per=chunk_rows))
+            for rows in result.partitions():
+                buf.seek(0)
+                buf.truncate()
+                writer.writerows(rows)
+                yield buf.getvalue()
+
+        return Response(
+            stream_with_context(generate()),
+            mimetype="text/tab-separated-values" if fmt == "tsv" else "text/csv",
+            headers={"Content-Disposition": f"attachment; filename={filename}.{fmt}"}
+        )
+
     def save_upload(fileobj):
         """Simpan file, beri nama unik, dan kembalikan nama file yang disimpan."""
         if not fileobj or not getattr(fileobj, "filename", None):
@@ -118,10 +360,18 @@ def create_app():
                 flash("Role tidak valid.")
                 return redirect(url_for("register"))
 
-            u = User(username=username, email=email, role=role_enum)
-            u.password_hash = generate_password_hash(password)
-            db.session.add(u)
-            db.session.commit()
+            password_hash = generate_password_hash(password)
+
+            def add_user():
+                u = User(username=username, email=email, role=role_enum)
+                u.password_hash = password_hash
+                db.session.add(u)
+
+            try:
+                writes.run(add_user)
+            except WriteBusy:
+                flash("Server sedang sibuk, silakan coba lagi beberapa detik lagi.")
+                return redirect(url_for("register"))
 
             flash("Registrasi berhasil, silakan login.")
             return redirect(url_for("login"))
@@ -355,6 +605,7 @@ def create_app():
             code = request.form.get("code", "").strip()
             category_id = request.form.get("category")
             duration_min_raw = request.form.get("duration", "").strip()
+            batch_mode = bool(request.form.get("batch_mode"))
 
             try:
                 duration_sec = int(duration_min_raw) * 60 if duration_min_raw else 600
@@ -377,6 +628,7 @@ def create_app():
                 created_by=current_user.id,
                 published=False,
                 duration=duration_sec,
+                batch_mode=batch_mode,
             )
             db.session.add(quiz)
             db.session.commit()
@@ -401,13 +653,17 @@ def create_app():
             quiz.description = request.form.get("description", "").strip()
             quiz.code = request.form.get("code", "").strip()
             quiz.category_id = request.form.get("category")
+            quiz.batch_mode = bool(request.form.get("batch_mode"))
             duration_min_raw = request.form.get("duration", "").strip()
             try:
                 quiz.duration = int(duration_min_raw) * 60 if duration_min_raw else quiz.duration
             except ValueError:
                 pass
 
+            bump_quiz_version(quiz)
             db.session.commit()
+            code_index.invalidate()
+            top_scores.invalidate()
             flash("Quiz berhasil diperbarui.", "success")
             return redirect(url_for("teacher_dashboard"))
 
@@ -421,17 +677,25 @@ def create_app():
             flash("Akses ditolak.")
             return redirect(url_for("teacher_dashboard"))
 
-        # Hapus question -> choice & submissions -> answers
-        for q in quiz.questions:
-            Choice.query.filter_by(question_id=q.id).delete()
-        Question.query.filter_by(quiz_id=quiz.id).delete()
-
+        # Hapus submissions -> answers lebih dulu (answer mereferensikan
+        # question & choice), baru question -> choice
         for s in quiz.submissions:
             Answer.query.filter_by(submission_id=s.id).delete()
         Submission.query.filter_by(quiz_id=quiz.id).delete()
 
+        # Jawaban submission quiz lain yang masih menunjuk soal quiz ini
+        detach_answers([q.id for q in quiz.questions])
+        for q in quiz.questions:
+            Choice.query.filter_by(question_id=q.id).delete()
+        Question.query.filter_by(quiz_id=quiz.id).delete()
+        WeeklyScoreRollup.query.filter_by(quiz_id=quiz.id).delete()
+
         db.session.delete(quiz)
         db.session.commit()
+        invalidate_snapshot(quiz_id)
+        invalidate_item_analysis(quiz_id)
+        code_index.invalidate()
+        top_scores.invalidate()
         flash("Quiz dan semua datanya berhasil dihapus.", "success")
         return redirect(url_for("teacher_dashboard"))
 
@@ -452,6 +716,7 @@ def create_app():
 
             question = Question(text=text, quiz_id=quiz.id, image_filename=image_filename)
             db.session.add(question)
+            quiz.question_count = Quiz.question_count + 1
             db.session.commit()
 
             # Simpan pilihan jawaban
@@ -472,6 +737,7 @@ def create_app():
                 )
                 db.session.add(choice)
 
+            bump_quiz_version(quiz)
             db.session.commit()
             flash("Soal berhasil ditambahkan!", "success")
             return redirect(url_for("add_question", quiz_id=quiz.id))
@@ -507,6 +773,7 @@ def create_app():
                 if saved:
                     question.image_filename = saved
 
+            bump_quiz_version(quiz)
             db.session.commit()
             flash("Soal berhasil diperbarui!", "success")
             return redirect(url_for("add_question", quiz_id=quiz.id))
@@ -530,8 +797,13 @@ def create_app():
             except Exception:
                 pass
 
+        # Jawaban siswa tetap disimpan tetapi tidak dihitung lagi di counter
+        # submission & rollup; referensinya ke soal & pilihan dilepas
+        detach_answers([question.id])
         Choice.query.filter_by(question_id=question.id).delete()
         db.session.delete(question)
+        quiz.question_count = Quiz.question_count - 1
+        bump_quiz_version(quiz)
         db.session.commit()
         flash("Soal berhasil dihapus.", "success")
         return redirect(url_for("add_question", quiz_id=quiz.id))
@@ -549,22 +821,51 @@ def create_app():
 
         quiz = Quiz.query.get_or_404(quiz_id)
 
-        # Ambil semua submission untuk quiz ini
-        submissions = Submission.query.filter(
-            Submission.quiz_id == quiz_id,
-            Submission.finished_at.isnot(None)  # hanya yang sudah selesai mengerjakan
-        ).order_by(Submission.finished_at.desc()).all()
+        # Query berat dibaca dari replika/snapshot laporan
+        with reads.reading():
+            # Jumlah soal dari counter di tabel quiz, dibaca dari sumber yang
+            # sama dengan jawaban agar nilai dihitung dari satu titik waktu
+            total_soal = db.session.execute(
+                db.select(Quiz.question_count).where(Quiz.id == quiz.id)
+            ).scalar()
+
+            # Satu query berkelompok: submission + user + jumlah jawaban benar
+            rows = (
+                db.session.query(
+                    Submission.id,
+                    User.username,
+                    Submission.finished_at,
+                    func.coalesce(
+                        func.sum(case((Choice.is_correct == True, 1), else_=0)), 0
+                    ).label("benar")
+                )
+                .join(User, User.id == Submission.user_id)
+                .outerjoin(Answer, Answer.submission_id == Submission.id)
+                .outerjoin(Choice, Choice.id == Answer.choice_id)
+                .filter(
+                    Submission.quiz_id == quiz_id,
+                    Submission.finished_at.isnot(None)  # hanya yang sudah selesai mengerjakan
+                )
+                .group_by(Submission.id, User.username, Submission.finished_at)
+                .order_by(Submission.finished_at.desc())
+                .all()
+            )
 
+            # --- REKAP NILAI PER MINGGU (MINGGU ISO, DARI TABEL ROLLUP) ---
+            rekap_rows = (
+                WeeklyScoreRollup.query
+                .filter_by(quiz_id=quiz.id)
+                .order_by(WeeklyScoreRollup.year, WeeklyScoreRollup.iso_week)
+                .all()
+            )
 
         hasil_list = []
-        for sub in submissions:
-            total_benar = sum(1 for ans in sub.answers if ans.choice and ans.choice.is_correct)
-            total_soal = len(sub.quiz.questions)
-            nilai = (total_benar / total_soal * 100) if total_soal else 0
+        for r in rows:
+            nilai = (r.benar / total_soal * 100) if total_soal else 0
             hasil_list.append({
-                "nama": sub.user.username,
+                "nama": r.username,
                 "nilai": nilai,
-                "tanggal": sub.finished_at.strftime("%d %B %Y") if sub.finished_at else "-"
+                "tanggal": r.finished_at.strftime("%d %B %Y") if r.finished_at else "-"
             })
 
 
@@ -572,42 +873,12 @@ def create_app():
         labels = [h["nama"] for h in hasil_list]
         values = [h["nilai"] for h in hasil_list]
 
-        # --- REKAP NILAI PER MINGGU UNTUK SQLITE (MINGGU KALENDER BIASA) ---
-
-        rekap_query = (
-            db.session.query(
-                func.strftime("%Y", Submission.finished_at).label("tahun"),
-                func.strftime("%W", Submission.finished_at).label("minggu"),
-
-                func.avg(
-                    case(
-                        (Choice.is_correct == True, 1),
-                        else_=0
-                    )
-                ).label("rata_rata"),
-
-                func.count(func.distinct(Submission.id)).label("jumlah")  # FIX double-count
-            )
-            .join(Answer, Submission.id == Answer.submission_id)
-            .join(Choice, Choice.id == Answer.choice_id)
-            .filter(
-                Submission.quiz_id == quiz.id,
-                Submission.finished_at.isnot(None)
-            )
-            .group_by("tahun", "minggu")
-            .order_by("tahun", "minggu")
-            .all()
-        )
-
-
         rekap = [{
-            "tahun": int(r.tahun),
-            "minggu": int(r.minggu),
-            "rata_rata": float(r.rata_rata),
-            "jumlah": int(r.jumlah)
-        } for r in rekap_query]
-
-
+            "tahun": r.year,
+            "minggu": r.iso_week,
+            "rata_rata": (r.correct_count / r.answered_count) if r.answered_count else 0.0,
+            "jumlah": r.submission_count
+        } for r in rekap_rows]
 
         return render_template(
             "teacher/quiz_results.html",
@@ -618,6 +889,68 @@ def create_app():
             rekap=rekap
         )
 
+    # ===== EKSPOR CSV/TSV (STREAMING) =====
+    @app.route("/teacher/quiz/<int:quiz_id>/export/scores.<any(csv, tsv):fmt>")
+    @login_required
+    def export_scores(quiz_id, fmt):
+        if current_user.role != Role.teacher:
+            abort(403)
+        quiz = Quiz.query.get_or_404(quiz_id)
+
+        stmt = (
+            db.select(
+                Submission.id, User.username, Submission.started_at, Submission.finished_at,
+                Submission.answered_count, Submission.correct_count, Submission.score
+            )
+            .join(User, User.id == Submission.user_id)
+            .where(Submission.quiz_id == quiz.id)
+            .order_by(Submission.id)
+        )
+        return stream_table(
+            f"nilai_quiz_{quiz.id}",
+            ["submission_id", "username", "started_at", "finished_at",
+             "answered_count", "correct_count", "score"],
+            stmt, fmt
+        )
+
+    @app.route("/teacher/quiz/<int:quiz_id>/export/answers.<any(csv, tsv):fmt>")
+    @login_required
+    def export_answers(quiz_id, fmt):
+        if current_user.role != Role.teacher:
+            abort(403)
+        quiz = Quiz.query.get_or_404(quiz_id)
+
+        stmt = (
+            db.select(
+                Answer.id, Answer.submission_id, Submission.user_id, User.username,
+                Answer.question_id, Answer.choice_id,
+                case((Choice.is_correct == True, 1), else_=0)
+            )
+            .join(Submission, Submission.id == Answer.submission_id)
+            .join(User, User.id == Submission.user_id)
+            .outerjoin(Choice, Choice.id == Answer.choice_id)
+            .where(Submission.quiz_id == quiz.id)
+            .order_by(Answer.id)
+        )
+        return stream_table(
+            f"jawaban_quiz_{quiz.id}",
+            ["answer_id", "submission_id", "user_id", "username",
+             "question_id", "choice_id", "is_correct"],
+            stmt, fmt
+        )
+
+    @app.route("/teacher/quiz/<int:quiz_id>/item-analysis")
+    @login_required
+    def item_analysis(quiz_id):
+        if current_user.role != Role.teacher:
+            flash("Akses ditolak.", "danger")
+            return redirect(url_for("index"))
+
+        quiz = Quiz.query.get_or_404(quiz_id)
+        with reads.reading():
+            analysis = get_item_analysis(quiz)
+        return render_template("teacher/item_analysis.html", quiz=quiz, analysis=analysis)
+
 
     # ===== LEADERBOARD: per-quiz (teacher) =====
     @app.route("/teacher/quiz/<int:quiz_id>/leaderboard")
@@ -625,24 +958,17 @@ def create_app():
     def quiz_leaderboard(quiz_id):
         quiz = Quiz.query.get_or_404(quiz_id)
 
-        # FIX QUERY LEADERBOARD
-        rows = (
-            db.session.query(
-                User.username.label("username"),
-                db.func.avg(Submission.score).label("percentage"),
-                db.func.count(Submission.id).label("attempts")
-            )
-            .join(Submission, Submission.user_id == User.id)
-            .filter(Submission.quiz_id == quiz.id)
-            .group_by(User.id)
-            .order_by(db.func.avg(Submission.score).desc())
-            .all()
-        )
+        # Peringkat dari nilai terbaik tiap siswa, halaman berbasis cursor (keyset)
+        after = decode_cursor(request.args.get("after"))
+        with reads.reading():
+            rows, next_cursor = ranked_page(quiz.id, after=after, limit=50)
 
         return render_template(
-            "teacher/quiz_leaderboard.html",
+            "teacher/leaderboard.html",
             quiz=quiz,
-            rows=rows
+            rows=rows,
+            next_after=encode_cursor(next_cursor),
+            first_page=after is None
         )
 
 
@@ -650,35 +976,18 @@ def create_app():
     @app.route("/leaderboard")
     @login_required
     def leaderboard():
+        # Scope opsional: ?quiz_id=.. atau ?category_id=..; ?best=1 = satu baris per siswa
+        scope = ("global", None)
+        if request.args.get("quiz_id", type=int):
+            scope = ("quiz", request.args.get("quiz_id", type=int))
+        elif request.args.get("category_id", type=int):
+            scope = ("category", request.args.get("category_id", type=int))
+        best = request.args.get("best") == "1"
 
-        raw_lb = (
-            db.session.query(
-                User.username,
-                Submission.score,
-                Submission.finished_at,
-                Quiz.title.label("quiz_title")
-            )
-            .join(User, Submission.user_id == User.id)
-            .join(Quiz, Submission.quiz_id == Quiz.id)
-            .filter(Submission.score.isnot(None))
-            .order_by(Submission.score.desc(), Submission.finished_at.asc())
-            .limit(20)
-            .all()
-        )
-
-        leaderboard = []
-        for r in raw_lb:
-            leaderboard.append({
-                "username": r[0],
-                "score": float(r[1]) if r[1] else 0,
-                "finished_at": r[2],
-                "quiz_title": r[3]
-            })
-
-        # ======= RETURN WAJIB ADA DI SINI =======
         return render_template(
-            "leaderboard.html",
-            leaderboard=leaderboard
+            "student/leaderboard.html",
+            leaderboard=top_scores.top(scope, best_per_user=best),
+            best=best
         )
 
 
@@ -697,7 +1006,18 @@ def create_app():
         if request.method == 'POST':
             selected_ids = request.form.getlist('question_ids')
             selected_questions = Question.query.filter(Question.id.in_(selected_ids)).all()
+            # Soal bisa pindah dari quiz lain: counter quiz asal ikut dihitung ulang
+            affected = {quiz.id} | {q.quiz_id for q in selected_questions if q.quiz_id}
+            # Soal yang tidak dipilih ikut terhapus (delete-orphan): lepas dulu
+            # jawaban siswa seperti di delete_question agar FK tidak gagal
+            selected_ids = {q.id for q in selected_questions}
+            detach_answers([q.id for q in quiz.questions if q.id not in selected_ids])
             quiz.questions = selected_questions
+            # Snapshot & urutan soal quiz asal juga berubah
+            for affected_quiz in Quiz.query.filter(Quiz.id.in_(affected)):
+                bump_quiz_version(affected_quiz)
+            db.session.flush()
+            recount_questions(affected)
             db.session.commit()
             flash('Soal berhasil dipilih untuk quiz ini!', 'success')
             return redirect(url_for('teacher_dashboard'))
@@ -716,6 +1036,10 @@ def create_app():
 
         quiz.published = True
         db.session.commit()
+        code_index.invalidate()
+
+        # Siapkan snapshot sebelum siswa mulai masuk dengan kode quiz
+        get_snapshot(quiz)
 
         flash("Quiz berhasil dipublikasikan!", "success")
         return redirect(url_for("teacher_dashboard"))
@@ -736,9 +1060,9 @@ def create_app():
         if request.method == "POST":
             code = request.form.get("code", "").strip()
             if code:
-                quiz = Quiz.query.filter_by(code=code, published=True).first()
-                if quiz:
-                    return redirect(url_for("start_quiz", quiz_id=quiz.id))
+                quiz_id = code_index.lookup(code)
+                if quiz_id:
+                    return redirect(url_for("start_quiz", quiz_id=quiz_id))
 
             flash("Kode quiz tidak ditemukan atau belum aktif.")
 
@@ -761,36 +1085,8 @@ def create_app():
                 }
             history[qid]["count"] += 1
 
-        # Leaderboard global (ambil top 20)
-        # Query mengembalikan Row-like items — kita ubah ke list of dict agar Jinja aman.
-        raw_lb = (
-            db.session.query(
-                User.username,
-                Submission.score,
-                Submission.finished_at,
-                Quiz.title.label("quiz_title")
-            )
-            .join(User, Submission.user_id == User.id)
-            .join(Quiz, Submission.quiz_id == Quiz.id)
-            .filter(Submission.score.isnot(None))
-            .order_by(Submission.score.desc(), Submission.finished_at.asc())
-            .limit(20)
-            .all()
-        )
-
-        leaderboard = []
-        for r in raw_lb:
-            # r bisa berupa tuple/Row — ambil via index untuk aman
-            username = r[0]
-            score = r[1]
-            finished_at = r[2]
-            quiz_title = r[3]
-            leaderboard.append({
-                "username": username,
-                "score": float(score) if score is not None else None,
-                "finished_at": finished_at,
-                "quiz_title": quiz_title
-            })
+        # Leaderboard global (top-K di memori, tanpa query sort per request)
+        leaderboard = top_scores.top()
 
         # Kembalikan template dengan semua data
         return render_template(
@@ -806,33 +1102,50 @@ def create_app():
     @app.route("/quiz/<int:quiz_id>/start")
     @login_required
     def start_quiz(quiz_id):
+        with start_gate.slot() as admitted:
+            if not admitted:
+                flash("Server sedang sibuk, silakan coba lagi beberapa detik lagi.", "warning")
+                return redirect(url_for("student_dashboard"))
+            return _start_quiz(quiz_id)
+
+    def _start_quiz(quiz_id):
         quiz = Quiz.query.get_or_404(quiz_id)
 
-        # Cegah ulang quiz
-        done = Submission.query.filter(
-            Submission.quiz_id == quiz.id,
-            Submission.user_id == current_user.id,
-            Submission.finished_at.isnot(None)
-        ).first()
+        # Satu query: cari yang sudah selesai (cegah ulang) atau yang masih berjalan (lanjutkan)
+        attempts = Submission.query.filter_by(
+            quiz_id=quiz.id,
+            user_id=current_user.id
+        ).all()
 
+        done = next((s for s in attempts if s.finished_at), None)
         if done:
             flash("Kamu sudah mengerjakan quiz ini.", "warning")
             return redirect(url_for("quiz_result", submission_id=done.id))
 
-        submission = Submission(
-            quiz_id=quiz.id,
-            user_id=current_user.id,
-            started_at=datetime.utcnow()
-        )
-        db.session.add(submission)
-        db.session.commit()
+        submission = next((s for s in attempts if not s.finished_at), None)
+        if submission is None:
+            def add_submission():
+                # RANDOM SOAL: cukup simpan seed, urutan dihitung ulang di server
+                started_at = datetime.utcnow()
+                new = Submission(
+                    quiz_id=quiz_id,
+                    user_id=current_user.id,
+                    started_at=started_at,
+                    deadline_at=compute_deadline(started_at, quiz.duration),
+                    order_seed=secrets.randbits(31)
+                )
+                db.session.add(new)
+                return new
 
-        # RANDOM SOAL
-        order = [q.id for q in quiz.questions]
-        shuffle(order)
+            try:
+                submission = writes.run(add_submission)
+            except WriteBusy:
+                flash("Server sedang sibuk, silakan coba lagi beberapa detik lagi.", "warning")
+                return redirect(url_for("student_dashboard"))
+            progress_feed.notify(quiz_id)
 
-        session["question_order"] = order
-        session["index"] = 0
+        if quiz.batch_mode:
+            return redirect(url_for("take_quiz", submission_id=submission.id))
 
         return redirect(url_for("do_question", submission_id=submission.id))
 
@@ -846,48 +1159,191 @@ def create_app():
     @login_required
     def do_question(submission_id):
         submission = Submission.query.get_or_404(submission_id)
-        quiz = submission.quiz
+        if submission.user_id != current_user.id:
+            abort(403)
+        if submission.finished_at:
+            return redirect(url_for("quiz_result", submission_id=submission.id))
 
-        order = session.get("question_order", [])
-        index = session.get("index", 0)
+        quiz = submission.quiz
+        snapshot = get_snapshot(quiz)
 
-        # selesai
-        if index >= len(order):
-            submission.finished_at = datetime.utcnow()
-            total = len(order)
-            benar = sum(1 for a in submission.answers if a.choice and a.choice.is_correct)
-            submission.score = (benar / total * 100) if total else 0
-            db.session.commit()
+        # Waktu habis: jawaban ditolak, submission langsung dinilai
+        if is_expired(submission, grace=deadline_grace):
+            try:
+                if flush_pending(submission.id):
+                    db.session.refresh(submission)
+                closed = writes.run(lambda: finish_submission(
+                    submission, snapshot.question_count, finished_at=submission.deadline_at
+                ))
+            except WriteBusy:
+                return write_busy()
+            if closed:
+                top_scores.record(submission)
+                progress_feed.notify(quiz.id)
+            flash("Waktu pengerjaan sudah habis.", "warning")
+            return redirect(url_for("quiz_result", submission_id=submission.id))
 
-            session.pop("question_order", None)
-            session.pop("index", None)
+        # Urutan dari seed submission; soal berikutnya = soal pertama yang belum
+        # dijawab, jadi perubahan soal di tengah pengerjaan tidak melompati/mengulang soal
+        seed = submission.order_seed if submission.order_seed is not None else submission.id
+        order = question_order(snapshot, seed)
+        answered = answered_question_ids(submission.id)
+        if answer_buffer:
+            answered |= answer_buffer.pending_questions(submission.id)
+        remaining = [qid for qid in order if qid not in answered]
+        index = len(order) - len(remaining)
 
+        # selesai
+        if not remaining:
+            try:
+                if flush_pending(submission.id):
+                    db.session.refresh(submission)
+                closed = writes.run(lambda: finish_submission(submission, len(order)))
+            except WriteBusy:
+                return write_busy()
+            if closed:
+                top_scores.record(submission)
+                progress_feed.notify(quiz.id)
             return redirect(url_for("quiz_result", submission_id=submission.id))
 
-        question = Question.query.get_or_404(order[index])
-        choices = Choice.query.filter_by(question_id=question.id).all()
+        question = snapshot.get(remaining[0])
+        if question is None:
+            abort(404)
+        choices = choice_order(question, seed)
 
         if request.method == "POST":
-            choice_id = request.form.get("choice")
-            if choice_id:
-                db.session.add(Answer(
-                    submission_id=submission.id,
-                    question_id=question.id,
-                    choice_id=int(choice_id)
-                ))
-                db.session.commit()
-                session["index"] = index + 1
+            # Kirim ulang soal yang sudah dijawab (double submit / tab lama) diabaikan
+            if request.form.get("question_id", type=int) != question.id:
                 return redirect(url_for("do_question", submission_id=submission.id))
 
-        return render_template(
+            choice_id = request.form.get("choice", type=int)
+            if choice_id in question.choice_ids:
+                if answer_buffer:
+                    committed = answer_buffer.enqueue(
+                        submission.id, question.id, choice_id,
+                        choice_id in snapshot.correct_choice_ids
+                    )
+                    if app.config["ANSWER_BUFFER_WAIT"]:
+                        committed.wait(5)
+                else:
+                    try:
+                        writes.run(lambda: record_answer(submission, question.id, choice_id, snapshot))
+                    except WriteBusy:
+                        flash("Server sedang sibuk, jawaban belum tersimpan. Silakan kirim ulang.", "warning")
+                        return redirect(url_for("do_question", submission_id=submission.id))
+                    except IntegrityError:
+                        # Request lain sudah menyimpan jawaban soal ini (indeks unik);
+                        # transaksi ini di-rollback sehingga counter tidak naik dua kali
+                        return redirect(url_for("do_question", submission_id=submission.id))
+                    progress_feed.notify(quiz.id)
+                return redirect(url_for("do_question", submission_id=submission.id))
+
+        # Gambar soal berikutnya dipreload supaya tidak menunggu saat pindah soal
+        next_question = snapshot.get(remaining[1]) if len(remaining) > 1 else None
+        preload_urls = [
+            url_for("uploaded_file", filename=fname)
+            for fname in question_images(next_question)
+        ]
+
+        response = make_response(render_template(
             "student/quiz_single.html",
             quiz=quiz,
             question=question,
             choices=choices,
             nomor=index + 1,
-            total=len(order)
+            total=len(order),
+            remaining=remaining_seconds(submission),
+            preload_urls=preload_urls
+        ))
+        if preload_urls:
+            response.headers["Link"] = ", ".join(
+                f"<{url}>; rel=preload; as=image" for url in preload_urls
+            )
+        return response
+
+    # ==============================================
+    # SISWA MENGERJAKAN QUIZ (MODE BATCH: SEMUA SOAL SEKALIGUS)
+    # ==============================================
+    @app.route("/quiz/take/<int:submission_id>")
+    @login_required
+    def take_quiz(submission_id):
+        submission = Submission.query.get_or_404(submission_id)
+        if submission.user_id != current_user.id:
+            abort(403)
+        if submission.finished_at:
+            return redirect(url_for("quiz_result", submission_id=submission.id))
+
+        return render_take_quiz(submission)
+
+    def render_take_quiz(submission, selected=None):
+        """Halaman mode batch; `selected` = {question_id: choice_id} yang sudah dipilih."""
+        quiz = submission.quiz
+        snapshot = get_snapshot(quiz)
+        seed = submission.order_seed if submission.order_seed is not None else submission.id
+        questions = [
+            (snapshot.get(qid), choice_order(snapshot.get(qid), seed))
+            for qid in question_order(snapshot, seed)
+        ]
+        return render_template(
+            "student/take_quiz.html",
+            quiz=quiz,
+            submission=submission,
+            questions=questions,
+            selected=selected or {},
+            remaining=remaining_seconds(submission)
         )
 
+    @app.route("/quiz/submit/<int:submission_id>", methods=["POST"])
+    @login_required
+    def submit_quiz(submission_id):
+        submission = Submission.query.get_or_404(submission_id)
+        if submission.user_id != current_user.id:
+            abort(403)
+        if submission.finished_at:
+            flash("Jawaban quiz ini sudah dikumpulkan.", "warning")
+            return redirect(url_for("quiz_result", submission_id=submission.id))
+
+        snapshot = get_snapshot(submission.quiz)
+
+        # Validasi semua jawaban di memori terhadap snapshot; lewat batas waktu = ditolak
+        jawaban = {}
+        expired = is_expired(submission, grace=deadline_grace)
+        if not expired:
+            for q in snapshot.questions:
+                choice_id = request.form.get(f"answer_{q.id}", type=int)
+                if choice_id in q.choice_ids:
+                    jawaban[q.id] = choice_id
+
+        def close():
+            record_answers_bulk(submission, jawaban, snapshot)
+            if finish_submission(
+                submission, snapshot.question_count,
+                finished_at=submission.deadline_at if expired else None
+            ):
+                return True
+            # Sudah ditutup request lain (double submit) atau sweeper: jawaban ganda dibatalkan
+            db.session.rollback()
+            return False
+
+        try:
+            closed = writes.run(close)
+        except IntegrityError:
+            # Double submit bersamaan: request lain sudah menyimpan jawabannya
+            closed = False
+        except WriteBusy:
+            # Jawaban tidak hilang: halaman soal ditampilkan lagi dengan pilihan siswa
+            flash("Server sedang sibuk, jawaban belum terkirim. Silakan kumpulkan ulang.", "warning")
+            return render_take_quiz(submission, selected=jawaban), 503
+        if not closed:
+            flash("Jawaban quiz ini sudah dikumpulkan.", "warning")
+            return redirect(url_for("quiz_result", submission_id=submission.id))
+        top_scores.record(submission)
+        progress_feed.notify(submission.quiz_id)
+        if expired:
+            flash("Waktu pengerjaan sudah habis, jawaban tidak diterima.", "warning")
+
+        return redirect(url_for("quiz_result", submission_id=submission.id))
+
 
     # ================================
     # Lihat Riwayat Per Quiz
@@ -915,7 +1371,11 @@ def create_app():
     # ================================
     @app.route("/uploads/<filename>")
     def uploaded_file(filename):
-        return send_from_directory(app.config["UPLOAD_FOLDER"], filename)
+        # Boleh di-cache browser agar hasil preload dipakai ulang di halaman berikutnya
+        return send_from_directory(
+            app.config["UPLOAD_FOLDER"], filename,
+            max_age=app.config["UPLOAD_CACHE_MAX_AGE"]
+        )
 
 
 
@@ -925,41 +1385,73 @@ def create_app():
     @app.route("/quiz/result/<int:submission_id>")
     @login_required
     def quiz_result(submission_id):
+        try:
+            flush_pending(submission_id)
+        except WriteBusy:
+            return write_busy()
         submission = Submission.query.get_or_404(submission_id)
         quiz = submission.quiz
-        answers = submission.answers
 
         return render_template(
             "student/quiz_result.html",
             submission=submission,
             quiz=quiz,
-            answers=answers
+            total_soal=quiz.question_count,
+            peringkat=my_rank(quiz.id, submission.user_id) if submission.finished_at else None
         )
 
     # PROGRESS SISWA (GURU BISA LIHAT)
 
+    def quiz_progress_rows(quiz_id):
+        """Satu query counter: {submission_id: baris progres} untuk halaman & feed SSE."""
+        rows = db.session.execute(
+            db.select(
+                Submission.id, User.username, Submission.answered_count,
+                Submission.finished_at, Submission.score, Quiz.question_count
+            )
+            .join(User, User.id == Submission.user_id)
+            .join(Quiz, Quiz.id == Submission.quiz_id)
+            .where(Submission.quiz_id == quiz_id)
+            .order_by(Submission.id)
+        ).all()
+        return {
+            r.id: {
+                "id": r.id,
+                "nama": r.username,
+                "status": "Selesai" if r.finished_at else "Mengerjakan",
+                "progress": f"{r.answered_count}/{r.question_count}",
+                "nilai": r.score if r.score is not None else "-"
+            } for r in rows
+        }
+
     @app.route("/teacher/quiz/<int:quiz_id>/progress")
     @login_required
     def quiz_progress(quiz_id):
         quiz = Quiz.query.get_or_404(quiz_id)
 
-        total_soal = len(quiz.questions)
-        data = []
-
-        submissions = Submission.query.filter_by(quiz_id=quiz.id).all()
-
-        for s in submissions:
-            data.append({
-                "nama": s.user.username,
-                "status": "Selesai" if s.finished_at else "Mengerjakan",
-                "progress": f"{len(s.answers)}/{total_soal}",
-                "nilai": s.score if s.score is not None else "-"
-            })
-
         return render_template(
             "teacher/quiz_progress.html",
             quiz=quiz,
-            rows=data
+            rows=list(quiz_progress_rows(quiz.id).values())
+        )
+
+    @app.route("/teacher/quiz/<int:quiz_id>/progress/stream")
+    @login_required
+    def quiz_progress_stream(quiz_id):
+        if current_user.role != Role.teacher:
+            abort(403)
+        quiz_id = Quiz.query.get_or_404(quiz_id).id
+
+        def load_rows():
+            rows = quiz_progress_rows(quiz_id)
+            # Akhiri transaksi baca supaya tick berikutnya melihat data terbaru
+            db.session.rollback()
+            return rows
+
+        return Response(
+            stream_with_context(progress_feed.stream(quiz_id, load_rows)),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
         )
 
     # download rekap nilai
@@ -969,50 +1461,18 @@ def create_app():
     def download_quiz_result(quiz_id):
         quiz = Quiz.query.get_or_404(quiz_id)
 
-        submissions = Submission.query.filter(
-            Submission.quiz_id == quiz.id,
-            Submission.finished_at.isnot(None)
-        ).all()
-
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=A4)
-        styles = getSampleStyleSheet()
-        elements = []
-
-        # Judul
-        elements.append(Paragraph(
-            f"<b>Rekap Nilai Quiz</b><br/>{quiz.title}",
-            styles["Title"]
-        ))
-
-        elements.append(Paragraph("<br/>", styles["Normal"]))
-
-        # Data tabel
-        data = [["Nama Siswa", "Nilai", "Tanggal"]]
-
-        for s in submissions:
-            data.append([
-                s.user.username,
-                f"{s.score:.2f}" if s.score is not None else "-",
-                s.finished_at.strftime("%d %B %Y") if s.finished_at else "-"
-            ])
-
-        table = Table(data, colWidths=[200, 80, 120])
-        table.setStyle(TableStyle([
-            ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-            ("GRID", (0, 0), (-1, -1), 1, colors.black),
-            ("FONT", (0, 0), (-1, 0), "Helvetica-Bold"),
-            ("ALIGN", (1, 1), (-1, -1), "CENTER"),
-            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-        ]))
-
-        elements.append(table)
-
-        doc.build(elements)
-        buffer.seek(0)
+        with reads.reading():
+            payload = quiz_result_payload(quiz)
+        try:
+            path = reports.get("quiz_result", quiz.id, payload)
+        except ReportFailed:
+            flash("Laporan PDF gagal dibuat. Silakan coba lagi.", "danger")
+            return redirect(url_for("quiz_results", quiz_id=quiz.id))
+        if path is None:
+            return report_pending()
 
         return send_file(
-            buffer,
+            path,
             as_attachment=True,
             download_name=f"rekap_quiz_{quiz.id}.pdf",
             mimetype="application/pdf"
@@ -1048,35 +1508,9 @@ def create_app():
 
         student = User.query.get_or_404(user_id)
 
-        quizzes = Quiz.query.filter_by(published=True).all()
-
-        data = []
-
-        for quiz in quizzes:
-            submission = Submission.query.filter_by(
-                quiz_id=quiz.id,
-                user_id=student.id
-            ).order_by(Submission.started_at.desc()).first()
-
-            if not submission:
-                status = "Belum Mengerjakan"
-                progress = "-"
-                score = "-"
-            elif submission.finished_at:
-                status = "Selesai"
-                progress = f"{len(submission.answers)}/{len(quiz.questions)}"
-                score = f"{submission.score:.1f}%"
-            else:
-                status = "Mengerjakan"
-                progress = f"{len(submission.answers)}/{len(quiz.questions)}"
-                score = "-"
-
-            data.append({
-                "quiz": quiz,
-                "status": status,
-                "progress": progress,
-                "score": score
-            })
+        # Satu query: semua quiz terbit + percobaan terakhir siswa
+        with reads.reading():
+            data = student_progress(student.id)
 
         return render_template(
             "teacher/student_progress.html",
@@ -1084,6 +1518,26 @@ def create_app():
             rows=data
         )
 
+    # ==============================================
+    # ADMIN / GURU: MATRIKS PROGRES SEMUA SISWA x QUIZ
+    # ==============================================
+    @app.route("/teacher/students/progress")
+    @login_required
+    @reads.route
+    def teacher_progress_matrix():
+        if current_user.role != Role.teacher:
+            flash("Akses ditolak.", "danger")
+            return redirect(url_for("index"))
+
+        students, quizzes, cells = class_matrix()
+
+        return render_template(
+            "teacher/progress_matrix.html",
+            students=students,
+            quizzes=quizzes,
+            cells=cells
+        )
+
 
     @app.route("/teacher/student/<int:user_id>/download")
     @login_required
@@ -1093,86 +1547,104 @@ def create_app():
             return redirect(url_for("index"))
 
         student = User.query.get_or_404(user_id)
-        quizzes = Quiz.query.filter_by(published=True).all()
 
-        buffer = BytesIO()
-
-        doc = SimpleDocTemplate(
-            buffer,
-            pagesize=A4,
-            rightMargin=30,
-            leftMargin=30,
-            topMargin=30,
-            bottomMargin=30
-        )
-
-        styles = getSampleStyleSheet()
-        elements = []
+        with reads.reading():
+            payload = student_progress_payload(student)
+        try:
+            path = reports.get("student_progress", student.id, payload)
+        except ReportFailed:
+            flash("Laporan PDF gagal dibuat. Silakan coba lagi.", "danger")
+            return redirect(url_for("teacher_student_progress", user_id=student.id))
+        if path is None:
+            return report_pending()
 
-        # ===== JUDUL =====
-        elements.append(
-            Paragraph(
-                f"<b>Laporan Progres Quiz Siswa</b><br/>Nama: {student.username}",
-                styles["Title"]
-            )
+        return send_file(
+            path,
+            as_attachment=True,
+            download_name=f"Progres_{student.username}.pdf",
+            mimetype="application/pdf"
         )
 
-        elements.append(Paragraph("<br/>", styles["Normal"]))
 
-        # ===== DATA TABEL =====
-        data = [
-            ["Quiz", "Status", "Progress", "Nilai"]
-        ]
+    # ==============================================
+    # GURU: EKSPOR MASSAL PDF PROGRES (ZIP)
+    # ==============================================
+    @app.route("/teacher/students/export", methods=["POST"])
+    @login_required
+    def export_student_reports():
+        if current_user.role != Role.teacher:
+            flash("Akses ditolak.", "danger")
+            return redirect(url_for("index"))
 
-        for quiz in quizzes:
-            submission = Submission.query.filter_by(
-                quiz_id=quiz.id,
-                user_id=student.id
-            ).order_by(Submission.started_at.desc()).first()
-
-            if not submission:
-                status = "Belum Mengerjakan"
-                progress = "-"
-                score = "-"
-            elif submission.finished_at:
-                status = "Selesai"
-                progress = f"{len(submission.answers)}/{len(quiz.questions)}"
-                score = f"{submission.score:.1f}%"
-            else:
-                status = "Mengerjakan"
-                progress = f"{len(submission.answers)}/{len(quiz.questions)}"
-                score = "-"
-
-            data.append([
-                quiz.title,
-                status,
-                progress,
-                score
+        with reads.reading():
+            payloads = class_progress_payloads()
+        try:
+            job = reports.start_export([
+                (f"Progres_{secure_filename(student.username) or student.id}.pdf",
+                 "student_progress", student.id, payload)
+                for student, payload in payloads
             ])
+        except ReportFailed:
+            flash("Ekspor PDF gagal dimulai. Silakan coba lagi.", "danger")
+            return redirect(url_for("teacher_students"))
+        return redirect(url_for("export_status", job_id=job.id))
+
+    def get_export_or_404(job_id):
+        if current_user.role != Role.teacher:
+            abort(403)
+        job = reports.get_export(job_id)
+        if job is None:
+            abort(404)
+        return job
 
-        table = Table(data, colWidths=[200, 100, 80, 80])
-        table.setStyle(TableStyle([
-            ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-            ("GRID", (0, 0), (-1, -1), 1, colors.grey),
-            ("FONT", (0, 0), (-1, 0), "Helvetica-Bold"),
-            ("ALIGN", (1, 1), (-1, -1), "CENTER"),
-            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-            ("BOTTOMPADDING", (0, 0), (-1, 0), 8),
-            ("TOPPADDING", (0, 0), (-1, 0), 8),
-        ]))
+    @app.route("/teacher/exports/<job_id>")
+    @login_required
+    def export_status(job_id):
+        job = get_export_or_404(job_id)
+        if request.args.get("format") == "json":
+            return jsonify(job.status())
+        return render_template("teacher/export_status.html", job=job.status())
 
-        elements.append(table)
+    @app.route("/teacher/exports/<job_id>/download")
+    @login_required
+    def export_download(job_id):
+        job = get_export_or_404(job_id)
+        return Response(
+            job.iter_zip(),
+            mimetype="application/zip",
+            headers={"Content-Disposition": "attachment; filename=progres_siswa.zip"}
+        )
 
-        doc.build(elements)
+    @app.route("/teacher/exports/<job_id>/cancel", methods=["POST"])
+    @login_required
+    def export_cancel(job_id):
+        job = get_export_or_404(job_id)
+        job.cancel()
+        flash("Ekspor dibatalkan.", "warning")
+        return redirect(url_for("teacher_students"))
 
-        buffer.seek(0)
 
-        return send_file(
-            buffer,
-            as_attachment=True,
-            download_name=f"Progres_{student.username}.pdf",
-            mimetype="application/pdf"
-        )
+    # ==============================================
+    # GURU: METRIK INTERNAL (TUNING)
+    # ==============================================
+    @app.route("/teacher/metrics")
+    @login_required
+    def runtime_metrics():
+        if current_user.role != Role.teacher:
+            abort(403)
+
+        return jsonify({
+            "answer_buffer": answer_buffer.stats() if answer_buffer else None,
+            "quiz_start": start_gate.stats(),
+            "quiz_codes": code_index.stats(),
+            "deadline_sweeper": sweeper.stats,
+            "leaderboard": top_scores.stats(),
+            "reports": reports.stats(),
+            "progress_feed": progress_feed.stats(),
+            "sqlite": sqlite_pragmas,
+            "writes": writes.stats(),
+            "read_routing": reads.stats(),
+        })
 
 
 
@@ -0,0 +1,272 @@
+"""Benchmark query-query utama sebelum dan sesudah indeks komposit.
+
+Membuat database SQLite sementara dari metadata model, mengisinya dengan
+data besar, lalu menjalankan setiap query panas dua kali: tanpa indeks
+``ix_*`` (kondisi sebelum migrasi 1b3d5f7a9c20) dan dengan indeks tersebut.
+Untuk setiap query dicatat ``EXPLAIN QUERY PLAN`` dan median waktu (ms).
+
+Pemakaian:
+    python bench_queries.py [--students N] [--quizzes N] [--questions N]
+                            [--repeat N] [--db PATH] [--output FILE]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+
+from extensions import db
+import models  # noqa: F401  (mendaftarkan tabel ke metadata)
+
+
+# -----------------------------
+# QUERY PANAS (SAMA DENGAN POLA DI app.py / MODUL LAYANAN)
+# -----------------------------
+QUERIES = [
+    ("start_quiz: percobaan siswa di quiz", """
+        SELECT id, finished_at FROM submission
+        WHERE quiz_id = :quiz_id AND user_id = :user_id
+        ORDER BY started_at DESC
+    """),
+    ("hasil quiz: submission selesai", """
+        SELECT user_id, score, finished_at FROM submission
+        WHERE quiz_id = :quiz_id AND finished_at IS NOT NULL
+        ORDER BY finished_at
+    """),
+    ("progres: percobaan terakhir satu siswa", """
+        SELECT quiz_id, answered_count, finished_at, score FROM (
+            SELECT quiz_id, answered_count, finished_at, score,
+                   ROW_NUMBER() OVER (PARTITION BY user_id, quiz_id
+                                      ORDER BY started_at DESC, id DESC) AS rn
+            FROM submission WHERE user_id = :user_id
+        ) WHERE rn = 1
+    """),
+    ("peringkat: nilai terbaik per quiz", """
+        SELECT user_id, MAX(score) FROM submission
+        WHERE quiz_id = :quiz_id AND finished_at IS NOT NULL
+        GROUP BY user_id ORDER BY 2 DESC LIMIT 20
+    """),
+    ("leaderboard global top 20", """
+        SELECT id, user_id, quiz_id, score FROM submission
+        WHERE score IS NOT NULL
+        ORDER BY score DESC, finished_at ASC LIMIT 20
+    """),
+    ("dashboard: riwayat siswa", """
+        SELECT id, quiz_id, score, finished_at FROM submission
+        WHERE user_id = :user_id AND finished_at IS NOT NULL
+        ORDER BY finished_at DESC
+    """),
+    ("sweeper: submission lewat batas waktu", """
+        SELECT id FROM submission
+        WHERE finished_at IS NULL AND deadline_at < :now
+        ORDER BY id LIMIT 500
+    """),
+    ("snapshot: soal quiz", """
+        SELECT id, text FROM question WHERE quiz_id = :quiz_id ORDER BY id
+    """),
+    ("snapshot: pilihan soal", """
+        SELECT c.id, c.question_id, c.is_correct FROM choice c
+        JOIN question q ON q.id = c.question_id
+        WHERE q.quiz_id = :quiz_id
+    """),
+    ("indeks kode quiz terbit", """
+        SELECT code, id FROM quiz WHERE published = 1
+    """),
+    ("analisis butir: jawaban submission selesai", """
+        SELECT a.submission_id, a.question_id, a.choice_id FROM answer a
+        JOIN submission s ON s.id = a.submission_id
+        WHERE s.quiz_id = :quiz_id AND s.finished_at IS NOT NULL
+    """),
+]
+
+
+# -----------------------------
+# SKEMA & DATA
+# -----------------------------
+def _ts(value):
+    # Format penyimpanan DateTime SQLAlchemy di SQLite
+    return value.strftime("%Y-%m-%d %H:%M:%S.%f")
+
+
+def create_schema(path):
+    engine = create_engine("sqlite:///" + path)
+    db.metadata.create_all(engine)
+    engine.dispose()
+
+
+def seed(conn, students, quizzes, questions, choices=4, seed_value=42):
+    rnd = random.Random(seed_value)
+    now = datetime.utcnow()
+
+    conn.executemany(
+        "INSERT INTO user (id, username, role, created_at) VALUES (?, ?, 'student', ?)",
+        [(i, "siswa%05d" % i, _ts(now)) for i in range(1, students + 1)],
+    )
+    conn.executemany(
+        "INSERT INTO quiz (id, title, code, duration, published, batch_mode, version, question_count, created_at)"
+        " VALUES (?, ?, ?, 600, ?, 0, 0, ?, ?)",
+        [(q, "Quiz %d" % q, "KODE%04d" % q, int(q % 5 != 0), questions, _ts(now))
+         for q in range(1, quizzes + 1)],
+    )
+
+    question_rows, choice_rows, correct = [], [], {}
+    qid = cid = 0
+    quiz_questions = {}
+    for quiz_id in range(1, quizzes + 1):
+        quiz_questions[quiz_id] = []
+        for _ in range(questions):
+            qid += 1
+            question_rows.append((qid, "Soal %d" % qid, quiz_id))
+            quiz_questions[quiz_id].append(qid)
+            right = rnd.randrange(choices)
+            for k in range(choices):
+                cid += 1
+                choice_rows.append((cid, qid, "Pilihan %d" % k, int(k == right)))
+                if k == right:
+                    correct[qid] = cid
+    conn.executemany("INSERT INTO question (id, text, quiz_id) VALUES (?, ?, ?)", question_rows)
+    conn.executemany("INSERT INTO choice (id, question_id, text, is_correct) VALUES (?, ?, ?, ?)", choice_rows)
+
+    submission_rows, answer_rows = [], []
+    sid = aid = 0
+    for user_id in range(1, students + 1):
+        for quiz_id in rnd.sample(range(1, quizzes + 1), max(1, quizzes // 2)):
+            for _ in range(rnd.choice((1, 1, 2))):
+                sid += 1
+                started = now - timedelta(days=rnd.randrange(90), seconds=rnd.randrange(86400))
+                deadline = started + timedelta(seconds=600)
+                unfinished = rnd.random() < 0.05
+                answered = right_count = 0
+                for question_id in quiz_questions[quiz_id]:
+                    first = (question_id - 1) * choices + 1
+                    choice_id = rnd.randrange(first, first + choices)
+                    aid += 1
+                    answer_rows.append((aid, sid, question_id, choice_id))
+                    answered += 1
+                    right_count += choice_id == correct[question_id]
+                finished = None if unfinished else _ts(started + timedelta(seconds=rnd.randrange(60, 600)))
+                score = None if unfinished else round(right_count * 100.0 / questions, 2)
+                submission_rows.append((
+                    sid, user_id, quiz_id, _ts(started), finished, _ts(deadline),
+                    score, answered, right_count, rnd.randrange(1 << 30),
+                ))
+    conn.executemany(
+        "INSERT INTO submission (id, user_id, quiz_id, started_at, finished_at, deadline_at,"
+        " score, answered_count, correct_count, order_seed) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        submission_rows,
+    )
+    conn.executemany(
+        "INSERT INTO answer (id, submission_id, question_id, choice_id) VALUES (?, ?, ?, ?)",
+        answer_rows,
+    )
+    conn.commit()
+    return {"submission": sid, "answer": aid, "question": qid, "choice": cid}
+
+
+def index_sql(conn):
+    """Indeks non-unik dari metadata (yang ditambahkan oleh migrasi)."""
+    rows = conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND name LIKE 'ix_%'"
+    ).fetchall()
+    unique = {
+        index.name for table in db.metadata.tables.values()
+        for index in table.indexes if index.unique
+    }
+    return [(name, sql) for name, sql in rows if name not in unique and sql]
+
+
+# -----------------------------
+# PENGUKURAN
+# -----------------------------
+def plan(conn, sql, params):
+    return [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+
+
+def timing(conn, sql, params, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        conn.execute(sql, params).fetchall()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def run(conn, params, repeat):
+    return {
+        name: (plan(conn, sql, params), timing(conn, sql, params, repeat))
+        for name, sql in QUERIES
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=2000)
+    parser.add_argument("--quizzes", type=int, default=20)
+    parser.add_argument("--questions", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=15)
+    parser.add_argument("--db", help="path database (default: file sementara)")
+    parser.add_argument("--output", help="tulis laporan juga ke file ini")
+    args = parser.parse_args(argv)
+
+    path = args.db or os.path.join(tempfile.mkdtemp(), "bench.db")
+    if os.path.exists(path):
+        os.remove(path)
+    create_schema(path)
+    conn = sqlite3.connect(path)
+
+    lines = []
+
+    def out(text=""):
+        print(text)
+        lines.append(text)
+
+    start = time.perf_counter()
+    counts = seed(conn, args.students, args.quizzes, args.questions)
+    out("Database : %s" % path)
+    out("Data     : %d siswa, %d quiz, %d soal, %d pilihan, %d submission, %d jawaban (%.1f s)" % (
+        args.students, args.quizzes, counts["question"], counts["choice"],
+        counts["submission"], counts["answer"], time.perf_counter() - start))
+
+    params = {
+        "quiz_id": 1,
+        "user_id": args.students // 2 or 1,
+        "now": _ts(datetime.utcnow()),
+    }
+
+    indexes = index_sql(conn)
+    for name, _sql in indexes:
+        conn.execute('DROP INDEX "%s"' % name)
+    conn.execute("ANALYZE")
+    before = run(conn, params, args.repeat)
+
+    for _name, sql in indexes:
+        conn.execute(sql)
+    conn.execute("ANALYZE")
+    after = run(conn, params, args.repeat)
+    conn.close()
+
+    out("Indeks   : %s" % ", ".join(sorted(name for name, _sql in indexes)))
+    out()
+    for name, _sql in QUERIES:
+        plan_before, ms_before = before[name]
+        plan_after, ms_after = after[name]
+        out("== %s" % name)
+        out("   sebelum %8.2f ms | %s" % (ms_before, "; ".join(plan_before)))
+        out("   sesudah %8.2f ms | %s" % (ms_after, "; ".join(plan_after)))
+        out("   percepatan x%.1f" % (ms_before / ms_after if ms_after else float("inf")))
+        out()
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
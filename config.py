@@ -8,5 +8,81 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or \
         'sqlite:///' + os.path.join(basedir, 'app.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Pool koneksi per proses worker gunicorn (thread request + thread latar)
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE') or 5)
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW') or 5)
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT') or 10)
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE') or 3600)
+
+    # Profil SQLite produksi: pragma dipasang di setiap koneksi baru.
+    # WAL + synchronous=NORMAL: pembaca tidak memblokir penulis, fsync hanya saat checkpoint.
+    SQLITE_PROFILE = os.environ.get('SQLITE_PROFILE', '1') == '1'
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE') or 'WAL'
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS') or 'NORMAL'
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS') or 5000)
+    SQLITE_CACHE_SIZE_KB = int(os.environ.get('SQLITE_CACHE_SIZE_KB') or 32768)  # per koneksi
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE') or 256 * 1024 * 1024)
+    SQLITE_FOREIGN_KEYS = os.environ.get('SQLITE_FOREIGN_KEYS', '1') == '1'
+    SQLITE_WAL_AUTOCHECKPOINT = int(os.environ.get('SQLITE_WAL_AUTOCHECKPOINT') or 1000)  # halaman
     UPLOAD_FOLDER = os.path.join(basedir, 'static', 'uploads')
     MAX_CONTENT_LENGTH = 50 * 1024 * 1024  # 50 MB
+    UPLOAD_CACHE_MAX_AGE = int(os.environ.get('UPLOAD_CACHE_MAX_AGE') or 3600)  # detik
+
+    # Write-behind jawaban: insert Answer dikumpulkan lalu di-commit per batch.
+    # Antrian berlaku per worker. ANSWER_BUFFER_WAIT=1 membuat request menunggu
+    # batch-nya ter-commit (group commit) sehingga aman walau request berikutnya
+    # jatuh ke worker lain; dengan WEB_CONCURRENCY > 1 opsi ini selalu dipaksa aktif.
+    ANSWER_WRITE_BEHIND = os.environ.get('ANSWER_WRITE_BEHIND', '0') == '1'
+    ANSWER_FLUSH_INTERVAL_MS = int(os.environ.get('ANSWER_FLUSH_INTERVAL_MS') or 50)
+    ANSWER_FLUSH_MAX_ROWS = int(os.environ.get('ANSWER_FLUSH_MAX_ROWS') or 200)
+    ANSWER_BUFFER_WAIT = os.environ.get('ANSWER_BUFFER_WAIT', '1') == '1'
+    # Jumlah worker gunicorn (diisi gunicorn.conf.py lewat raw_env)
+    WEB_CONCURRENCY = int(os.environ.get('WEB_CONCURRENCY') or 1)
+
+    # Admission control untuk start_quiz (per worker) & pre-warm snapshot quiz
+    QUIZ_START_CONCURRENCY = int(os.environ.get('QUIZ_START_CONCURRENCY') or 8)
+    QUIZ_START_MAX_WAIT = float(os.environ.get('QUIZ_START_MAX_WAIT') or 5)
+    QUIZ_START_SHARED = os.environ.get('QUIZ_START_SHARED', '1') == '1'  # batas lintas worker (lock file)
+    QUIZ_PREWARM = os.environ.get('QUIZ_PREWARM', '1') == '1'
+
+    # Tulis saat SQLite terkunci (register, mulai quiz, jawab soal): retry dengan
+    # backoff ber-jitter dalam batas waktu; WRITE_SINGLE_WRITER=1 = satu penulis lintas worker
+    WRITE_RETRY_ATTEMPTS = int(os.environ.get('WRITE_RETRY_ATTEMPTS') or 6)
+    WRITE_RETRY_BASE_MS = int(os.environ.get('WRITE_RETRY_BASE_MS') or 20)
+    WRITE_RETRY_MAX_MS = int(os.environ.get('WRITE_RETRY_MAX_MS') or 500)
+    WRITE_MAX_WAIT = float(os.environ.get('WRITE_MAX_WAIT') or 8)
+    WRITE_SINGLE_WRITER = os.environ.get('WRITE_SINGLE_WRITER', '0') == '1'
+
+    # Penanda versi lintas worker (indeks kode quiz, leaderboard, dll.)
+    STAMP_DIR = os.environ.get('STAMP_DIR') or os.path.join(basedir, 'instance', 'stamps')
+    QUIZ_CODE_NEGATIVE_TTL = int(os.environ.get('QUIZ_CODE_NEGATIVE_TTL') or 30)
+    LEADERBOARD_SIZE = int(os.environ.get('LEADERBOARD_SIZE') or 20)
+
+    # Feed progres quiz (SSE): interval cek lintas worker & umur maksimal satu stream.
+    # Satu stream menahan satu thread, jadi butuh worker gthread (gunicorn.conf.py)
+    PROGRESS_FEED_INTERVAL = float(os.environ.get('PROGRESS_FEED_INTERVAL') or 2)
+    PROGRESS_FEED_MAX_AGE = int(os.environ.get('PROGRESS_FEED_MAX_AGE') or 120)
+
+    # Batas waktu quiz: toleransi jaringan & interval sweeper (0 = thread mati)
+    QUIZ_DEADLINE_GRACE = int(os.environ.get('QUIZ_DEADLINE_GRACE') or 5)
+    DEADLINE_SWEEP_INTERVAL = int(os.environ.get('DEADLINE_SWEEP_INTERVAL') or 30)
+
+    # Laporan PDF: cache di disk, process pool (0 = render di request), batas tunggu
+    REPORT_CACHE_DIR = os.environ.get('REPORT_CACHE_DIR') or os.path.join(basedir, 'instance', 'reports')
+    REPORT_WORKERS = int(os.environ.get('REPORT_WORKERS') or 2)
+    REPORT_WAIT = float(os.environ.get('REPORT_WAIT') or 10)
+    # Versi lama PDF dihapus setelah tidak dipakai selama ini (detik)
+    REPORT_KEEP = int(os.environ.get('REPORT_KEEP') or 3600)
+
+    # Opt-in (REPORT_READ_ROUTING=1): laporan guru dibaca dari replika
+    # (REPORT_REPLICA_URL) atau snapshot SQLite yang disegarkan berkala, jadi
+    # bisa tertinggal sampai REPORT_MAX_STALENESS detik; lebih tua = database utama
+    REPORT_READ_ROUTING = os.environ.get('REPORT_READ_ROUTING', '0') == '1'
+    REPORT_REPLICA_URL = os.environ.get('REPORT_REPLICA_URL')
+    REPORT_SNAPSHOT_PATH = os.environ.get('REPORT_SNAPSHOT_PATH') or os.path.join(basedir, 'instance', 'report_snapshot.db')
+    REPORT_SNAPSHOT_REFRESH = int(os.environ.get('REPORT_SNAPSHOT_REFRESH') or 30)
+    REPORT_MAX_STALENESS = int(os.environ.get('REPORT_MAX_STALENESS') or 120)
+
+    # Ekspor CSV/TSV: jumlah baris per potongan cursor server-side
+    EXPORT_CHUNK_ROWS = int(os.environ.get('EXPORT_CHUNK_ROWS') or 1000)
@@ -0,0 +1,103 @@
+from sqlalchemy import case, func, select
+
+import rollup
+from extensions import db
+from models import Answer, Choice, Question, Quiz, Submission
+
+
+# -----------------------------
+# COUNTER TERDENORMALISASI
+# -----------------------------
+def _question_total():
+    return (
+        select(func.count(Question.id))
+        .where(Question.quiz_id == Quiz.id)
+        .scalar_subquery()
+    )
+
+
+def recount_questions(quiz_ids):
+    """Hitung ulang Quiz.question_count untuk quiz tertentu. Commit di pemanggil."""
+    quiz_ids = [qid for qid in set(quiz_ids) if qid is not None]
+    if quiz_ids:
+        db.session.execute(
+            Quiz.__table__.update()
+            .where(Quiz.id.in_(quiz_ids))
+            .values(question_count=_question_total())
+        )
+
+
+def _answer_totals():
+    """(answered, correct) per submission; jawaban yang soalnya sudah dihapus tidak dihitung."""
+    answered = (
+        select(func.count(Answer.id))
+        .where(Answer.submission_id == Submission.id, Answer.question_id.isnot(None))
+        .scalar_subquery()
+    )
+    correct = (
+        select(func.count(Answer.id))
+        .join(Choice, Choice.id == Answer.choice_id)
+        .where(Answer.submission_id == Submission.id, Choice.is_correct == True)
+        .scalar_subquery()
+    )
+    return answered, correct
+
+
+def detach_answers(question_ids):
+    """Lepas jawaban siswa dari soal yang akan dihapus. Commit di pemanggil.
+
+    Baris jawaban tetap disimpan, tetapi tidak lagi dihitung: counter
+    submission yang terdampak dihitung ulang dengan aturan repair_counters,
+    dan rollup mingguan submission yang sudah selesai ikut dikurangi.
+    """
+    question_ids = [qid for qid in set(question_ids) if qid is not None]
+    if not question_ids:
+        return
+    affected = db.session.execute(
+        select(
+            Submission.id,
+            Submission.quiz_id,
+            Submission.finished_at,
+            func.count(Answer.id),
+            func.coalesce(func.sum(case((Choice.is_correct == True, 1), else_=0)), 0),
+        )
+        .join(Answer, Answer.submission_id == Submission.id)
+        .outerjoin(Choice, Choice.id == Answer.choice_id)
+        .where(Answer.question_id.in_(question_ids))
+        .group_by(Submission.id, Submission.quiz_id, Submission.finished_at)
+    ).all()
+    if not affected:
+        return
+
+    db.session.execute(
+        Answer.__table__.update()
+        .where(Answer.question_id.in_(question_ids))
+        .values(question_id=None, choice_id=None)
+    )
+    answered, correct = _answer_totals()
+    db.session.execute(
+        Submission.__table__.update()
+        .where(Submission.id.in_([row[0] for row in affected]))
+        .values(answered_count=answered, correct_count=correct)
+    )
+    rollup.remove_answers([row[1:] for row in affected if row.finished_at is not None])
+
+
+def repair_counters():
+    """Samakan semua counter dengan isi tabel; kembalikan jumlah baris yang diperbaiki."""
+    question_total = _question_total()
+    fixed_quiz = db.session.execute(
+        Quiz.__table__.update()
+        .where(Quiz.question_count != question_total)
+        .values(question_count=question_total)
+    ).rowcount
+
+    answered, correct = _answer_totals()
+    fixed_submission = db.session.execute(
+        Submission.__table__.update()
+        .where((Submission.answered_count != answered) | (Submission.correct_count != correct))
+        .values(answered_count=answered, correct_count=correct)
+    ).rowcount
+
+    db.session.commit()
+    return {"quiz": fixed_quiz, "submission": fixed_submission}
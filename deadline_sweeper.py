@@ -0,0 +1,149 @@
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from threading import Thread
+
+from sqlalchemy import case, select
+
+from extensions import db
+from models import Quiz, Submission
+from scoring import close_returning
+import rollup
+
+try:
+    import fcntl
+except ImportError:  # Windows (development)
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+# -----------------------------
+# BATAS WAKTU SUBMISSION
+# -----------------------------
+def compute_deadline(started_at, duration):
+    return started_at + timedelta(seconds=duration or 600)
+
+
+def is_expired(submission, grace=0, now=None):
+    """Cek murah tanpa query: cukup kolom deadline_at yang sudah dimuat."""
+    if submission.deadline_at is None:
+        return False
+    now = now or datetime.utcnow()
+    return now > submission.deadline_at + timedelta(seconds=grace)
+
+
+def sweep_expired(grace=0, batch_size=500, now=None):
+    """Tutup semua submission yang lewat batas waktu dengan UPDATE per batch.
+
+    Nilai dihitung dari counter jawaban yang tersimpan; finished_at diisi
+    dengan deadline_at. Mengembalikan daftar id submission yang ditutup.
+    """
+    cutoff = (now or datetime.utcnow()) - timedelta(seconds=grace)
+    sub = Submission.__table__
+
+    total_soal = (
+        select(Quiz.question_count)
+        .where(Quiz.id == sub.c.quiz_id)
+        .scalar_subquery()
+    )
+    score = case(
+        (total_soal > 0, sub.c.correct_count * 100.0 / total_soal),
+        else_=0
+    )
+
+    swept = []
+    while True:
+        rows = db.session.execute(
+            select(sub.c.id, sub.c.quiz_id, sub.c.deadline_at, sub.c.answered_count, sub.c.correct_count)
+            .where(sub.c.finished_at.is_(None), sub.c.deadline_at < cutoff)
+            .order_by(sub.c.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        ids = [row.id for row in rows]
+
+        # Hanya baris yang benar-benar ditutup di sini (bukan oleh request yang
+        # balapan) yang masuk rekap mingguan
+        closed = close_returning(
+            sub.update()
+            .where(sub.c.id.in_(ids), sub.c.finished_at.is_(None))
+            .values(finished_at=sub.c.deadline_at, score=score),
+            sub.c.id, sub.c.quiz_id, sub.c.deadline_at, sub.c.answered_count, sub.c.correct_count
+        )
+        # Rekap mingguan ditulis di transaksi batch yang sama
+        rollup.add_finished_many(
+            (row.quiz_id, row.deadline_at, row.answered_count, row.correct_count) for row in closed
+        )
+        db.session.commit()
+        swept.extend(row.id for row in closed)
+        if len(ids) < batch_size:
+            break
+
+    return swept
+
+
+# -----------------------------
+# SWEEPER LATAR BELAKANG
+# -----------------------------
+class DeadlineSweeper:
+    """Thread per worker yang menjalankan sweep_expired setiap `interval` detik.
+
+    Lock file memastikan hanya satu worker yang menyapu pada satu waktu.
+    Buffer jawaban berlaku per worker, jadi setiap worker mem-flush buffer-nya
+    sendiri setiap putaran, juga saat worker lain yang sedang menyapu.
+    `on_swept(ids)` dipanggil setelah ada submission yang ditutup.
+    """
+
+    def __init__(self, app, interval, lock_path, grace=0, on_swept=None):
+        self.app = app
+        self.interval = interval
+        self.lock_path = lock_path
+        self.grace = grace
+        self.on_swept = on_swept
+        self._pid = None
+        self.stats = {"runs": 0, "swept": 0, "last_run_ms": 0.0, "skipped_locked": 0}
+
+    def ensure_started(self):
+        if self.interval <= 0 or self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        Thread(target=self._run, name="deadline-sweeper", daemon=True).start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("Sweep submission kedaluwarsa gagal")
+
+    def run_once(self):
+        buffer = self.app.extensions.get("answer_buffer")
+        if buffer:
+            try:
+                buffer.flush()
+            except Exception:
+                # Batch terkunci sudah dikembalikan ke antrian; sweep tetap jalan
+                logger.warning("Flush answer buffer sebelum sweep gagal", exc_info=True)
+
+        with open(self.lock_path, "a") as lock_file:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    self.stats["skipped_locked"] += 1
+                    return []
+
+            started = time.perf_counter()
+            with self.app.app_context():
+                swept = sweep_expired(grace=self.grace)
+                if swept and self.on_swept:
+                    self.on_swept(swept)
+
+            self.stats["runs"] += 1
+            self.stats["swept"] += len(swept)
+            self.stats["last_run_ms"] = round((time.perf_counter() - started) * 1000, 3)
+            return swept
@@ -1,3 +1,6 @@
 from flask_sqlalchemy import SQLAlchemy
 
-db = SQLAlchemy()
+from read_routing import RoutingSession
+
+# SELECT bisa diarahkan ke replika/snapshot laporan (lihat read_routing.py)
+db = SQLAlchemy(session_options={"class_": RoutingSession})
@@ -0,0 +1,23 @@
+import os
+
+# -----------------------------
+# KONFIGURASI GUNICORN (PRODUKSI)
+# -----------------------------
+# Worker gthread: satu proses melayani banyak request sekaligus. Wajib untuk
+# feed progres guru (SSE), yang menahan satu thread sampai PROGRESS_FEED_MAX_AGE
+# detik; dengan worker sync satu halaman progres yang terbuka memblokir semua
+# siswa. Total koneksi SSE bersamaan yang aman < workers x threads.
+#
+# Pool database (DB_POOL_SIZE + DB_MAX_OVERFLOW) berlaku per worker dan
+# sebaiknya >= threads. QUIZ_START_CONCURRENCY berlaku untuk semua worker.
+# Job ekspor PDF disimpan di REPORT_CACHE_DIR, jadi folder itu harus dipakai
+# bersama semua worker.
+bind = "0.0.0.0:" + os.environ.get("PORT", "8000")
+worker_class = "gthread"
+workers = int(os.environ.get("WEB_CONCURRENCY") or 2)
+# Jumlah worker diteruskan ke app (Config.WEB_CONCURRENCY): buffer jawaban
+# per worker wajib menunggu commit bila worker lebih dari satu
+raw_env = ["WEB_CONCURRENCY=%d" % workers]
+threads = int(os.environ.get("GUNICORN_THREADS") or 8)
+timeout = int(os.environ.get("GUNICORN_TIMEOUT") or 60)
+keepalive = 5
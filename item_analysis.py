@@ -0,0 +1,139 @@
+from threading import Lock
+
+import numpy as np
+from sqlalchemy import func, select
+
+from extensions import db
+from models import Answer, Submission
+from quiz_cache import get_snapshot
+
+
+# -----------------------------
+# MATRIKS JAWABAN (SUBMISSION x SOAL)
+# -----------------------------
+UNANSWERED = -1
+
+
+def load_matrix(quiz_id, snapshot):
+    """Muat semua jawaban submission selesai sebagai matriks indeks pilihan.
+
+    Baris = submission, kolom = soal (urutan snapshot), isi = posisi pilihan
+    di soal itu atau -1 bila tidak dijawab. Cukup satu query.
+    """
+    col_of_question = {q.id: j for j, q in enumerate(snapshot.questions)}
+    pos_of_choice = {c.id: i for q in snapshot.questions for i, c in enumerate(q.choices)}
+
+    rows = db.session.execute(
+        select(Answer.submission_id, Answer.question_id, Answer.choice_id)
+        .join(Submission, Submission.id == Answer.submission_id)
+        .where(Submission.quiz_id == quiz_id, Submission.finished_at.isnot(None))
+        .order_by(Answer.submission_id, Answer.id)
+    ).all()
+
+    n_questions = len(snapshot.questions)
+    if not rows or not n_questions:
+        return np.full((0, n_questions), UNANSWERED, dtype=np.int16)
+
+    data = np.array([
+        (sid, col_of_question.get(qid, -1), pos_of_choice.get(cid, -1))
+        for sid, qid, cid in rows
+    ], dtype=np.int64)
+    # Jawaban untuk soal yang sudah dihapus dari quiz diabaikan
+    data = data[data[:, 1] >= 0]
+
+    _, row_idx = np.unique(data[:, 0], return_inverse=True)
+    matrix = np.full((row_idx.max() + 1 if len(row_idx) else 0, n_questions), UNANSWERED, dtype=np.int16)
+    # Jawaban terakhir per (submission, soal) menang karena urutan Answer.id
+    matrix[row_idx, data[:, 1]] = data[:, 2]
+    return matrix
+
+
+# -----------------------------
+# STATISTIK BUTIR SOAL
+# -----------------------------
+def analyze(snapshot, matrix):
+    """Hitung p-value, point-biserial (skor sisa) dan sebaran pilihan tiap soal."""
+    n_students, n_questions = matrix.shape
+    max_choices = max((len(q.choices) for q in snapshot.questions), default=0)
+    correct_pos = np.array([
+        next((i for i, c in enumerate(q.choices) if c.is_correct), UNANSWERED)
+        for q in snapshot.questions
+    ], dtype=np.int16)
+
+    correct = (matrix == correct_pos) & (matrix != UNANSWERED)
+    X = correct.astype(np.float64)
+
+    if n_students:
+        p_value = X.mean(axis=0)
+        # Korelasi item dengan skor total tanpa item itu sendiri
+        rest = X.sum(axis=1, keepdims=True) - X
+        xc = X - X.mean(axis=0)
+        rc = rest - rest.mean(axis=0)
+        denom = np.sqrt((xc ** 2).sum(axis=0) * (rc ** 2).sum(axis=0))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            point_biserial = np.where(denom > 0, (xc * rc).sum(axis=0) / denom, np.nan)
+    else:
+        p_value = np.full(n_questions, np.nan)
+        point_biserial = np.full(n_questions, np.nan)
+
+    # Sebaran pilihan: bincount di atas indeks gabungan (soal, pilihan)
+    answered = matrix != UNANSWERED
+    cols = np.broadcast_to(np.arange(n_questions), matrix.shape)[answered]
+    flat = cols * max(max_choices, 1) + matrix[answered]
+    counts = np.bincount(flat, minlength=n_questions * max(max_choices, 1)).reshape(n_questions, -1)
+    skipped = n_students - answered.sum(axis=0)
+
+    items = []
+    for j, q in enumerate(snapshot.questions):
+        choices = []
+        for i, c in enumerate(q.choices):
+            n = int(counts[j, i])
+            choices.append({
+                "text": c.text,
+                "is_correct": c.is_correct,
+                "count": n,
+                "percent": (n / n_students * 100) if n_students else 0.0,
+            })
+        items.append({
+            "question_id": q.id,
+            "text": q.text,
+            "p_value": None if np.isnan(p_value[j]) else float(p_value[j]),
+            "point_biserial": None if np.isnan(point_biserial[j]) else float(point_biserial[j]),
+            "skipped": int(skipped[j]),
+            "choices": choices,
+        })
+    return {"students": n_students, "items": items}
+
+
+# -----------------------------
+# CACHE PER VERSI DATA QUIZ
+# -----------------------------
+_results = {}
+_lock = Lock()
+
+
+def _data_version(quiz):
+    count, last = db.session.execute(
+        select(func.count(Submission.id), func.max(Submission.finished_at))
+        .where(Submission.quiz_id == quiz.id, Submission.finished_at.isnot(None))
+    ).one()
+    return (quiz.version or 0, count, last)
+
+
+def get_item_analysis(quiz):
+    """Analisis butir soal quiz, dihitung ulang hanya jika soal atau hasil berubah."""
+    key = _data_version(quiz)
+    cached = _results.get(quiz.id)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    snapshot = get_snapshot(quiz)
+    result = analyze(snapshot, load_matrix(quiz.id, snapshot))
+    with _lock:
+        _results[quiz.id] = (key, result)
+    return result
+
+
+def invalidate(quiz_id):
+    with _lock:
+        _results.pop(quiz_id, None)
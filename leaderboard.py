@@ -0,0 +1,205 @@
+from bisect import insort
+from collections import namedtuple
+from datetime import datetime
+from threading import Lock
+
+from sqlalchemy import func, select
+
+from extensions import db
+from models import Quiz, Submission, User
+
+
+# -----------------------------
+# ENTRI LEADERBOARD
+# -----------------------------
+LeaderboardEntry = namedtuple("LeaderboardEntry", [
+    "submission_id", "user_id", "username", "quiz_id", "quiz_title",
+    "category_id", "score", "finished_at"
+])
+
+GLOBAL = ("global", None)
+
+
+def _sort_key(entry):
+    # Skor tertinggi dulu, lalu yang selesai lebih awal
+    return (-entry.score, entry.finished_at or datetime.max, entry.submission_id)
+
+
+def _scopes_of(entry):
+    yield GLOBAL
+    yield ("quiz", entry.quiz_id)
+    if entry.category_id is not None:
+        yield ("category", entry.category_id)
+
+
+class _Board:
+    """Top-K terurut untuk satu scope; opsional satu entri terbaik per user."""
+
+    __slots__ = ("k", "best_per_user", "keys", "entries")
+
+    def __init__(self, k, best_per_user, entries=()):
+        self.k = k
+        self.best_per_user = best_per_user
+        self.keys = []
+        self.entries = []
+        for entry in entries:
+            self.add(entry)
+
+    def add(self, entry):
+        key = _sort_key(entry)
+        if len(self.keys) >= self.k and key >= self.keys[-1]:
+            return
+
+        if self.best_per_user:
+            for i, existing in enumerate(self.entries):
+                if existing.user_id == entry.user_id:
+                    if self.keys[i] <= key:
+                        return
+                    del self.keys[i]
+                    del self.entries[i]
+                    break
+
+        insort(self.keys, key)
+        self.entries.insert(self.keys.index(key), entry)
+        del self.keys[self.k:]
+        del self.entries[self.k:]
+
+
+# -----------------------------
+# LAYANAN LEADERBOARD PER WORKER
+# -----------------------------
+class LeaderboardService:
+    """Top-K per scope (global, per quiz, per kategori) yang disimpan di memori.
+
+    Papan dimuat dari database saat pertama diminta, lalu diperbarui secara
+    inkremental lewat record() setiap submission selesai. Worker lain tahu
+    ada perubahan dari VersionStamp dan memuat ulang papannya.
+    """
+
+    def __init__(self, stamp, k=20):
+        self.stamp = stamp
+        self.k = k
+        self._lock = Lock()
+        self._boards = {}
+        self._version = None
+        self._stats = {"hits": 0, "loads": 0, "records": 0, "resets": 0}
+
+    def top(self, scope=GLOBAL, best_per_user=False):
+        """Daftar LeaderboardEntry terurut, paling banyak k entri."""
+        self._check_version()
+        board = self._boards.get((scope, best_per_user))
+        if board is None:
+            version = self._version
+            board = _Board(self.k, best_per_user, self._load(scope, best_per_user))
+            with self._lock:
+                # Ada record() selama query berjalan: hasil ini mungkin tertinggal
+                if version == self._version:
+                    self._boards[(scope, best_per_user)] = board
+                self._stats["loads"] += 1
+        else:
+            self._stats["hits"] += 1
+        return list(board.entries)
+
+    def record(self, submission):
+        """Masukkan submission yang baru selesai. Dipanggil setelah commit."""
+        if submission.score is None:
+            return
+        quiz = submission.quiz
+        entry = LeaderboardEntry(
+            submission.id, submission.user_id, submission.user.username,
+            quiz.id, quiz.title, quiz.category_id,
+            float(submission.score), submission.finished_at
+        )
+        self._check_version()
+        with self._lock:
+            for scope in _scopes_of(entry):
+                for best_per_user in (False, True):
+                    board = self._boards.get((scope, best_per_user))
+                    if board is not None:
+                        board.add(entry)
+            self._stats["records"] += 1
+        self._bump()
+
+    def invalidate(self):
+        """Buang semua papan (mis. setelah quiz dihapus atau sweep); semua worker memuat ulang."""
+        with self._lock:
+            self._boards = {}
+        self._bump()
+
+    def rebuild(self):
+        """Muat ulang papan global dari database, dipakai saat worker mulai."""
+        with self._lock:
+            self._boards = {}
+            self._version = self.stamp.current()
+        self.top(GLOBAL)
+
+    def stats(self):
+        data = dict(self._stats)
+        data["boards"] = len(self._boards)
+        data["k"] = self.k
+        return data
+
+    def _bump(self):
+        # Perubahan sendiri sudah diterapkan; jangan muat ulang karena bump ini
+        seen = self.stamp.current()
+        self.stamp.bump()
+        with self._lock:
+            if seen == self._version:
+                self._version = self.stamp.current()
+
+    def _check_version(self):
+        version = self.stamp.current()
+        if version == self._version:
+            return
+        with self._lock:
+            if version != self._version:
+                self._boards = {}
+                self._version = version
+                self._stats["resets"] += 1
+
+    def _load(self, scope, best_per_user):
+        kind, scope_id = scope
+        base = (
+            select(
+                Submission.id.label("submission_id"),
+                Submission.user_id,
+                User.username,
+                Quiz.id.label("quiz_id"),
+                Quiz.title.label("quiz_title"),
+                Quiz.category_id,
+                Submission.score,
+                Submission.finished_at,
+            )
+            .join(User, Submission.user_id == User.id)
+            .join(Quiz, Submission.quiz_id == Quiz.id)
+            .where(Submission.score.isnot(None))
+        )
+        if kind == "quiz":
+            base = base.where(Quiz.id == scope_id)
+        elif kind == "category":
+            base = base.where(Quiz.category_id == scope_id)
+
+        if best_per_user:
+            # Satu percobaan terbaik per user dengan ROW_NUMBER
+            rn = func.row_number().over(
+                partition_by=Submission.user_id,
+                order_by=(Submission.score.desc(), Submission.finished_at.asc(), Submission.id.asc())
+            ).label("rn")
+            ranked = base.add_columns(rn).subquery()
+            stmt = (
+                select(*[ranked.c[name] for name in LeaderboardEntry._fields])
+                .where(ranked.c.rn == 1)
+                .order_by(ranked.c.score.desc(), ranked.c.finished_at.asc(), ranked.c.submission_id.asc())
+                .limit(self.k)
+            )
+        else:
+            stmt = (
+                base
+                .order_by(Submission.score.desc(), Submission.finished_at.asc(), Submission.id.asc())
+                .limit(self.k)
+            )
+
+        return [
+            LeaderboardEntry(*row[:-2], float(row.score), row.finished_at)
+            for row in db.session.execute(stmt)
+        ]
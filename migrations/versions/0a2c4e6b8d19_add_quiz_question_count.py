@@ -0,0 +1,32 @@
+"""add question_count counter to quiz
+
+Revision ID: 0a2c4e6b8d19
+Revises: f4a6b8c0d275
+Create Date: 2026-10-17 14:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0a2c4e6b8d19'
+down_revision = 'f4a6b8c0d275'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('quiz', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('question_count', sa.Integer(), nullable=False, server_default='0'))
+
+    # Isi counter dari soal yang sudah ada
+    op.execute(
+        "UPDATE quiz SET question_count = "
+        "(SELECT COUNT(*) FROM question WHERE question.quiz_id = quiz.id)"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('quiz', schema=None) as batch_op:
+        batch_op.drop_column('question_count')
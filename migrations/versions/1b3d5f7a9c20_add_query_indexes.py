@@ -0,0 +1,40 @@
+"""add indexes for hot query patterns
+
+Revision ID: 1b3d5f7a9c20
+Revises: 0a2c4e6b8d19
+Create Date: 2026-10-17 15:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1b3d5f7a9c20'
+down_revision = '0a2c4e6b8d19'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    ('ix_quiz_published_code', 'quiz', ['published', 'code']),
+    ('ix_question_quiz_id', 'question', ['quiz_id']),
+    ('ix_choice_question_id', 'choice', ['question_id']),
+    ('ix_submission_quiz_user_started', 'submission', ['quiz_id', 'user_id', 'started_at']),
+    ('ix_submission_quiz_finished', 'submission', ['quiz_id', 'finished_at']),
+    ('ix_submission_quiz_score', 'submission', ['quiz_id', 'score', 'finished_at']),
+    ('ix_submission_score_finished', 'submission', ['score', 'finished_at']),
+    ('ix_submission_user_finished', 'submission', ['user_id', 'finished_at']),
+    ('ix_submission_finished_deadline', 'submission', ['finished_at', 'deadline_at']),
+    ('ix_answer_submission_question_choice', 'answer', ['submission_id', 'question_id', 'choice_id']),
+]
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+
+
+def downgrade():
+    for name, table, _columns in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
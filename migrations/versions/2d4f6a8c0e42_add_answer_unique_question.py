@@ -0,0 +1,73 @@
+"""unique answer per submission and question
+
+Revision ID: 2d4f6a8c0e42
+Revises: 1b3d5f7a9c20
+Create Date: 2026-10-17 18:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2d4f6a8c0e42'
+down_revision = '1b3d5f7a9c20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    answer = sa.table(
+        'answer',
+        sa.column('id', sa.Integer),
+        sa.column('submission_id', sa.Integer),
+        sa.column('question_id', sa.Integer),
+        sa.column('choice_id', sa.Integer),
+    )
+    choice = sa.table('choice', sa.column('id', sa.Integer), sa.column('is_correct', sa.Boolean))
+    submission = sa.table(
+        'submission',
+        sa.column('id', sa.Integer),
+        sa.column('answered_count', sa.Integer),
+        sa.column('correct_count', sa.Integer),
+    )
+    conn = op.get_bind()
+
+    # Jawaban ganda (double submit lama): simpan yang pertama, buang sisanya
+    first = (
+        sa.select(sa.func.min(answer.c.id))
+        .where(answer.c.question_id.isnot(None))
+        .group_by(answer.c.submission_id, answer.c.question_id)
+    )
+    duplicated = conn.execute(
+        sa.select(answer.c.submission_id).distinct()
+        .where(answer.c.question_id.isnot(None), answer.c.id.notin_(first))
+    ).scalars().all()
+    if duplicated:
+        conn.execute(
+            answer.delete()
+            .where(answer.c.question_id.isnot(None), answer.c.id.notin_(first))
+        )
+        # Counter submission terdampak dihitung ulang (aturan repair_counters)
+        answered = (
+            sa.select(sa.func.count(answer.c.id))
+            .where(answer.c.submission_id == submission.c.id, answer.c.question_id.isnot(None))
+            .scalar_subquery()
+        )
+        correct = (
+            sa.select(sa.func.count(answer.c.id))
+            .select_from(answer.join(choice, choice.c.id == answer.c.choice_id))
+            .where(answer.c.submission_id == submission.c.id, choice.c.is_correct == sa.true())
+            .scalar_subquery()
+        )
+        conn.execute(
+            submission.update()
+            .where(submission.c.id.in_(duplicated))
+            .values(answered_count=answered, correct_count=correct)
+        )
+
+    op.create_index('uq_answer_submission_question', 'answer', ['submission_id', 'question_id'], unique=True)
+
+
+def downgrade():
+    op.drop_index('uq_answer_submission_question', table_name='answer')
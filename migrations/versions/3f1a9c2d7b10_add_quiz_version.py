@@ -0,0 +1,26 @@
+"""add quiz version for snapshot cache
+
+Revision ID: 3f1a9c2d7b10
+Revises: 007776f5b287
+Create Date: 2026-10-17 08:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1a9c2d7b10'
+down_revision = '007776f5b287'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('quiz', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    with op.batch_alter_table('quiz', schema=None) as batch_op:
+        batch_op.drop_column('version')
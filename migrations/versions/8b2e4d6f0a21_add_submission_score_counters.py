@@ -0,0 +1,36 @@
+"""add running answer counters to submission
+
+Revision ID: 8b2e4d6f0a21
+Revises: 3f1a9c2d7b10
+Create Date: 2026-10-17 08:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b2e4d6f0a21'
+down_revision = '3f1a9c2d7b10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('submission', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('answered_count', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('correct_count', sa.Integer(), nullable=False, server_default='0'))
+
+    # Isi counter dari jawaban yang sudah ada
+    op.execute(
+        "UPDATE submission SET "
+        "answered_count = (SELECT COUNT(*) FROM answer WHERE answer.submission_id = submission.id), "
+        "correct_count = (SELECT COUNT(*) FROM answer JOIN choice ON choice.id = answer.choice_id "
+        "WHERE answer.submission_id = submission.id AND choice.is_correct)"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('submission', schema=None) as batch_op:
+        batch_op.drop_column('correct_count')
+        batch_op.drop_column('answered_count')
@@ -0,0 +1,26 @@
+"""add batch_mode flag to quiz
+
+Revision ID: c5d7e9f1a342
+Revises: 8b2e4d6f0a21
+Create Date: 2026-10-17 09:15:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5d7e9f1a342'
+down_revision = '8b2e4d6f0a21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('quiz', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('batch_mode', sa.Boolean(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    with op.batch_alter_table('quiz', schema=None) as batch_op:
+        batch_op.drop_column('batch_mode')
@@ -0,0 +1,26 @@
+"""add order_seed to submission
+
+Revision ID: d8e0f2a4b653
+Revises: c5d7e9f1a342
+Create Date: 2026-10-17 09:50:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd8e0f2a4b653'
+down_revision = 'c5d7e9f1a342'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('submission', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('order_seed', sa.Integer(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('submission', schema=None) as batch_op:
+        batch_op.drop_column('order_seed')
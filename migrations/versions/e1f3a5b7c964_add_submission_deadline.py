@@ -0,0 +1,52 @@
+"""add deadline_at to submission
+
+Revision ID: e1f3a5b7c964
+Revises: d8e0f2a4b653
+Create Date: 2026-10-17 10:40:00.000000
+
+"""
+from datetime import timedelta
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e1f3a5b7c964'
+down_revision = 'd8e0f2a4b653'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('submission', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('deadline_at', sa.DateTime(), nullable=True))
+
+    # Isi deadline untuk submission yang masih terbuka (dihitung di Python agar portable)
+    submission = sa.table(
+        'submission',
+        sa.column('id', sa.Integer),
+        sa.column('quiz_id', sa.Integer),
+        sa.column('started_at', sa.DateTime),
+        sa.column('finished_at', sa.DateTime),
+        sa.column('deadline_at', sa.DateTime),
+    )
+    quiz = sa.table('quiz', sa.column('id', sa.Integer), sa.column('duration', sa.Integer))
+
+    conn = op.get_bind()
+    rows = conn.execute(
+        sa.select(submission.c.id, submission.c.started_at, quiz.c.duration)
+        .select_from(submission.join(quiz, quiz.c.id == submission.c.quiz_id))
+        .where(submission.c.finished_at.is_(None), submission.c.started_at.isnot(None))
+    ).fetchall()
+    for sid, started_at, duration in rows:
+        conn.execute(
+            submission.update()
+            .where(submission.c.id == sid)
+            .values(deadline_at=started_at + timedelta(seconds=duration or 600))
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('submission', schema=None) as batch_op:
+        batch_op.drop_column('deadline_at')
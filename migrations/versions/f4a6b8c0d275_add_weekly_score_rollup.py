@@ -0,0 +1,82 @@
+"""add weekly_score_rollup table
+
+Revision ID: f4a6b8c0d275
+Revises: e1f3a5b7c964
+Create Date: 2026-10-17 11:30:00.000000
+
+"""
+from collections import defaultdict
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4a6b8c0d275'
+down_revision = 'e1f3a5b7c964'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    rollup = op.create_table('weekly_score_rollup',
+    sa.Column('quiz_id', sa.Integer(), nullable=False),
+    sa.Column('year', sa.Integer(), nullable=False),
+    sa.Column('iso_week', sa.Integer(), nullable=False),
+    sa.Column('submission_count', sa.Integer(), nullable=False),
+    sa.Column('correct_count', sa.Integer(), nullable=False),
+    sa.Column('answered_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['quiz_id'], ['quiz.id'], ),
+    sa.PrimaryKeyConstraint('quiz_id', 'year', 'iso_week')
+    )
+
+    # Isi awal dari submission selesai; agregat sama dengan rollup.rebuild()
+    submission = sa.table(
+        'submission',
+        sa.column('id', sa.Integer),
+        sa.column('quiz_id', sa.Integer),
+        sa.column('finished_at', sa.DateTime),
+    )
+    answer = sa.table(
+        'answer',
+        sa.column('id', sa.Integer),
+        sa.column('submission_id', sa.Integer),
+        sa.column('question_id', sa.Integer),
+        sa.column('choice_id', sa.Integer),
+    )
+    choice = sa.table('choice', sa.column('id', sa.Integer), sa.column('is_correct', sa.Boolean))
+
+    rows = op.get_bind().execute(
+        sa.select(
+            submission.c.quiz_id,
+            submission.c.finished_at,
+            sa.func.count(answer.c.question_id),
+            sa.func.coalesce(sa.func.sum(sa.case((choice.c.is_correct == sa.true(), 1), else_=0)), 0),
+        )
+        .select_from(
+            submission
+            .outerjoin(answer, answer.c.submission_id == submission.c.id)
+            .outerjoin(choice, choice.c.id == answer.c.choice_id)
+        )
+        .where(submission.c.finished_at.isnot(None), submission.c.quiz_id.isnot(None))
+        .group_by(submission.c.id, submission.c.quiz_id, submission.c.finished_at)
+    ).fetchall()
+
+    # Minggu ISO dihitung di Python agar portable
+    totals = defaultdict(lambda: [0, 0, 0])
+    for quiz_id, finished_at, answered, correct in rows:
+        year, week, _ = finished_at.isocalendar()
+        t = totals[(quiz_id, year, week)]
+        t[0] += 1
+        t[1] += correct
+        t[2] += answered
+    if totals:
+        op.bulk_insert(rollup, [
+            {"quiz_id": q, "year": y, "iso_week": w,
+             "submission_count": n, "correct_count": c, "answered_count": a}
+            for (q, y, w), (n, c, a) in totals.items()
+        ])
+
+
+def downgrade():
+    op.drop_table('weekly_score_rollup')
@@ -66,6 +66,10 @@ class Material(db.Model):
 # -----------------------------
 class Quiz(db.Model):
     __tablename__ = 'quiz'
+    __table_args__ = (
+        # Muat ulang indeks kode quiz terbit (published -> code, id)
+        db.Index('ix_quiz_published_code', 'published', 'code'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(256), nullable=False)
@@ -73,8 +77,11 @@ class Quiz(db.Model):
     code = db.Column(db.String(20), unique=True, nullable=False)  # KODE MASUK QUIZ
     duration = db.Column(db.Integer, default=600)  # DALAM DETIK
     published = db.Column(db.Boolean, default=False)  # ✅ fixed
+    batch_mode = db.Column(db.Boolean, nullable=False, default=False, server_default='0')  # SEMUA JAWABAN DIKIRIM SEKALIGUS
     subject = db.Column(db.String(100))
     created_at = db.Column(db.DateTime, default=db.func.now())
+    version = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # NAIK SETIAP SOAL BERUBAH
+    question_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
 
     created_by = db.Column(db.Integer, db.ForeignKey('user.id'))
     category_id = db.Column(db.Integer, db.ForeignKey('category.id'))
@@ -104,7 +111,7 @@ class Question(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     text = db.Column(db.Text, nullable=False)
     image_filename = db.Column(db.String(255))
-    quiz_id = db.Column(db.Integer, db.ForeignKey("quiz.id"), nullable=False)
+    quiz_id = db.Column(db.Integer, db.ForeignKey("quiz.id"), nullable=False, index=True)
 
     # ✅ Tambahkan relasi ke Quiz
     quiz = db.relationship("Quiz", back_populates="questions")
@@ -121,7 +128,7 @@ class Choice(db.Model):
     __tablename__ = 'choice'
 
     id = db.Column(db.Integer, primary_key=True)
-    question_id = db.Column(db.Integer, db.ForeignKey('question.id'))
+    question_id = db.Column(db.Integer, db.ForeignKey('question.id'), index=True)
     text = db.Column(db.String(512))
     image_filename = db.Column(db.String(256))
     is_correct = db.Column(db.Boolean, default=False)
@@ -132,13 +139,30 @@ class Choice(db.Model):
 # -----------------------------
 class Submission(db.Model):
     __tablename__ = 'submission'
+    __table_args__ = (
+        # start_quiz, progres (percobaan terakhir per siswa x quiz)
+        db.Index('ix_submission_quiz_user_started', 'quiz_id', 'user_id', 'started_at'),
+        # hasil quiz, laporan, analisis butir: submission selesai per quiz
+        db.Index('ix_submission_quiz_finished', 'quiz_id', 'finished_at'),
+        # peringkat per quiz & leaderboard global
+        db.Index('ix_submission_quiz_score', 'quiz_id', 'score', 'finished_at'),
+        db.Index('ix_submission_score_finished', 'score', 'finished_at'),
+        # riwayat di dashboard siswa
+        db.Index('ix_submission_user_finished', 'user_id', 'finished_at'),
+        # sweeper batas waktu (finished_at IS NULL AND deadline_at < ...)
+        db.Index('ix_submission_finished_deadline', 'finished_at', 'deadline_at'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
     quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id'))
     started_at = db.Column(db.DateTime, default=datetime.utcnow)
     finished_at = db.Column(db.DateTime)
+    deadline_at = db.Column(db.DateTime)  # started_at + durasi quiz
     score = db.Column(db.Float)
+    answered_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    correct_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    order_seed = db.Column(db.Integer)  # SEED URUTAN SOAL & PILIHAN
 
     # RELASI
     answers = db.relationship('Answer', backref='submission', lazy=True, cascade="all, delete-orphan")
@@ -149,6 +173,12 @@ class Submission(db.Model):
 # -----------------------------
 class Answer(db.Model):
     __tablename__ = 'answer'
+    __table_args__ = (
+        # Covering: jawaban per submission tanpa membaca baris tabel
+        db.Index('ix_answer_submission_question_choice', 'submission_id', 'question_id', 'choice_id'),
+        # Satu jawaban per soal; jawaban soal yang dihapus (question_id NULL) bebas
+        db.Index('uq_answer_submission_question', 'submission_id', 'question_id', unique=True),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     submission_id = db.Column(db.Integer, db.ForeignKey('submission.id'))
@@ -159,3 +189,16 @@ class Answer(db.Model):
 
     choice = db.relationship("Choice", backref="answers")
 
+
+# -----------------------------
+# REKAP NILAI MINGGUAN (ROLLUP)
+# -----------------------------
+class WeeklyScoreRollup(db.Model):
+    __tablename__ = 'weekly_score_rollup'
+
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id'), primary_key=True)
+    year = db.Column(db.Integer, primary_key=True)  # TAHUN ISO
+    iso_week = db.Column(db.Integer, primary_key=True)
+    submission_count = db.Column(db.Integer, nullable=False, default=0)
+    correct_count = db.Column(db.Integer, nullable=False, default=0)
+    answered_count = db.Column(db.Integer, nullable=False, default=0)
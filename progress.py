@@ -0,0 +1,102 @@
+from collections import namedtuple
+
+from sqlalchemy import and_, func, select
+
+from extensions import db
+from models import Quiz, Role, Submission, User
+
+
+# -----------------------------
+# MATRIKS PROGRES SISWA x QUIZ
+# -----------------------------
+QuizInfo = namedtuple("QuizInfo", ["id", "title", "question_count"])
+StudentInfo = namedtuple("StudentInfo", ["id", "username"])
+
+
+def _latest_attempts(user_id=None):
+    """Subquery percobaan terakhir per (user, quiz) dengan ROW_NUMBER."""
+    rn = func.row_number().over(
+        partition_by=(Submission.user_id, Submission.quiz_id),
+        order_by=(Submission.started_at.desc(), Submission.id.desc())
+    )
+    ranked = select(
+        Submission.user_id,
+        Submission.quiz_id,
+        Submission.answered_count,
+        Submission.finished_at,
+        Submission.score,
+        rn.label("rn"),
+    )
+    if user_id is not None:
+        # Filter sebelum window function supaya indeks (user_id, ...) terpakai
+        ranked = ranked.where(Submission.user_id == user_id)
+    ranked = ranked.subquery()
+    return (
+        select(ranked.c.user_id, ranked.c.quiz_id, ranked.c.answered_count,
+               ranked.c.finished_at, ranked.c.score)
+        .where(ranked.c.rn == 1)
+        .subquery()
+    )
+
+
+def _matrix_query(user_id=None):
+    latest = _latest_attempts(user_id)
+
+    stmt = (
+        select(
+            User.id.label("user_id"), User.username,
+            Quiz.id.label("quiz_id"), Quiz.title,
+            Quiz.question_count,
+            latest.c.answered_count, latest.c.finished_at, latest.c.score,
+            latest.c.user_id.label("attempt_user_id"),
+        )
+        .select_from(User)
+        # Setiap siswa dipasangkan dengan setiap quiz yang sudah dipublikasikan
+        .join(Quiz, Quiz.published.is_(True))
+        .outerjoin(latest, and_(latest.c.user_id == User.id, latest.c.quiz_id == Quiz.id))
+        .order_by(User.username, User.id, Quiz.id)
+    )
+    if user_id is not None:
+        stmt = stmt.where(User.id == user_id)
+    else:
+        stmt = stmt.where(User.role == Role.student)
+    return stmt
+
+
+def describe(row):
+    """Ubah satu sel matriks menjadi status, progress dan nilai untuk ditampilkan."""
+    if row.attempt_user_id is None:
+        return {"status": "Belum Mengerjakan", "progress": "-", "score": "-"}
+
+    progress = f"{row.answered_count or 0}/{row.question_count}"
+    if row.finished_at:
+        score = f"{row.score:.1f}%" if row.score is not None else "-"
+        return {"status": "Selesai", "progress": progress, "score": score}
+    return {"status": "Mengerjakan", "progress": progress, "score": "-"}
+
+
+def student_progress(user_id):
+    """Progres satu siswa di semua quiz yang dipublikasikan, dalam satu query."""
+    rows = []
+    for row in db.session.execute(_matrix_query(user_id)):
+        cell = describe(row)
+        cell["quiz"] = QuizInfo(row.quiz_id, row.title, row.question_count)
+        rows.append(cell)
+    return rows
+
+
+def class_matrix():
+    """Semua siswa x semua quiz dalam satu query.
+
+    Mengembalikan (students, quizzes, cells) dengan cells[(user_id, quiz_id)].
+    """
+    students, quizzes, cells = {}, {}, {}
+    for row in db.session.execute(_matrix_query()):
+        students.setdefault(row.user_id, StudentInfo(row.user_id, row.username))
+        quizzes.setdefault(row.quiz_id, QuizInfo(row.quiz_id, row.title, row.question_count))
+        cells[(row.user_id, row.quiz_id)] = describe(row)
+    return (
+        list(students.values()),
+        sorted(quizzes.values(), key=lambda q: q.id),
+        cells,
+    )
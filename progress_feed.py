@@ -0,0 +1,73 @@
+import json
+import time
+from collections import Counter
+from threading import Condition
+
+
+# -----------------------------
+# FEED PROGRES QUIZ (SERVER-SENT EVENTS)
+# -----------------------------
+class ProgressFeed:
+    """Dorong perubahan progres submission ke halaman guru lewat SSE.
+
+    Jalur tulis jawaban memanggil notify() setelah counter submission
+    ter-commit, sehingga stream di worker yang sama langsung bangun. Setiap
+    `interval` detik stream tetap mengecek sekali, untuk perubahan dari
+    worker lain. Satu pengecekan = satu query counter; hanya baris yang
+    berubah yang dikirim. Stream ditutup setelah `max_age` detik dan browser
+    menyambung ulang sendiri, supaya worker tidak tertahan selamanya.
+    """
+
+    def __init__(self, interval=2.0, max_age=120):
+        self.interval = interval
+        self.max_age = max_age
+        self._cond = Condition()
+        self._seq = Counter()
+        self._stats = {"notifies": 0, "streams": 0, "active": 0, "ticks": 0, "events": 0}
+
+    def notify(self, quiz_id=None):
+        """Tandai progres quiz berubah; None = semua quiz (mis. setelah flush batch)."""
+        with self._cond:
+            self._seq[quiz_id] += 1
+            self._stats["notifies"] += 1
+            self._cond.notify_all()
+
+    def stream(self, quiz_id, load_rows):
+        """Generator SSE. `load_rows()` mengembalikan {submission_id: dict baris}."""
+        with self._cond:
+            self._stats["streams"] += 1
+            self._stats["active"] += 1
+        started = time.monotonic()
+        sent = {}
+        try:
+            yield "retry: 3000\n\n"
+            mark = self._mark(quiz_id)
+            while time.monotonic() - started < self.max_age:
+                rows = load_rows()
+                changed = [row for sid, row in rows.items() if sent.get(sid) != row]
+                self._stats["ticks"] += 1
+                if changed:
+                    sent.update((row["id"], row) for row in changed)
+                    self._stats["events"] += 1
+                    yield "event: progress\ndata: %s\n\n" % json.dumps(changed)
+                else:
+                    yield ": ping\n\n"
+                mark = self._wait(quiz_id, mark)
+        finally:
+            with self._cond:
+                self._stats["active"] -= 1
+
+    def stats(self):
+        with self._cond:
+            data = dict(self._stats)
+        data["interval_s"] = self.interval
+        data["max_age_s"] = self.max_age
+        return data
+
+    def _mark(self, quiz_id):
+        return (self._seq[quiz_id], self._seq[None])
+
+    def _wait(self, quiz_id, mark):
+        with self._cond:
+            self._cond.wait_for(lambda: self._mark(quiz_id) != mark, self.interval)
+            return self._mark(quiz_id)
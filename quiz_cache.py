@@ -0,0 +1,128 @@
+import hashlib
+from collections import namedtuple
+from random import Random
+from threading import Lock
+
+from models import Quiz, Question, Choice
+from read_routing import primary
+
+
+# -----------------------------
+# SNAPSHOT SOAL (READ-ONLY)
+# -----------------------------
+ChoiceSnap = namedtuple(
+    "ChoiceSnap", ["id", "question_id", "text", "image_filename", "is_correct"]
+)
+QuestionSnap = namedtuple(
+    "QuestionSnap", ["id", "text", "image_filename", "choices", "choice_ids"]
+)
+
+
+class QuizSnapshot:
+    """Salinan soal & pilihan satu quiz pada satu versi, tidak boleh diubah."""
+
+    __slots__ = ("quiz_id", "version", "questions", "by_id", "correct_choice_ids")
+
+    def __init__(self, quiz_id, version, questions):
+        self.quiz_id = quiz_id
+        self.version = version
+        self.questions = tuple(questions)
+        self.by_id = {q.id: q for q in self.questions}
+        self.correct_choice_ids = frozenset(
+            c.id for q in self.questions for c in q.choices if c.is_correct
+        )
+
+    @property
+    def question_count(self):
+        return len(self.questions)
+
+    def get(self, question_id):
+        return self.by_id.get(question_id)
+
+
+# -----------------------------
+# CACHE PER WORKER
+# -----------------------------
+_snapshots = {}
+_lock = Lock()
+
+
+def _build_snapshot(quiz_id, version):
+    # Kunci jawaban selalu dari database utama, walau dipanggil dari laporan
+    with primary():
+        questions = Question.query.filter_by(quiz_id=quiz_id).order_by(Question.id).all()
+        choices = (
+            Choice.query
+            .filter(Choice.question_id.in_([q.id for q in questions]))
+            .order_by(Choice.id)
+            .all()
+        ) if questions else []
+
+    by_question = {}
+    for c in choices:
+        by_question.setdefault(c.question_id, []).append(ChoiceSnap(
+            c.id, c.question_id, c.text, c.image_filename, bool(c.is_correct)
+        ))
+
+    snaps = []
+    for q in questions:
+        q_choices = tuple(by_question.get(q.id, ()))
+        snaps.append(QuestionSnap(
+            q.id, q.text, q.image_filename, q_choices,
+            frozenset(c.id for c in q_choices)
+        ))
+    return QuizSnapshot(quiz_id, version, snaps)
+
+
+def get_snapshot(quiz):
+    """Ambil snapshot quiz untuk versi saat ini, bangun sekali bila belum ada."""
+    version = quiz.version or 0
+    snap = _snapshots.get(quiz.id)
+    if snap is not None and snap.version == version:
+        return snap
+
+    snap = _build_snapshot(quiz.id, version)
+    with _lock:
+        current = _snapshots.get(quiz.id)
+        if current is None or current.version <= version:
+            _snapshots[quiz.id] = snap
+    return snap
+
+
+def warm_published():
+    """Bangun snapshot semua quiz yang sudah dipublikasikan, sebelum siswa mulai masuk."""
+    for quiz in Quiz.query.filter_by(published=True).all():
+        get_snapshot(quiz)
+
+
+def invalidate(quiz_id):
+    with _lock:
+        _snapshots.pop(quiz_id, None)
+
+
+def bump_quiz_version(quiz):
+    """Tandai soal quiz berubah. Dipanggil sebelum commit oleh route yang mengubah soal."""
+    quiz.version = (quiz.version or 0) + 1
+    invalidate(quiz.id)
+
+
+# -----------------------------
+# URUTAN ACAK DETERMINISTIK
+# -----------------------------
+def _order_key(seed, question_id):
+    return hashlib.blake2b(b"%d:%d" % (seed, question_id), digest_size=8).digest()
+
+
+def question_order(snapshot, seed):
+    """Urutan soal untuk satu submission; seed yang sama selalu memberi urutan yang sama.
+
+    Setiap soal diurutkan dengan kunci hash (seed, id soal) miliknya sendiri,
+    jadi menambah atau menghapus soal tidak mengacak ulang posisi soal lain.
+    """
+    return sorted((q.id for q in snapshot.questions), key=lambda qid: _order_key(seed, qid))
+
+
+def choice_order(question, seed):
+    choices = list(question.choices)
+    Random("%s:%s" % (seed, question.id)).shuffle(choices)
+    return choices
@@ -0,0 +1,85 @@
+import time
+from threading import Lock
+
+from extensions import db
+from models import Quiz
+
+
+# -----------------------------
+# INDEKS KODE QUIZ PER WORKER
+# -----------------------------
+class QuizCodeIndex:
+    """Peta kode -> quiz_id untuk semua quiz yang sudah dipublikasikan.
+
+    Indeks dimuat ulang saat VersionStamp berubah (publish/edit/hapus quiz di
+    worker mana pun) atau setelah `max_age` detik. Kode yang tidak dikenal
+    dicek sekali ke database lalu disimpan di negative cache selama
+    `negative_ttl` detik.
+    """
+
+    def __init__(self, stamp, max_age=300, negative_ttl=30, negative_max=10000):
+        self.stamp = stamp
+        self.max_age = max_age
+        self.negative_ttl = negative_ttl
+        self.negative_max = negative_max
+
+        self._lock = Lock()
+        self._codes = None
+        self._negative = {}
+        self._version = None
+        self._loaded_at = 0
+        self._stats = {"hits": 0, "db_lookups": 0, "negative_hits": 0, "reloads": 0}
+
+    def lookup(self, code):
+        """Kembalikan quiz_id untuk kode yang aktif, atau None."""
+        codes = self._ensure_fresh()
+
+        quiz_id = codes.get(code)
+        if quiz_id is not None:
+            self._stats["hits"] += 1
+            return quiz_id
+
+        expires = self._negative.get(code)
+        if expires is not None and expires > time.monotonic():
+            self._stats["negative_hits"] += 1
+            return None
+
+        # Kode belum dikenal: cek database sekali
+        self._stats["db_lookups"] += 1
+        row = db.session.query(Quiz.id).filter_by(code=code, published=True).first()
+        with self._lock:
+            if row:
+                codes[code] = row.id
+                self._negative.pop(code, None)
+                return row.id
+            if len(self._negative) >= self.negative_max:
+                self._negative.clear()
+            self._negative[code] = time.monotonic() + self.negative_ttl
+        return None
+
+    def invalidate(self):
+        """Dipanggil setelah commit oleh route yang mengubah kode atau status publish."""
+        self.stamp.bump()
+        with self._lock:
+            self._codes = None
+
+    def stats(self):
+        data = dict(self._stats)
+        data["codes"] = len(self._codes or ())
+        data["negative_cached"] = len(self._negative)
+        return data
+
+    def _ensure_fresh(self):
+        version = self.stamp.current()
+        if (self._codes is not None and version == self._version
+                and time.monotonic() - self._loaded_at < self.max_age):
+            return self._codes
+
+        rows = db.session.query(Quiz.code, Quiz.id).filter(Quiz.published.is_(True)).all()
+        with self._lock:
+            self._codes = {code: quiz_id for code, quiz_id in rows}
+            self._negative = {}
+            self._version = version
+            self._loaded_at = time.monotonic()
+            self._stats["reloads"] += 1
+            return self._codes
@@ -0,0 +1,132 @@
+from collections import namedtuple
+from datetime import datetime
+
+from sqlalchemy import and_, func, or_, select
+
+from extensions import db
+from models import Submission, User
+
+
+# -----------------------------
+# PERINGKAT PER QUIZ (WINDOW FUNCTION)
+# -----------------------------
+RankedRow = namedtuple("RankedRow", [
+    "rank", "dense_rank", "user_id", "username", "score", "finished_at", "attempts"
+])
+MyRank = namedtuple("MyRank", ["rank", "dense_rank", "score", "total"])
+
+
+def _best_attempts(quiz_id):
+    """Subquery satu baris per siswa: percobaan terbaik + jumlah percobaan."""
+    rn = func.row_number().over(
+        partition_by=Submission.user_id,
+        order_by=(Submission.score.desc(), Submission.finished_at.asc(), Submission.id.asc())
+    )
+    attempts = func.count(Submission.id).over(partition_by=Submission.user_id)
+    per_attempt = (
+        select(
+            Submission.user_id,
+            Submission.score,
+            Submission.finished_at,
+            rn.label("rn"),
+            attempts.label("attempts"),
+        )
+        .where(Submission.quiz_id == quiz_id, Submission.score.isnot(None))
+        .subquery()
+    )
+    return (
+        select(per_attempt.c.user_id, per_attempt.c.score,
+               per_attempt.c.finished_at, per_attempt.c.attempts)
+        .where(per_attempt.c.rn == 1)
+        .subquery()
+    )
+
+
+def ranked_page(quiz_id, after=None, limit=50):
+    """Satu halaman peringkat, urut (skor turun, selesai lebih awal, user_id).
+
+    `after` adalah cursor (score, finished_at, user_id) dari baris terakhir
+    halaman sebelumnya. Mengembalikan (rows, next_cursor).
+    """
+    best = _best_attempts(quiz_id)
+    ranked = (
+        select(
+            func.rank().over(order_by=best.c.score.desc()).label("rank"),
+            func.dense_rank().over(order_by=best.c.score.desc()).label("dense_rank"),
+            best.c.user_id,
+            best.c.score,
+            best.c.finished_at,
+            best.c.attempts,
+        )
+        .subquery()
+    )
+
+    stmt = (
+        select(
+            ranked.c.rank, ranked.c.dense_rank, ranked.c.user_id, User.username,
+            ranked.c.score, ranked.c.finished_at, ranked.c.attempts
+        )
+        .join(User, User.id == ranked.c.user_id)
+        .order_by(ranked.c.score.desc(), ranked.c.finished_at.asc(), ranked.c.user_id.asc())
+        .limit(limit + 1)
+    )
+    if after is not None:
+        score, finished_at, user_id = after
+        stmt = stmt.where(or_(
+            ranked.c.score < score,
+            and_(ranked.c.score == score, ranked.c.finished_at > finished_at),
+            and_(ranked.c.score == score, ranked.c.finished_at == finished_at,
+                 ranked.c.user_id > user_id),
+        ))
+
+    rows = [RankedRow(*r) for r in db.session.execute(stmt)]
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = (last.score, last.finished_at, last.user_id)
+    return rows, next_cursor
+
+
+def my_rank(quiz_id, user_id):
+    """Peringkat satu siswa tanpa memuat baris di atasnya; None bila belum ada nilai."""
+    score = db.session.execute(
+        select(func.max(Submission.score))
+        .where(Submission.quiz_id == quiz_id, Submission.user_id == user_id)
+    ).scalar()
+    if score is None:
+        return None
+
+    best_per_user = (
+        select(func.max(Submission.score).label("score"))
+        .where(Submission.quiz_id == quiz_id, Submission.score.isnot(None))
+        .group_by(Submission.user_id)
+        .subquery()
+    )
+    above, distinct_above, total = db.session.execute(
+        select(
+            func.count().filter(best_per_user.c.score > score),
+            func.count(func.distinct(best_per_user.c.score)).filter(best_per_user.c.score > score),
+            func.count(),
+        )
+    ).one()
+    return MyRank(above + 1, distinct_above + 1, score, total)
+
+
+# -----------------------------
+# CURSOR URL
+# -----------------------------
+def encode_cursor(cursor):
+    if cursor is None:
+        return None
+    score, finished_at, user_id = cursor
+    return "%r_%s_%d" % (float(score), finished_at.strftime("%Y%m%d%H%M%S%f"), user_id)
+
+
+def decode_cursor(value):
+    """Kebalikan encode_cursor; cursor rusak dianggap halaman pertama."""
+    try:
+        score, finished_at, user_id = value.split("_")
+        return float(score), datetime.strptime(finished_at, "%Y%m%d%H%M%S%f"), int(user_id)
+    except (AttributeError, ValueError):
+        return None
@@ -0,0 +1,232 @@
+import logging
+import os
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from threading import Lock, Thread
+
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+
+try:
+    import fcntl
+except ImportError:  # Windows (development)
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Engine baca yang aktif untuk konteks (request/thread) saat ini
+_read_engine = ContextVar("read_engine", default=None)
+
+
+# -----------------------------
+# SESSION DENGAN PEMILIHAN ENGINE BACA
+# -----------------------------
+class RoutingSession(Session):
+    """db.session yang mengarahkan SELECT ke engine baca bila sedang aktif.
+
+    Flush, INSERT/UPDATE/DELETE dan semua query di luar ReadRouter.reading()
+    tetap ke engine utama.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        engine = _read_engine.get()
+        if (
+            engine is not None and bind is None and not self._flushing
+            and clause is not None and getattr(clause, "is_select", False)
+        ):
+            return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@contextmanager
+def primary():
+    """Paksa SELECT di dalam blok ke engine utama, juga di dalam reading().
+
+    Dipakai untuk data yang di-cache lintas request (mis. snapshot soal) agar
+    salinan basi dari replika tidak tersimpan dengan versi terbaru.
+    """
+    token = _read_engine.set(None)
+    try:
+        yield
+    finally:
+        _read_engine.reset(token)
+
+
+# -----------------------------
+# REPLIKA / SNAPSHOT UNTUK LAPORAN
+# -----------------------------
+class ReadRouter:
+    """Pilih engine baca untuk laporan guru: replika, snapshot SQLite, atau utama.
+
+    Dengan `replica_url`, query laporan dikirim ke replika; replika yang tidak
+    bisa dihubungi dilewati selama `retry_after` detik. Tanpa replika, file
+    snapshot disalin dari database utama (backup API SQLite) paling cepat
+    setiap `refresh` detik, di thread latar dan hanya oleh satu worker (lock
+    file). Snapshot yang lebih tua dari `max_staleness` detik tidak dipakai:
+    query kembali ke engine utama sampai salinan baru selesai.
+    """
+
+    def __init__(self, primary_url, replica_url=None, snapshot_path=None,
+                 refresh=30, max_staleness=120, retry_after=30, engine_options=None):
+        self.refresh = refresh
+        self.max_staleness = max_staleness
+        self.retry_after = retry_after
+        self.snapshot_path = None
+        self.source_path = None
+        self._engine = None
+        self._mode = "primary"
+        self._lock = Lock()
+        self._refreshing = False
+        self._down_until = 0.0
+        self._stats = {
+            "reads_routed": 0,
+            "fallback_stale": 0,
+            "fallback_error": 0,
+            "snapshot_refreshes": 0,
+            "last_refresh_ms": 0.0,
+            "refresh_errors": 0,
+        }
+
+        if replica_url:
+            self._engine = create_engine(replica_url, **(engine_options or {}))
+            self._mode = "replica"
+        elif snapshot_path and primary_url.startswith("sqlite:///") and ":memory:" not in primary_url:
+            self.source_path = primary_url[len("sqlite:///"):].split("?", 1)[0]
+            self.snapshot_path = snapshot_path
+            os.makedirs(os.path.dirname(snapshot_path), exist_ok=True)
+            # NullPool: setiap checkout membuka file snapshot terbaru (os.replace)
+            self._engine = create_engine(
+                "sqlite:///file:%s?mode=ro&uri=true" % snapshot_path, poolclass=NullPool
+            )
+            self._mode = "snapshot"
+
+        if self._engine is not None and hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=lambda: self._engine.dispose(close=False))
+
+    @contextmanager
+    def reading(self):
+        """Arahkan SELECT di db.session ke engine baca selama blok berjalan."""
+        engine = self._choose()
+        token = _read_engine.set(engine)
+        try:
+            yield engine is not None
+        finally:
+            _read_engine.reset(token)
+
+    def route(self, view):
+        """Dekorator: seluruh view dibaca dari engine baca."""
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            with self.reading():
+                return view(*args, **kwargs)
+        return wrapper
+
+    def snapshot_age(self):
+        try:
+            return time.time() - os.stat(self.snapshot_path).st_mtime
+        except (FileNotFoundError, TypeError):
+            return None
+
+    def stats(self):
+        with self._lock:
+            data = dict(self._stats)
+        data["mode"] = self._mode
+        data["max_staleness_s"] = self.max_staleness
+        if self._mode == "snapshot":
+            age = self.snapshot_age()
+            data["snapshot_age_s"] = round(age, 1) if age is not None else None
+        if self._mode == "replica":
+            data["replica_down"] = time.monotonic() < self._down_until
+        return data
+
+    def _count(self, key):
+        with self._lock:
+            self._stats[key] += 1
+
+    def _choose(self):
+        if self._mode == "replica":
+            return self._replica()
+        if self._mode == "snapshot":
+            return self._snapshot()
+        return None
+
+    def _replica(self):
+        if time.monotonic() < self._down_until:
+            self._count("fallback_error")
+            return None
+        try:
+            with self._engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+        except Exception:
+            logger.warning("Replika laporan tidak bisa dihubungi; memakai database utama", exc_info=True)
+            self._down_until = time.monotonic() + self.retry_after
+            self._count("fallback_error")
+            return None
+        self._count("reads_routed")
+        return self._engine
+
+    def _snapshot(self):
+        age = self.snapshot_age()
+        if age is None or age > self.refresh:
+            self._start_refresh()
+        if age is None or age > self.max_staleness:
+            self._count("fallback_stale")
+            return None
+        self._count("reads_routed")
+        return self._engine
+
+    def _start_refresh(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        Thread(target=self._refresh_guarded, name="report-snapshot", daemon=True).start()
+
+    def _refresh_guarded(self):
+        try:
+            with open(self.snapshot_path + ".lock", "a") as lock_file:
+                if fcntl is not None:
+                    try:
+                        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except OSError:
+                        return  # worker lain sedang menyalin
+                age = self.snapshot_age()
+                if age is None or age > self.refresh:
+                    self.refresh_snapshot()
+        except Exception:
+            self._count("refresh_errors")
+            logger.exception("Refresh snapshot laporan gagal")
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def refresh_snapshot(self):
+        """Salin database utama ke file snapshot secara atomik."""
+        started_wall = time.time()
+        started = time.perf_counter()
+        tmp = "%s.%s.tmp" % (self.snapshot_path, uuid.uuid4().hex)
+        try:
+            src = sqlite3.connect(self.source_path)
+            dst = sqlite3.connect(tmp)
+            try:
+                # Backup membaca satu snapshot konsisten; di WAL penulis tidak diblokir
+                src.backup(dst)
+                # Snapshot dibuka read-only, jadi jangan tinggalkan mode WAL
+                dst.execute("PRAGMA journal_mode=DELETE")
+            finally:
+                dst.close()
+                src.close()
+            # Umur snapshot dihitung dari saat data dibaca, bukan saat selesai
+            os.utime(tmp, (started_wall, started_wall))
+            os.replace(tmp, self.snapshot_path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        with self._lock:
+            self._stats["snapshot_refreshes"] += 1
+            self._stats["last_refresh_ms"] = round((time.perf_counter() - started) * 1000, 3)
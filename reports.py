@@ -0,0 +1,493 @@
+import glob
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+import uuid
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from threading import Lock
+
+from reportlab.platypus import SimpleDocTemplate, LongTable, TableStyle, Paragraph
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib import colors
+from sqlalchemy import select
+
+from extensions import db
+from models import Submission, User
+from progress import student_progress, class_matrix
+
+logger = logging.getLogger(__name__)
+
+_JOB_ID = re.compile(r"[0-9a-f]{32}")
+
+
+class ReportFailed(Exception):
+    """Render laporan PDF gagal (error builder atau process pool rusak)."""
+
+
+# -----------------------------
+# PENGUMPULAN DATA (SATU QUERY PER LAPORAN)
+# -----------------------------
+def quiz_result_payload(quiz):
+    rows = db.session.execute(
+        select(User.username, Submission.score, Submission.finished_at)
+        .join(User, User.id == Submission.user_id)
+        .where(Submission.quiz_id == quiz.id, Submission.finished_at.isnot(None))
+        .order_by(Submission.finished_at, Submission.id)
+    ).all()
+    return {
+        "title": quiz.title,
+        "rows": [[
+            username,
+            f"{score:.2f}" if score is not None else "-",
+            finished_at.strftime("%d %B %Y") if finished_at else "-"
+        ] for username, score, finished_at in rows],
+    }
+
+
+def student_progress_payload(student):
+    return {
+        "username": student.username,
+        "rows": [
+            [row["quiz"].title, row["status"], row["progress"], row["score"]]
+            for row in student_progress(student.id)
+        ],
+    }
+
+
+def class_progress_payloads():
+    """Payload progres semua siswa dari satu query matriks; sama persis dengan
+    student_progress_payload sehingga cache PDF per siswa ikut terpakai."""
+    students, quizzes, cells = class_matrix()
+    payloads = []
+    for student in students:
+        rows = []
+        for quiz in quizzes:
+            cell = cells[(student.id, quiz.id)]
+            rows.append([quiz.title, cell["status"], cell["progress"], cell["score"]])
+        payloads.append((student, {"username": student.username, "rows": rows}))
+    return payloads
+
+
+# -----------------------------
+# RENDER PDF (DIJALANKAN DI PROCESS POOL)
+# -----------------------------
+def _quiz_result_elements(payload):
+    styles = getSampleStyleSheet()
+    data = [["Nama Siswa", "Nilai", "Tanggal"]] + payload["rows"]
+    # LongTable memecah tabel per halaman tanpa mengukur ulang seluruh baris
+    table = LongTable(data, colWidths=[200, 80, 120], repeatRows=1)
+    table.setStyle(TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+        ("GRID", (0, 0), (-1, -1), 1, colors.black),
+        ("FONT", (0, 0), (-1, 0), "Helvetica-Bold"),
+        ("ALIGN", (1, 1), (-1, -1), "CENTER"),
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+    ]))
+    elements = [
+        Paragraph(f"<b>Rekap Nilai Quiz</b><br/>{payload['title']}", styles["Title"]),
+        Paragraph("<br/>", styles["Normal"]),
+        table,
+    ]
+    return elements, {}
+
+
+def _student_progress_elements(payload):
+    styles = getSampleStyleSheet()
+    data = [["Quiz", "Status", "Progress", "Nilai"]] + payload["rows"]
+    table = LongTable(data, colWidths=[200, 100, 80, 80], repeatRows=1)
+    table.setStyle(TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+        ("GRID", (0, 0), (-1, -1), 1, colors.grey),
+        ("FONT", (0, 0), (-1, 0), "Helvetica-Bold"),
+        ("ALIGN", (1, 1), (-1, -1), "CENTER"),
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+        ("BOTTOMPADDING", (0, 0), (-1, 0), 8),
+        ("TOPPADDING", (0, 0), (-1, 0), 8),
+    ]))
+    elements = [
+        Paragraph(
+            f"<b>Laporan Progres Quiz Siswa</b><br/>Nama: {payload['username']}",
+            styles["Title"]
+        ),
+        Paragraph("<br/>", styles["Normal"]),
+        table,
+    ]
+    margins = {"rightMargin": 30, "leftMargin": 30, "topMargin": 30, "bottomMargin": 30}
+    return elements, margins
+
+
+BUILDERS = {
+    "quiz_result": _quiz_result_elements,
+    "student_progress": _student_progress_elements,
+}
+
+
+def build_pdf(kind, payload, path, keep=3600):
+    """Tulis PDF ke `path` secara atomik. Fungsi top-level agar bisa di-pickle."""
+    tmp = "%s.%s.tmp" % (path, uuid.uuid4().hex)
+    try:
+        elements, doc_options = BUILDERS[kind](payload)
+        SimpleDocTemplate(tmp, pagesize=A4, **doc_options).build(elements)
+        os.replace(tmp, path)
+    except Exception as e:
+        # Penanda gagal agar status ekspor di worker lain ikut tahu
+        _write_atomic(path + ".err", str(e))
+        raise
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+    # Versi lama laporan yang sama tidak terpakai lagi. File yang baru saja
+    # dipakai (mtime disentuh saat cache hit) bisa sedang dikirim request lain,
+    # jadi hanya yang tidak dipakai selama `keep` detik yang dihapus.
+    prefix = os.path.basename(path).rsplit("-", 1)[0]
+    cutoff = time.time() - keep
+    for old in glob.glob(os.path.join(os.path.dirname(path), prefix + "-*.pdf")):
+        if old != path:
+            try:
+                if os.stat(old).st_mtime < cutoff:
+                    os.remove(old)
+            except OSError:
+                pass
+    return path
+
+
+# -----------------------------
+# CACHE DISK + PROCESS POOL
+# -----------------------------
+def _write_atomic(path, data):
+    tmp = "%s.%s.tmp" % (path, uuid.uuid4().hex)
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _render_state(path):
+    if os.path.exists(path):
+        return "done"
+    if os.path.exists(path + ".err"):
+        return "failed"
+    return None
+
+
+class _ZipSink:
+    """Tujuan tulis ZipFile yang tidak bisa di-seek; isinya diambil per potongan."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self):
+        data, self._chunks = b"".join(self._chunks), []
+        return data
+
+
+class ExportJob:
+    """Satu ekspor massal: daftar PDF yang dirender paralel dan bisa dibatalkan.
+
+    State job disimpan sebagai file di `state_dir` (daftar item, penanda
+    batal, jumlah yang sudah dikirim), sehingga status, unduhan dan
+    pembatalan bisa dilayani worker gunicorn mana pun. Future render hanya
+    ada di worker yang memulai ekspor.
+    """
+
+    def __init__(self, state_dir, job_id, items, expires, futures=()):
+        self.id = job_id
+        self.items = items  # [(nama di ZIP, path)]
+        self.expires = expires
+        self._base = os.path.join(state_dir, job_id)
+        self._futures = list(futures)
+
+    @classmethod
+    def load(cls, state_dir, job_id):
+        if not _JOB_ID.fullmatch(job_id or ""):
+            return None
+        try:
+            with open(os.path.join(state_dir, job_id + ".json"), encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return cls(state_dir, job_id, [tuple(item) for item in state["items"]], state["expires"])
+
+    def save(self):
+        _write_atomic(self._base + ".json", json.dumps({
+            "items": self.items, "expires": self.expires
+        }))
+
+    @property
+    def cancelled(self):
+        return os.path.exists(self._base + ".cancelled")
+
+    @property
+    def streamed(self):
+        try:
+            with open(self._base + ".streamed", encoding="utf-8") as f:
+                return int(f.read() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def cancel(self):
+        open(self._base + ".cancelled", "a").close()
+        self._cancel_futures()
+
+    def _cancel_futures(self):
+        for future in self._futures:
+            future.cancel()
+
+    def status(self):
+        cancelled = self.cancelled
+        if cancelled:
+            # Bisa dibatalkan dari worker lain: hentikan render di worker ini
+            self._cancel_futures()
+        done = failed = 0
+        for _name, path in self.items:
+            state = _render_state(path)
+            if state == "done":
+                done += 1
+            elif state == "failed":
+                failed += 1
+        return {
+            "id": self.id,
+            "total": len(self.items),
+            "done": done,
+            "failed": failed,
+            "streamed": self.streamed,
+            "cancelled": cancelled,
+            "finished": cancelled or done + failed == len(self.items),
+        }
+
+    def iter_zip(self, poll=0.2):
+        """Tulis ZIP secara streaming: setiap PDF dikirim begitu file-nya ada.
+
+        Render bisa berjalan di worker lain, jadi progres dibaca dari disk.
+        PDF yang gagal dirender dicatat di GAGAL.txt. Job yang dibatalkan atau
+        kedaluwarsa di tengah jalan melempar ReportFailed sebelum direktori
+        ZIP ditulis, sehingga klien menerima unduhan yang putus, bukan ZIP
+        yang tampak lengkap.
+        """
+        sink = _ZipSink()
+        complete = False
+        streamed = 0
+        failed = []
+        try:
+            # PDF sudah terkompresi, jadi cukup disimpan (ZIP_STORED)
+            with zipfile.ZipFile(sink, "w", zipfile.ZIP_STORED) as zf:
+                pending = list(self.items)
+                while pending:
+                    waiting = []
+                    for name, path in pending:
+                        if self.cancelled:
+                            raise ReportFailed("ekspor %s dibatalkan" % self.id)
+                        state = _render_state(path)
+                        if state is None:
+                            waiting.append((name, path))
+                        elif state == "failed":
+                            failed.append(name)
+                        else:
+                            zf.write(path, name)
+                            streamed += 1
+                            _write_atomic(self._base + ".streamed", str(streamed))
+                            yield sink.take()
+                    pending = waiting
+                    if pending:
+                        if time.time() > self.expires:
+                            # Worker perender hilang: jangan kirim ZIP yang kurang
+                            raise ReportFailed("ekspor %s kedaluwarsa" % self.id)
+                        time.sleep(poll)
+                if failed:
+                    zf.writestr("GAGAL.txt", "PDF berikut gagal dibuat:\n" + "\n".join(failed) + "\n")
+            complete = True
+            yield sink.take()
+        finally:
+            # Klien memutus unduhan: sisa pekerjaan dihentikan
+            if not complete:
+                self.cancel()
+
+
+class ReportService:
+    """Render laporan PDF di luar worker request, hasilnya disimpan di disk.
+
+    Nama file = (jenis, id entitas, sha1 data), jadi selama data tidak
+    berubah file yang sama langsung dikirim. Request menunggu paling lama
+    `wait` detik; jika belum selesai, pemanggil menampilkan halaman tunggu.
+    Render yang gagal melempar ReportFailed. `workers` = 0 berarti render
+    langsung di proses request. Versi lama sebuah laporan dihapus setelah
+    tidak dipakai selama `keep` detik.
+    """
+
+    def __init__(self, cache_dir, workers=2, wait=10, keep=3600):
+        self.export_dir = os.path.join(cache_dir, "exports")
+        os.makedirs(self.export_dir, exist_ok=True)
+        self.cache_dir = cache_dir
+        self.workers = workers
+        self.wait = wait
+        self.keep = keep
+        self._lock = Lock()
+        self._executor = None
+        self._pid = None
+        self._jobs = {}
+        self._exports = {}
+        self._stats = {"cache_hits": 0, "rendered": 0, "pending": 0, "errors": 0}
+
+    def path_for(self, kind, entity_id, payload):
+        digest = hashlib.sha1(
+            json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+        return os.path.join(self.cache_dir, "%s_%s-%s.pdf" % (kind, entity_id, digest))
+
+    def get(self, kind, entity_id, payload):
+        """Path PDF yang sudah jadi, atau None bila masih dirender."""
+        path = self.path_for(kind, entity_id, payload)
+        if self._cached(path):
+            return path
+
+        if self.workers <= 0:
+            self._build(kind, payload, path)
+            return path
+
+        future = self._submit(path, kind, payload)
+        try:
+            future.result(timeout=self.wait)
+        except FutureTimeout:
+            self._stats["pending"] += 1
+            return None
+        except Exception as e:
+            # Sudah dihitung di _done
+            raise ReportFailed(str(e)) from e
+        return path
+
+    def start_export(self, items, max_age=3600):
+        """Mulai ekspor massal dari [(nama di ZIP, jenis, id entitas, payload)].
+
+        Job kedaluwarsa setelah `max_age` detik.
+        """
+        self._expire_exports()
+        entries = []
+        futures = []
+        for name, kind, entity_id, payload in items:
+            path = self.path_for(kind, entity_id, payload)
+            entries.append((name, path))
+            if self._cached(path):
+                continue
+            try:
+                os.remove(path + ".err")  # hasil gagal sebelumnya dicoba lagi
+            except FileNotFoundError:
+                pass
+            if self.workers <= 0:
+                self._build(kind, payload, path)
+            else:
+                futures.append(self._submit(path, kind, payload))
+
+        job = ExportJob(self.export_dir, uuid.uuid4().hex, entries, time.time() + max_age, futures)
+        job.save()
+        if futures:
+            with self._lock:
+                self._exports[job.id] = job
+        return job
+
+    def get_export(self, job_id):
+        """Job ekspor dari worker mana pun; None bila tidak ada atau kedaluwarsa."""
+        with self._lock:
+            job = self._exports.get(job_id)
+        if job is None:
+            job = ExportJob.load(self.export_dir, job_id)
+        if job is None or time.time() > job.expires:
+            return None
+        return job
+
+    def _expire_exports(self):
+        now = time.time()
+        with self._lock:
+            for job_id, job in list(self._exports.items()):
+                if now > job.expires:
+                    job.cancel()
+                    del self._exports[job_id]
+        for state_path in glob.glob(os.path.join(self.export_dir, "*.json")):
+            job = ExportJob.load(self.export_dir, os.path.basename(state_path)[:-len(".json")])
+            if job is not None and now <= job.expires:
+                continue
+            base = state_path[:-len(".json")]
+            for leftover in (state_path, base + ".cancelled", base + ".streamed"):
+                try:
+                    os.remove(leftover)
+                except OSError:
+                    pass
+
+    def stats(self):
+        with self._lock:
+            data = dict(self._stats)
+            data["in_flight"] = len(self._jobs)
+            data["exports"] = len(self._exports)
+        data["export_jobs"] = len(glob.glob(os.path.join(self.export_dir, "*.json")))
+        data["workers"] = self.workers
+        return data
+
+    def _cached(self, path):
+        try:
+            # mtime = terakhir dipakai, supaya tidak ikut dihapus build_pdf
+            os.utime(path)
+        except FileNotFoundError:
+            return False
+        self._stats["cache_hits"] += 1
+        return True
+
+    def _build(self, kind, payload, path):
+        try:
+            build_pdf(kind, payload, path, self.keep)
+        except Exception as e:
+            with self._lock:
+                self._stats["errors"] += 1
+            logger.exception("Render laporan %s gagal", path)
+            raise ReportFailed(str(e)) from e
+        self._stats["rendered"] += 1
+
+    def _submit(self, path, kind, payload):
+        with self._lock:
+            future = self._jobs.get(path)
+            if future is not None and not future.cancelled():
+                return future
+            try:
+                future = self._pool().submit(build_pdf, kind, payload, path, self.keep)
+            except BrokenProcessPool as e:
+                # Proses render mati: pool dibuat ulang pada request berikutnya
+                self._executor = None
+                self._stats["errors"] += 1
+                raise ReportFailed(str(e)) from e
+            self._jobs[path] = future
+        future.add_done_callback(lambda f: self._done(path, f))
+        return future
+
+    def _done(self, path, future):
+        with self._lock:
+            if self._jobs.get(path) is future:
+                del self._jobs[path]
+            if future.cancelled():
+                return
+            if future.exception() is not None:
+                self._stats["errors"] += 1
+                logger.error("Render laporan %s gagal: %s", path, future.exception())
+                if not os.path.exists(path + ".err"):
+                    # Proses render mati sebelum sempat menulis penanda gagal
+                    _write_atomic(path + ".err", str(future.exception()))
+            else:
+                self._stats["rendered"] += 1
+
+    def _pool(self):
+        # Pool dibuat ulang per proses worker (setelah fork gunicorn)
+        if self._executor is None or self._pid != os.getpid():
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            self._pid = os.getpid()
+            self._jobs = {}
+        return self._executor
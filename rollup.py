@@ -0,0 +1,116 @@
+from collections import defaultdict
+
+from sqlalchemy import case, func, select
+
+from extensions import db
+from models import Answer, Choice, Submission, WeeklyScoreRollup
+
+
+# -----------------------------
+# ROLLUP NILAI MINGGUAN
+# -----------------------------
+def _week_key(quiz_id, finished_at):
+    year, week, _ = finished_at.isocalendar()
+    return (quiz_id, year, week)
+
+
+def _upsert(quiz_id, year, week, submissions, correct, answered):
+    t = WeeklyScoreRollup.__table__
+    values = {
+        "quiz_id": quiz_id, "year": year, "iso_week": week,
+        "submission_count": submissions, "correct_count": correct, "answered_count": answered,
+    }
+    dialect = db.session.get_bind().dialect.name
+
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        stmt = insert(t).values(**values)
+        db.session.execute(stmt.on_conflict_do_update(
+            index_elements=[t.c.quiz_id, t.c.year, t.c.iso_week],
+            set_={
+                "submission_count": t.c.submission_count + stmt.excluded.submission_count,
+                "correct_count": t.c.correct_count + stmt.excluded.correct_count,
+                "answered_count": t.c.answered_count + stmt.excluded.answered_count,
+            }
+        ))
+        return
+
+    # Database lain: UPDATE dulu, INSERT bila baris minggu itu belum ada
+    updated = db.session.execute(
+        t.update()
+        .where(t.c.quiz_id == quiz_id, t.c.year == year, t.c.iso_week == week)
+        .values(
+            submission_count=t.c.submission_count + submissions,
+            correct_count=t.c.correct_count + correct,
+            answered_count=t.c.answered_count + answered,
+        )
+    ).rowcount
+    if not updated:
+        db.session.execute(t.insert().values(**values))
+
+
+def add_finished(quiz_id, finished_at, answered, correct):
+    """Tambahkan satu submission selesai ke rollup; ikut transaksi pemanggil."""
+    quiz_id, year, week = _week_key(quiz_id, finished_at)
+    _upsert(quiz_id, year, week, 1, correct or 0, answered or 0)
+
+
+def add_finished_many(rows):
+    """Sama seperti add_finished untuk banyak (quiz_id, finished_at, answered, correct)."""
+    totals = defaultdict(lambda: [0, 0, 0])
+    for quiz_id, finished_at, answered, correct in rows:
+        t = totals[_week_key(quiz_id, finished_at)]
+        t[0] += 1
+        t[1] += correct or 0
+        t[2] += answered or 0
+    for (quiz_id, year, week), (n, correct, answered) in totals.items():
+        _upsert(quiz_id, year, week, n, correct, answered)
+
+
+def remove_answers(rows):
+    """Kurangi jawaban (quiz_id, finished_at, answered, correct) yang soalnya dihapus."""
+    totals = defaultdict(lambda: [0, 0])
+    for quiz_id, finished_at, answered, correct in rows:
+        t = totals[_week_key(quiz_id, finished_at)]
+        t[0] += correct or 0
+        t[1] += answered or 0
+    for (quiz_id, year, week), (correct, answered) in totals.items():
+        _upsert(quiz_id, year, week, 0, -correct, -answered)
+
+
+def rebuild():
+    """Hitung ulang seluruh rollup dari tabel answer. Mengembalikan jumlah baris rollup."""
+    per_submission = (
+        select(
+            Submission.quiz_id,
+            Submission.finished_at,
+            # Jawaban yang soalnya sudah dihapus (question_id NULL) tidak dihitung
+            func.count(Answer.question_id),
+            func.coalesce(func.sum(case((Choice.is_correct == True, 1), else_=0)), 0),
+        )
+        .outerjoin(Answer, Answer.submission_id == Submission.id)
+        .outerjoin(Choice, Choice.id == Answer.choice_id)
+        .where(Submission.finished_at.isnot(None))
+        .group_by(Submission.id, Submission.quiz_id, Submission.finished_at)
+        .execution_options(yield_per=1000)
+    )
+
+    totals = defaultdict(lambda: [0, 0, 0])
+    for quiz_id, finished_at, answered, correct in db.session.execute(per_submission):
+        t = totals[_week_key(quiz_id, finished_at)]
+        t[0] += 1
+        t[1] += correct
+        t[2] += answered
+
+    db.session.execute(WeeklyScoreRollup.__table__.delete())
+    if totals:
+        db.session.execute(WeeklyScoreRollup.__table__.insert(), [
+            {"quiz_id": q, "year": y, "iso_week": w,
+             "submission_count": n, "correct_count": c, "answered_count": a}
+            for (q, y, w), (n, c, a) in totals.items()
+        ])
+    db.session.commit()
+    return len(totals)
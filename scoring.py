@@ -0,0 +1,107 @@
+from datetime import datetime
+
+from sqlalchemy import select
+
+from extensions import db
+from models import Submission, Answer
+import rollup
+
+
+# -----------------------------
+# PENILAIAN INKREMENTAL
+# -----------------------------
+def record_answer(submission, question_id, choice_id, snapshot):
+    """Simpan satu jawaban dan naikkan counter submission di transaksi yang sama.
+
+    Counter dinaikkan lewat ekspresi SQL supaya aman walau baris submission
+    sudah basi di sesi ini. Commit diserahkan ke pemanggil.
+    """
+    db.session.add(Answer(
+        submission_id=submission.id,
+        question_id=question_id,
+        choice_id=choice_id
+    ))
+    submission.answered_count = Submission.answered_count + 1
+    if choice_id in snapshot.correct_choice_ids:
+        submission.correct_count = Submission.correct_count + 1
+
+
+def answered_question_ids(submission_id):
+    """Id soal yang sudah dijawab submission ini, dalam satu query (indeks covering)."""
+    return set(db.session.execute(
+        select(Answer.question_id).where(Answer.submission_id == submission_id)
+    ).scalars())
+
+
+def record_answers_bulk(submission, choice_by_question, snapshot):
+    """Simpan semua jawaban mode batch dengan satu INSERT banyak baris.
+
+    `choice_by_question` berisi {question_id: choice_id} yang sudah divalidasi
+    terhadap snapshot. Mengembalikan jumlah jawaban benar. Commit di pemanggil.
+    """
+    rows = [
+        {"submission_id": submission.id, "question_id": qid, "choice_id": cid}
+        for qid, cid in choice_by_question.items()
+    ]
+    if rows:
+        db.session.execute(Answer.__table__.insert(), rows)
+
+    # Baris submission baru dimuat di request ini, jadi nilai Python aman;
+    # finish_submission mem-flush-nya sebelum menghitung nilai.
+    benar = sum(1 for cid in choice_by_question.values() if cid in snapshot.correct_choice_ids)
+    submission.answered_count = (submission.answered_count or 0) + len(rows)
+    submission.correct_count = (submission.correct_count or 0) + benar
+    return benar
+
+def close_returning(stmt, id_column, *columns):
+    """Jalankan UPDATE penutup submission dan kembalikan baris yang benar-benar berubah.
+
+    Memakai RETURNING bila dialek mendukung; jika tidak, UPDATE dijalankan per
+    id dan hanya baris dengan rowcount 1 yang dibaca ulang.
+    """
+    if db.session.get_bind().dialect.update_returning:
+        return db.session.execute(stmt.returning(id_column, *columns)).all()
+
+    table = id_column.table
+    ids = db.session.execute(
+        select(id_column).where(stmt.whereclause)
+    ).scalars().all()
+    closed = [
+        sid for sid in ids
+        if db.session.execute(stmt.where(id_column == sid)).rowcount == 1
+    ]
+    if not closed:
+        return []
+    return db.session.execute(
+        select(id_column, *columns).where(table.c.id.in_(closed))
+    ).all()
+
+
+def finish_submission(submission, total, finished_at=None):
+    """Tutup submission dan hitung nilai dari counter, tanpa membaca tabel answer.
+
+    Hanya menutup bila finished_at masih kosong (UPDATE bersyarat), jadi
+    double submit atau balapan dengan sweeper tidak menghitung rekap dua kali.
+    Mengembalikan True bila pemanggil ini yang menutup submission.
+    """
+    # Counter yang masih tertunda di sesi (mis. record_answers_bulk) ditulis dulu
+    db.session.flush()
+    finished_at = finished_at or datetime.utcnow()
+    quiz_id = submission.quiz_id
+    sub = Submission.__table__
+    score = sub.c.correct_count * 1.0 / total * 100 if total else 0
+
+    rows = close_returning(
+        sub.update()
+        .where(sub.c.id == submission.id, sub.c.finished_at.is_(None))
+        .values(finished_at=finished_at, score=score),
+        sub.c.id, sub.c.answered_count, sub.c.correct_count
+    )
+    db.session.expire(submission)
+    if not rows:
+        return False
+
+    # Rekap mingguan ikut transaksi yang sama
+    rollup.add_finished(quiz_id, finished_at, rows[0].answered_count, rows[0].correct_count)
+    return True
+
@@ -0,0 +1,137 @@
+import logging
+import os
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+
+# -----------------------------
+# PROFIL SQLITE PRODUKSI (PRAGMA PER KONEKSI)
+# -----------------------------
+def is_sqlite(uri):
+    return uri.startswith("sqlite")
+
+
+def is_memory(uri):
+    return uri in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in uri
+
+
+def engine_options(uri, pool_size=5, max_overflow=5, pool_timeout=10, pool_recycle=3600, busy_timeout_ms=5000):
+    """SQLALCHEMY_ENGINE_OPTIONS sesuai model worker gunicorn.
+
+    Setiap worker punya pool sendiri: pool_size cukup untuk thread request
+    ditambah thread latar (flush jawaban, sweeper, stream SSE). SQLite
+    in-memory dibiarkan memakai pool bawaan SQLAlchemy.
+    """
+    if is_sqlite(uri):
+        if is_memory(uri):
+            return {}
+        return {
+            "pool_size": pool_size,
+            "max_overflow": max_overflow,
+            "pool_timeout": pool_timeout,
+            "pool_recycle": pool_recycle,
+            # timeout driver = busy_timeout, supaya BEGIN juga ikut menunggu
+            "connect_args": {"timeout": busy_timeout_ms / 1000.0},
+        }
+    return {
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": pool_timeout,
+        "pool_recycle": pool_recycle,
+        "pool_pre_ping": True,
+    }
+
+
+def pragmas_from_config(config):
+    """Pragma yang dipasang di setiap koneksi baru, urut sesuai eksekusi."""
+    pragmas = {
+        "journal_mode": config["SQLITE_JOURNAL_MODE"],
+        "synchronous": config["SQLITE_SYNCHRONOUS"],
+        "busy_timeout": config["SQLITE_BUSY_TIMEOUT_MS"],
+        "cache_size": -config["SQLITE_CACHE_SIZE_KB"],  # negatif = KiB
+        "mmap_size": config["SQLITE_MMAP_SIZE"],
+        "temp_store": "MEMORY",
+        "foreign_keys": "ON" if config["SQLITE_FOREIGN_KEYS"] else "OFF",
+    }
+    if pragmas["journal_mode"].upper() == "WAL":
+        pragmas["wal_autocheckpoint"] = config["SQLITE_WAL_AUTOCHECKPOINT"]
+    return pragmas
+
+
+def _apply(dbapi_connection, pragmas):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            if name == "journal_mode":
+                # Mode WAL tersimpan di file database; ganti hanya bila berbeda
+                current = cursor.execute("PRAGMA journal_mode").fetchone()[0]
+                if current.upper() == str(value).upper():
+                    continue
+            cursor.execute("PRAGMA %s = %s" % (name, value))
+    finally:
+        cursor.close()
+
+
+def install(engine, pragmas):
+    """Pasang pragma di setiap koneksi baru dan buang pool warisan setelah fork."""
+    if engine.dialect.name != "sqlite":
+        return False
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        _apply(dbapi_connection, pragmas)
+
+    # Koneksi SQLite tidak boleh dipakai bersama lintas proses: worker hasil
+    # fork (gunicorn --preload) memulai pool baru tanpa menutup milik induknya.
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=lambda: engine.dispose(close=False))
+    return True
+
+
+def check(engine, pragmas):
+    """Baca pragma yang benar-benar berlaku dan tulis ke log.
+
+    Mengembalikan {pragma: nilai}; nilai yang berbeda dari profil dicatat
+    sebagai peringatan (mis. mmap dibatasi build SQLite, atau WAL tidak
+    didukung di filesystem jaringan).
+    """
+    if engine.dialect.name != "sqlite":
+        return {}
+
+    effective = {}
+    with engine.connect() as conn:
+        for name in pragmas:
+            effective[name] = conn.exec_driver_sql("PRAGMA %s" % name).scalar()
+        effective["sqlite_version"] = conn.exec_driver_sql("SELECT sqlite_version()").scalar()
+    # Koneksi pengecekan jangan sampai diwarisi worker hasil fork
+    engine.dispose()
+
+    mismatched = [
+        name for name, wanted in pragmas.items()
+        if not _same(name, wanted, effective.get(name))
+    ]
+    logger.info("Profil SQLite %s: %s", engine.url.database,
+                ", ".join("%s=%s" % item for item in effective.items()))
+    if mismatched:
+        logger.warning("Pragma SQLite tidak sesuai profil: %s", ", ".join(
+            "%s=%s (diminta %s)" % (name, effective.get(name), pragmas[name]) for name in mismatched
+        ))
+    return effective
+
+
+_SYNCHRONOUS = {"OFF": 0, "NORMAL": 1, "FULL": 2, "EXTRA": 3}
+_TEMP_STORE = {"DEFAULT": 0, "FILE": 1, "MEMORY": 2}
+
+
+def _same(name, wanted, actual):
+    if actual is None:
+        return False
+    if name == "synchronous":
+        wanted = _SYNCHRONOUS.get(str(wanted).upper(), wanted)
+    elif name == "temp_store":
+        wanted = _TEMP_STORE.get(str(wanted).upper(), wanted)
+    elif name == "foreign_keys":
+        wanted = 1 if str(wanted).upper() == "ON" else 0
+    return str(wanted).lower() == str(actual).lower()
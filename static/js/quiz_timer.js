@@ -0,0 +1,36 @@
+// Timer quiz: sisa waktu dihitung server (data-remaining, detik).
+// Saat habis, form pada data-form dikirim; jika tidak ada, halaman dimuat
+// ulang dan server yang menutup submission.
+(function(){
+  const timerDiv = document.getElementById('timer');
+  if (!timerDiv || timerDiv.dataset.remaining === undefined) return;
+
+  let remaining = parseInt(timerDiv.dataset.remaining, 10);
+  if (isNaN(remaining)) return;
+  const endAt = Date.now() + remaining * 1000;
+  const form = timerDiv.dataset.form ? document.getElementById(timerDiv.dataset.form) : null;
+
+  function format(sec){
+    const m = Math.floor(sec/60);
+    const s = (sec%60).toString().padStart(2,"0");
+    return `${m}:${s}`;
+  }
+
+  function tick(){
+    remaining = Math.max(0, Math.round((endAt - Date.now()) / 1000));
+    timerDiv.textContent = "⏳ Waktu tersisa: " + format(remaining);
+
+    if(remaining <= 0){
+      clearInterval(interval);
+      alert("Waktu habis!");
+      if (form) {
+        form.submit();
+      } else {
+        window.location.reload();
+      }
+    }
+  }
+
+  const interval = setInterval(tick, 1000);
+  tick();
+})();
@@ -0,0 +1,108 @@
+import os
+import re
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# app.py membuat instance app saat di-import: arahkan ke folder sementara
+_tmp = tempfile.mkdtemp(prefix="quiz-tests-")
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(_tmp, "import.db")
+os.environ["STAMP_DIR"] = os.path.join(_tmp, "stamps")
+os.environ["REPORT_CACHE_DIR"] = os.path.join(_tmp, "reports")
+os.environ["REPORT_SNAPSHOT_PATH"] = os.path.join(_tmp, "report_snapshot.db")
+os.environ["QUIZ_PREWARM"] = "0"
+os.environ["DEADLINE_SWEEP_INTERVAL"] = "0"
+os.environ["REPORT_WORKERS"] = "0"
+
+from werkzeug.security import generate_password_hash  # noqa: E402
+
+import item_analysis  # noqa: E402
+import quiz_cache  # noqa: E402
+from app import create_app  # noqa: E402
+from config import Config  # noqa: E402
+from extensions import db  # noqa: E402
+from models import Choice, Question, Quiz, Role, User  # noqa: E402
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "SQLALCHEMY_DATABASE_URI", "sqlite:///" + str(tmp_path / "test.db"))
+    monkeypatch.setattr(Config, "STAMP_DIR", str(tmp_path / "stamps"))
+    monkeypatch.setattr(Config, "REPORT_CACHE_DIR", str(tmp_path / "reports"))
+    monkeypatch.setattr(Config, "REPORT_SNAPSHOT_PATH", str(tmp_path / "report_snapshot.db"))
+    # Cache modul berlaku per proses; id quiz dipakai ulang antar database test
+    quiz_cache._snapshots.clear()
+    item_analysis._results.clear()
+
+    app = create_app()
+    app.config["TESTING"] = True
+    with app.app_context():
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+def _make_user(app, username, role):
+    with app.app_context():
+        user = User(
+            username=username, email=username + "@test", role=role,
+            password_hash=generate_password_hash("p", method="pbkdf2:sha256:1")
+        )
+        db.session.add(user)
+        db.session.commit()
+        return user.id
+
+
+@pytest.fixture
+def teacher(app):
+    return _make_user(app, "guru", Role.teacher)
+
+
+@pytest.fixture
+def make_student(app):
+    return lambda username: _make_user(app, username, Role.student)
+
+
+@pytest.fixture
+def login(app):
+    def login(user_id):
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session["_user_id"] = str(user_id)
+            session["_fresh"] = True
+        return client
+    return login
+
+
+@pytest.fixture
+def make_quiz(app):
+    """Quiz terbit dengan `n` soal, masing-masing 4 pilihan (pilihan pertama benar)."""
+    def make_quiz(teacher_id, n, code, batch_mode=False, duration=600):
+        with app.app_context():
+            quiz = Quiz(
+                title="Quiz " + code, code=code, created_by=teacher_id, published=True,
+                duration=duration, batch_mode=batch_mode, question_count=n
+            )
+            db.session.add(quiz)
+            db.session.flush()
+            for i in range(n):
+                question = Question(text="Soal %d" % i, quiz_id=quiz.id)
+                db.session.add(question)
+                for k in range(4):
+                    db.session.add(Choice(text="Pilihan %d" % k, is_correct=k == 0, question=question))
+            db.session.commit()
+            return quiz.id
+    return make_quiz
+
+
+def current_question(html):
+    """(question_id, [choice_id, ...]) dari halaman soal satu-satu."""
+    question_id = int(re.search(r'name="question_id" value="(\d+)"', html).group(1))
+    choice_ids = [int(i) for i in re.findall(r'name="choice"\s+id="choice(\d+)"', html)]
+    return question_id, choice_ids
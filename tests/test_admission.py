@@ -0,0 +1,26 @@
+from admission import AdmissionGate
+
+
+def test_limit_is_shared_between_workers(tmp_path):
+    # Dua instance = dua proses worker yang memakai folder lock yang sama
+    worker_a = AdmissionGate(1, 0.05, lock_dir=str(tmp_path))
+    worker_b = AdmissionGate(1, 0.05, lock_dir=str(tmp_path))
+
+    with worker_a.slot() as admitted_a:
+        assert admitted_a
+        with worker_b.slot() as admitted_b:
+            assert not admitted_b
+    with worker_b.slot() as admitted_b:
+        assert admitted_b
+
+    assert worker_b.stats()["rejected"] == 1
+    assert worker_b.stats()["admitted"] == 1
+    assert worker_b.stats()["active"] == 0
+
+
+def test_per_process_limit_without_lock_dir():
+    gate = AdmissionGate(1, 0.05)
+    with gate.slot() as first:
+        with gate.slot() as second:
+            assert first and not second
+    assert gate.stats()["shared"] is False
@@ -0,0 +1,107 @@
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from answer_buffer import AnswerWriteBuffer
+from config import Config
+from extensions import db
+from models import Answer, Question, Submission
+
+
+def _submission(app, quiz_id, user_id):
+    with app.app_context():
+        submission = Submission(quiz_id=quiz_id, user_id=user_id)
+        db.session.add(submission)
+        db.session.commit()
+        question_ids = [q.id for q in Question.query.filter_by(quiz_id=quiz_id).order_by(Question.id)]
+        return submission.id, question_ids
+
+
+def test_permanent_error_drops_only_bad_rows(app, teacher, make_student, make_quiz):
+    sid, question_ids = _submission(app, make_quiz(teacher, 2, "AB1"), make_student("s1"))
+    buffer = AnswerWriteBuffer(app, interval_ms=60000)
+
+    good = buffer.enqueue(sid, question_ids[0], None, True)
+    bad = buffer.enqueue(sid, 999999, None, False)  # soal tidak ada: foreign key gagal
+    buffer.flush()
+
+    assert good.is_set() and bad.is_set()
+    assert buffer.pending_count(sid) == 0
+    stats = buffer.stats()
+    assert stats["errors"] == 1 and stats["dropped"] == 1 and stats["pending"] == 0
+    with app.app_context():
+        assert [a.question_id for a in Answer.query.filter_by(submission_id=sid)] == [question_ids[0]]
+        submission = db.session.get(Submission, sid)
+        assert (submission.answered_count, submission.correct_count) == (1, 1)
+
+    # Buffer tetap jalan untuk jawaban berikutnya
+    buffer.enqueue(sid, question_ids[1], None, False)
+    buffer.flush()
+    assert buffer.stats()["rows"] == 2
+
+
+def test_lock_error_requeues_batch(app, teacher, make_student, make_quiz, monkeypatch):
+    sid, question_ids = _submission(app, make_quiz(teacher, 1, "AB2"), make_student("s1"))
+    buffer = AnswerWriteBuffer(app, interval_ms=60000)
+    done = buffer.enqueue(sid, question_ids[0], None, True)
+
+    def locked(rows):
+        raise OperationalError("INSERT", {}, Exception("database is locked"))
+
+    monkeypatch.setattr(buffer, "_insert", locked)
+    with pytest.raises(OperationalError):
+        buffer.flush()
+    assert not done.is_set()
+    assert buffer.pending_count(sid) == 1 and buffer.stats()["pending"] == 1
+
+    monkeypatch.delattr(buffer, "_insert")
+    buffer.flush()
+    assert done.is_set() and buffer.pending_count(sid) == 0
+
+
+@pytest.fixture
+def write_behind(monkeypatch):
+    # Harus dipasang sebelum fixture `app` membuat app
+    monkeypatch.setattr(Config, "ANSWER_WRITE_BEHIND", True)
+    monkeypatch.setattr(Config, "ANSWER_FLUSH_INTERVAL_MS", 60000)
+
+
+@pytest.mark.usefixtures("write_behind")
+def test_quiz_result_shows_busy_page_while_database_is_locked(app, teacher, make_student, make_quiz, login, monkeypatch):
+    student_id = make_student("s1")
+    sid, question_ids = _submission(app, make_quiz(teacher, 1, "AB3"), student_id)
+    buffer = app.extensions["answer_buffer"]
+
+    def locked(rows):
+        raise OperationalError("INSERT", {}, Exception("database is locked"))
+
+    monkeypatch.setattr(buffer, "_insert", locked)
+    buffer.enqueue(sid, question_ids[0], None, True)
+    r = login(student_id).get(f"/quiz/result/{sid}")
+    assert r.status_code == 503 and r.headers["Retry-After"]
+    assert buffer.pending_count(sid) == 1
+
+
+@pytest.fixture
+def several_workers(monkeypatch):
+    monkeypatch.setattr(Config, "WEB_CONCURRENCY", 2)
+    monkeypatch.setattr(Config, "ANSWER_BUFFER_WAIT", False)
+
+
+@pytest.mark.usefixtures("write_behind", "several_workers")
+def test_buffer_wait_is_forced_with_several_workers(app):
+    assert app.config["ANSWER_BUFFER_WAIT"] is True
+
+
+def test_duplicate_answer_is_written_once(app, teacher, make_student, make_quiz):
+    sid, question_ids = _submission(app, make_quiz(teacher, 1, "AB4"), make_student("s1"))
+    buffer = AnswerWriteBuffer(app, interval_ms=60000)
+    first = buffer.enqueue(sid, question_ids[0], None, True)
+    again = buffer.enqueue(sid, question_ids[0], None, True)
+    buffer.flush()
+
+    assert first.is_set() and again.is_set()
+    assert buffer.stats()["dropped"] == 1
+    with app.app_context():
+        assert Answer.query.filter_by(submission_id=sid).count() == 1
+        submission = db.session.get(Submission, sid)
+        assert (submission.answered_count, submission.correct_count) == (1, 1)
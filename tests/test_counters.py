@@ -0,0 +1,62 @@
+import rollup
+from conftest import current_question
+from counters import repair_counters
+from models import Choice, Submission, WeeklyScoreRollup
+
+
+def _answer_correctly(app, client, url):
+    question_id, _ = current_question(client.get(url).data.decode())
+    with app.app_context():
+        correct = Choice.query.filter_by(question_id=question_id, is_correct=True).one().id
+    assert client.post(url, data={"question_id": question_id, "choice": correct}).status_code == 302
+    return question_id
+
+
+def _rollup_rows():
+    return sorted(
+        (r.quiz_id, r.year, r.iso_week, r.submission_count, r.correct_count, r.answered_count)
+        for r in WeeklyScoreRollup.query
+    )
+
+
+def test_deleting_answered_question_mid_attempt(app, teacher, make_student, make_quiz, login):
+    quiz_id = make_quiz(teacher, 3, "DEL")
+    siswa = login(make_student("s1"))
+    url = siswa.get(f"/quiz/{quiz_id}/start").headers["Location"]
+    answered = [_answer_correctly(app, siswa, url) for _ in range(2)]
+
+    r = login(teacher).post(f"/teacher/question/{answered[0]}/delete")
+    assert r.status_code == 302
+    with app.app_context():
+        submission = Submission.query.filter_by(quiz_id=quiz_id).one()
+        assert (submission.answered_count, submission.correct_count) == (1, 1)
+
+    _answer_correctly(app, siswa, url)
+    assert siswa.get(url).status_code == 302
+
+    with app.app_context():
+        submission = Submission.query.filter_by(quiz_id=quiz_id).one()
+        assert submission.finished_at is not None
+        assert (submission.answered_count, submission.correct_count) == (2, 2)
+        assert submission.score == 100.0
+        # Route dan perintah repair memakai aturan yang sama
+        assert repair_counters()["submission"] == 0
+        incremental = _rollup_rows()
+        rollup.rebuild()
+        assert _rollup_rows() == incremental
+
+
+def test_deleting_question_after_finish_keeps_rollup_in_sync(app, teacher, make_student, make_quiz, login):
+    quiz_id = make_quiz(teacher, 2, "DLF")
+    siswa = login(make_student("s1"))
+    url = siswa.get(f"/quiz/{quiz_id}/start").headers["Location"]
+    answered = [_answer_correctly(app, siswa, url) for _ in range(2)]
+    assert siswa.get(url).status_code == 302
+
+    assert login(teacher).post(f"/teacher/question/{answered[0]}/delete").status_code == 302
+    with app.app_context():
+        assert repair_counters()["submission"] == 0
+        incremental = _rollup_rows()
+        assert incremental[0][4:] == (1, 1)
+        rollup.rebuild()
+        assert _rollup_rows() == incremental
@@ -0,0 +1,117 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import app as app_module
+from conftest import current_question
+from deadline_sweeper import sweep_expired
+from extensions import db
+from models import Answer, Question, Submission, WeeklyScoreRollup
+from scoring import finish_submission
+from write_guard import WriteBusy
+
+
+@pytest.fixture(params=[True, False], ids=["returning", "no-returning"])
+def returning(request, app, monkeypatch):
+    with app.app_context():
+        monkeypatch.setattr(db.engine.dialect, "update_returning", request.param)
+    return request.param
+
+
+def _submission(quiz_id, user_id, **values):
+    submission = Submission(quiz_id=quiz_id, user_id=user_id, answered_count=2, correct_count=1, **values)
+    db.session.add(submission)
+    db.session.commit()
+    return submission
+
+
+def _rollup_submissions(quiz_id):
+    return sum(r.submission_count for r in WeeklyScoreRollup.query.filter_by(quiz_id=quiz_id))
+
+
+def test_finish_is_idempotent(app, teacher, make_student, make_quiz, returning):
+    quiz_id = make_quiz(teacher, 2, "FIN")
+    student_id = make_student("s1")
+    with app.app_context():
+        submission = _submission(quiz_id, student_id)
+        assert finish_submission(submission, 2)
+        db.session.commit()
+        assert not finish_submission(submission, 2)
+        db.session.commit()
+
+        assert submission.score == 50.0 and submission.finished_at is not None
+        assert _rollup_submissions(quiz_id) == 1
+
+
+def test_sweeper_counts_only_rows_it_closed(app, teacher, make_student, make_quiz, returning):
+    quiz_id = make_quiz(teacher, 2, "SWP")
+    past = datetime.utcnow() - timedelta(hours=1)
+    with app.app_context():
+        expired = _submission(quiz_id, make_student("s1"), deadline_at=past)
+        done = _submission(quiz_id, make_student("s2"), deadline_at=past)
+        assert finish_submission(done, 2, finished_at=past)
+        db.session.commit()
+
+        assert sweep_expired() == [expired.id]
+        assert sweep_expired() == []
+        assert _rollup_submissions(quiz_id) == 2
+        assert db.session.get(Submission, expired.id).score == 50.0
+
+
+def _batch_attempt(app, teacher, make_student, make_quiz, login):
+    quiz_id = make_quiz(teacher, 2, "BAT", batch_mode=True)
+    siswa = login(make_student("s1"))
+    r = siswa.get(f"/quiz/{quiz_id}/start")
+    submission_id = int(r.headers["Location"].rsplit("/", 1)[1])
+    with app.app_context():
+        answers = {
+            f"answer_{q.id}": q.choices[0].id
+            for q in Question.query.filter_by(quiz_id=quiz_id)
+        }
+    return quiz_id, siswa, submission_id, answers
+
+
+def test_batch_submit_twice_keeps_one_set_of_answers(app, teacher, make_student, make_quiz, login):
+    quiz_id, siswa, submission_id, answers = _batch_attempt(app, teacher, make_student, make_quiz, login)
+    assert siswa.post(f"/quiz/submit/{submission_id}", data=answers).status_code == 302
+    assert siswa.post(f"/quiz/submit/{submission_id}", data=answers).status_code == 302
+
+    with app.app_context():
+        assert Answer.query.filter_by(submission_id=submission_id).count() == 2
+        assert db.session.get(Submission, submission_id).score == 100.0
+        assert _rollup_submissions(quiz_id) == 1
+
+
+def test_batch_submit_keeps_answers_when_database_is_busy(app, teacher, make_student, make_quiz, login, monkeypatch):
+    quiz_id, siswa, submission_id, answers = _batch_attempt(app, teacher, make_student, make_quiz, login)
+
+    def busy(work):
+        raise WriteBusy("database is locked")
+
+    monkeypatch.setattr(app.extensions["writes"], "run", busy)
+    r = siswa.post(f"/quiz/submit/{submission_id}", data=answers)
+    assert r.status_code == 503
+    html = r.data.decode()
+    for name, choice_id in answers.items():
+        assert f'name="{name}" value="{choice_id}"' in html
+
+    with app.app_context():
+        assert Answer.query.filter_by(submission_id=submission_id).count() == 0
+        assert db.session.get(Submission, submission_id).finished_at is None
+
+
+def test_concurrent_answer_to_same_question_counts_once(app, teacher, make_student, make_quiz, login, monkeypatch):
+    quiz_id = make_quiz(teacher, 2, "DUP")
+    siswa = login(make_student("s1"))
+    url = siswa.get(f"/quiz/{quiz_id}/start").headers["Location"]
+    question_id, choice_ids = current_question(siswa.get(url).data.decode())
+    assert siswa.post(url, data={"question_id": question_id, "choice": choice_ids[0]}).status_code == 302
+
+    # Request kedua membaca daftar jawaban sebelum request pertama commit
+    monkeypatch.setattr(app_module, "answered_question_ids", lambda submission_id: set())
+    assert siswa.post(url, data={"question_id": question_id, "choice": choice_ids[0]}).status_code == 302
+
+    with app.app_context():
+        submission = Submission.query.filter_by(quiz_id=quiz_id).one()
+        assert Answer.query.filter_by(submission_id=submission.id).count() == 1
+        assert submission.answered_count == 1
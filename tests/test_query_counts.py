@@ -0,0 +1,95 @@
+from datetime import datetime
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from conftest import current_question
+from extensions import db
+from models import Answer, Choice, Question, Submission
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args):
+        self.count += 1
+
+    def __enter__(self):
+        event.listen(Engine, "before_cursor_execute", self)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(Engine, "before_cursor_execute", self)
+
+
+def count_queries(client, method, url, **kwargs):
+    with QueryCounter() as counter:
+        r = getattr(client, method)(url, **kwargs)
+    assert r.status_code in (200, 302), (url, r.status_code)
+    return counter.count
+
+
+def _finished_attempts(app, quiz_id, student_ids):
+    """Submission selesai dengan semua soal dijawab (pilihan pertama)."""
+    with app.app_context():
+        questions = Question.query.filter_by(quiz_id=quiz_id).all()
+        for user_id in student_ids:
+            submission = Submission(
+                quiz_id=quiz_id, user_id=user_id, finished_at=datetime.utcnow(),
+                answered_count=len(questions), correct_count=len(questions), score=100.0
+            )
+            db.session.add(submission)
+            db.session.flush()
+            for q in questions:
+                choice = Choice.query.filter_by(question_id=q.id).order_by(Choice.id).first()
+                db.session.add(Answer(submission_id=submission.id, question_id=q.id, choice_id=choice.id))
+        db.session.commit()
+
+
+def test_quiz_results_query_count_is_constant(app, teacher, make_student, make_quiz, login):
+    small = make_quiz(teacher, 3, "SML")
+    large = make_quiz(teacher, 12, "LRG")
+    _finished_attempts(app, small, [make_student("a%d" % i) for i in range(2)])
+    _finished_attempts(app, large, [make_student("b%d" % i) for i in range(8)])
+    guru = login(teacher)
+
+    counts = []
+    for quiz_id in (small, large):
+        url = f"/teacher/quiz/{quiz_id}/results"
+        guru.get(url)  # pemanasan cache
+        counts.append(count_queries(guru, "get", url))
+    assert counts[0] == counts[1]
+
+
+def _answer_some(client, url, n):
+    for _ in range(n):
+        question_id, choice_ids = current_question(client.get(url).data.decode())
+        client.post(url, data={"question_id": question_id, "choice": choice_ids[0]})
+
+
+def test_do_question_query_count_does_not_grow(app, teacher, make_student, make_quiz, login):
+    counts = []
+    for i, (n_questions, answered) in enumerate([(3, 1), (12, 9)]):
+        quiz_id = make_quiz(teacher, n_questions, "DQ%d" % i)
+        siswa = login(make_student("s%d" % i))
+        url = siswa.get(f"/quiz/{quiz_id}/start").headers["Location"]
+        _answer_some(siswa, url, answered)
+
+        get_count = count_queries(siswa, "get", url)
+        question_id, choice_ids = current_question(siswa.get(url).data.decode())
+        post_count = count_queries(siswa, "post", url, data={"question_id": question_id, "choice": choice_ids[0]})
+        counts.append((get_count, post_count))
+    assert counts[0] == counts[1]
+
+
+def test_student_dashboard_query_count_does_not_grow(app, teacher, make_student, make_quiz, login):
+    counts = []
+    for i, n_questions in enumerate([2, 15]):
+        quiz_id = make_quiz(teacher, n_questions, "SD%d" % i)
+        student_id = make_student("s%d" % i)
+        _finished_attempts(app, quiz_id, [student_id])
+        siswa = login(student_id)
+        siswa.get("/student/dashboard")  # pemanasan leaderboard
+        counts.append(count_queries(siswa, "get", "/student/dashboard"))
+    assert counts[0] == counts[1]
@@ -0,0 +1,51 @@
+from conftest import current_question
+from models import Answer, Submission
+from quiz_cache import QuestionSnap, QuizSnapshot, question_order
+
+
+def _snapshot(ids):
+    return QuizSnapshot(1, 0, [QuestionSnap(i, "", None, (), frozenset()) for i in ids])
+
+
+def test_order_is_stable_when_questions_change():
+    seed = 424242
+    before = question_order(_snapshot(range(1, 11)), seed)
+    added = question_order(_snapshot(range(1, 12)), seed)
+    removed = question_order(_snapshot([i for i in range(1, 11) if i != 4]), seed)
+
+    assert [q for q in added if q != 11] == before
+    assert removed == [q for q in before if q != 4]
+
+
+def test_question_added_mid_attempt_is_not_skipped_or_repeated(app, teacher, make_student, make_quiz, login):
+    quiz_id = make_quiz(teacher, 3, "ORD")
+    siswa = login(make_student("s1"))
+    guru = login(teacher)
+
+    r = siswa.get(f"/quiz/{quiz_id}/start")
+    url = r.headers["Location"]
+    html = siswa.get(url).data.decode()
+    question_id, choice_ids = current_question(html)
+    siswa.post(url, data={"question_id": question_id, "choice": choice_ids[0]})
+
+    r = guru.post(f"/quiz/{quiz_id}/add_question", data={
+        "question": "Soal baru", "option_a": "a", "option_b": "b",
+        "option_c": "c", "option_d": "d", "correct_answer": "A",
+    })
+    assert r.status_code == 302
+
+    seen = [question_id]
+    while True:
+        r = siswa.get(url)
+        if r.status_code == 302:
+            break
+        question_id, choice_ids = current_question(r.data.decode())
+        assert question_id not in seen
+        seen.append(question_id)
+        siswa.post(url, data={"question_id": question_id, "choice": choice_ids[0]})
+
+    with app.app_context():
+        submission = Submission.query.filter_by(quiz_id=quiz_id).one()
+        answered = [a.question_id for a in Answer.query.filter_by(submission_id=submission.id)]
+        assert sorted(answered) == sorted(seen) and len(seen) == 4
+        assert submission.answered_count == 4 and submission.finished_at is not None
@@ -0,0 +1,76 @@
+from datetime import datetime
+
+import pytest
+
+from config import Config
+from extensions import db
+from models import Answer, Question, Quiz, Submission
+from quiz_cache import get_snapshot
+
+
+@pytest.fixture
+def routing(monkeypatch):
+    # Routing laporan opt-in; harus dipasang sebelum fixture `app` membuat app
+    monkeypatch.setattr(Config, "REPORT_READ_ROUTING", True)
+
+
+def test_read_routing_is_opt_in(app):
+    assert app.extensions["read_router"].stats()["mode"] == "primary"
+
+
+@pytest.mark.usefixtures("routing")
+def test_item_analysis_does_not_cache_stale_answer_key(app, teacher, make_quiz, login):
+    quiz_id = make_quiz(teacher, 2, "RR1")
+    reads = app.extensions["read_router"]
+    # Salinan laporan dibuat sebelum kunci jawaban diubah
+    reads.refresh_snapshot()
+
+    guru = login(teacher)
+    with app.app_context():
+        question = Question.query.filter_by(quiz_id=quiz_id).order_by(Question.id).first()
+        question_id = question.id
+    r = guru.post(f"/teacher/question/{question_id}/edit", data={
+        "question": "Soal 0", "option_a": "a", "option_b": "b",
+        "option_c": "c", "option_d": "d", "correct_answer": "b",
+    })
+    assert r.status_code == 302
+
+    r = guru.get(f"/teacher/quiz/{quiz_id}/item-analysis")
+    assert r.status_code == 200
+    assert reads.stats()["reads_routed"] >= 1
+
+    with app.app_context():
+        quiz = db.session.get(Quiz, quiz_id)
+        expected = {
+            c.id for q in Question.query.filter_by(quiz_id=quiz_id) for c in q.choices if c.is_correct
+        }
+        assert get_snapshot(quiz).correct_choice_ids == expected
+
+
+@pytest.mark.usefixtures("routing")
+def test_quiz_results_reads_total_and_answers_from_the_same_source(app, teacher, make_student, make_quiz, login):
+    quiz_id = make_quiz(teacher, 2, "RR2")
+    student_id = make_student("s1")
+    with app.app_context():
+        submission = Submission(
+            quiz_id=quiz_id, user_id=student_id, answered_count=2, correct_count=2,
+            score=100.0, finished_at=datetime.utcnow()
+        )
+        db.session.add(submission)
+        db.session.flush()
+        for question in Question.query.filter_by(quiz_id=quiz_id):
+            db.session.add(Answer(
+                submission_id=submission.id, question_id=question.id, choice_id=question.choices[0].id
+            ))
+        db.session.commit()
+    reads = app.extensions["read_router"]
+    reads.refresh_snapshot()
+
+    # Soal baru hanya ada di database utama, belum di snapshot
+    guru = login(teacher)
+    guru.post(f"/quiz/{quiz_id}/add_question", data={
+        "question": "Soal baru", "option_a": "a", "option_b": "b",
+        "option_c": "c", "option_d": "d", "correct_answer": "A",
+    })
+    html = guru.get(f"/teacher/quiz/{quiz_id}/results").data.decode()
+    assert "100.00" in html
@@ -0,0 +1,141 @@
+import io
+import os
+import time
+import zipfile
+
+import pytest
+
+import reports
+from reports import ReportFailed, ReportService
+
+
+def _payload(title):
+    return {"title": title, "rows": [["siswa", "100.00", "-"]]}
+
+
+def test_render_error_is_counted_and_reported(app, teacher, make_quiz, login, monkeypatch):
+    quiz_id = make_quiz(teacher, 1, "PDF")
+
+    def broken(payload):
+        raise ValueError("builder rusak")
+
+    monkeypatch.setitem(reports.BUILDERS, "quiz_result", broken)
+    guru = login(teacher)
+    r = guru.get(f"/teacher/quiz/{quiz_id}/download")
+    assert r.status_code == 302
+    assert r.headers["Location"].endswith(f"/teacher/quiz/{quiz_id}/results")
+    assert guru.get("/teacher/metrics").json["reports"]["errors"] == 1
+
+    service = ReportService(app.config["REPORT_CACHE_DIR"], workers=0)
+    with pytest.raises(ReportFailed):
+        service.get("quiz_result", quiz_id, _payload("A"))
+    assert service.stats()["errors"] == 1
+
+
+def test_prune_keeps_recently_served_versions(tmp_path):
+    service = ReportService(str(tmp_path), workers=0, keep=60)
+    first = service.get("quiz_result", 1, _payload("A"))
+    # Versi lama yang baru saja dikirim ke request lain tidak ikut dihapus
+    second = service.get("quiz_result", 1, _payload("B"))
+    assert os.path.exists(first) and os.path.exists(second)
+
+    stale = time.time() - 120
+    os.utime(first, (stale, stale))
+    os.utime(second, (stale, stale))
+    assert service.get("quiz_result", 1, _payload("B")) == second  # cache hit menyentuh mtime
+    service.get("quiz_result", 1, _payload("C"))
+    assert not os.path.exists(first)
+    assert os.path.exists(second)
+
+
+def test_export_job_is_visible_from_another_worker(tmp_path, monkeypatch):
+    # Dua instance = dua worker gunicorn dengan folder cache yang sama
+    starter = ReportService(str(tmp_path), workers=0)
+    other = ReportService(str(tmp_path), workers=0)
+    job = starter.start_export([
+        ("a.pdf", "quiz_result", 1, _payload("A")),
+        ("b.pdf", "quiz_result", 2, _payload("B")),
+    ])
+
+    remote = other.get_export(job.id)
+    assert remote is not None
+    assert remote.status()["done"] == 2 and remote.status()["finished"]
+    assert b"".join(remote.iter_zip()).startswith(b"PK")
+    assert job.status()["streamed"] == 2
+
+    remote.cancel()
+    assert starter.get_export(job.id).status()["cancelled"]
+    assert other.get_export("../" + job.id) is None
+
+    monkeypatch.setattr(reports.time, "time", lambda: job.expires + 1)
+    assert other.get_export(job.id) is None
+
+
+def test_failed_render_is_reported_to_other_workers(tmp_path, monkeypatch):
+    def broken(payload):
+        raise ValueError("builder rusak")
+
+    monkeypatch.setitem(reports.BUILDERS, "quiz_result", broken)
+    starter = ReportService(str(tmp_path), workers=1)
+    other = ReportService(str(tmp_path), workers=0)
+    job = starter.start_export([("a.pdf", "quiz_result", 1, _payload("A"))])
+
+    deadline = time.time() + 10
+    while not other.get_export(job.id).status()["finished"] and time.time() < deadline:
+        time.sleep(0.05)
+    assert other.get_export(job.id).status()["failed"] == 1
+    starter._executor.shutdown()
+
+
+def test_export_routes(app, teacher, make_student, make_quiz, login):
+    make_quiz(teacher, 1, "EXP")
+    make_student("s1")
+    guru = login(teacher)
+    r = guru.post("/teacher/students/export")
+    assert r.status_code == 302
+    status_url = r.headers["Location"]
+    assert guru.get(status_url + "?format=json").json["done"] == 1
+    r = guru.get(status_url + "/download")
+    assert r.status_code == 200 and r.data.startswith(b"PK")
+    assert guru.get("/teacher/exports/" + "0" * 32).status_code == 404
+
+
+def test_cancel_part_way_breaks_the_download(tmp_path):
+    starter = ReportService(str(tmp_path), workers=0)
+    other = ReportService(str(tmp_path), workers=0)
+    job = starter.start_export([
+        ("a.pdf", "quiz_result", 1, _payload("A")),
+        ("b.pdf", "quiz_result", 2, _payload("B")),
+    ])
+
+    stream = other.get_export(job.id).iter_zip()
+    first = next(stream)
+    assert first.startswith(b"PK")
+    job.cancel()
+    with pytest.raises(ReportFailed):
+        next(stream)
+    assert other.get_export(job.id).status()["streamed"] == 1
+
+
+def test_expired_job_breaks_the_download(tmp_path, monkeypatch):
+    service = ReportService(str(tmp_path), workers=0)
+    job = service.start_export([("a.pdf", "quiz_result", 1, _payload("A"))])
+    # Render masih berjalan di worker yang sudah mati
+    os.remove(job.items[0][1])
+    monkeypatch.setattr(reports.time, "time", lambda: job.expires + 1)
+    with pytest.raises(ReportFailed):
+        b"".join(job.iter_zip())
+
+
+def test_failed_renders_are_listed_in_the_zip(tmp_path):
+    service = ReportService(str(tmp_path), workers=0)
+    job = service.start_export([("a.pdf", "quiz_result", 1, _payload("A"))])
+    broken = os.path.join(str(tmp_path), "quiz_result_2-rusak.pdf")
+    with open(broken + ".err", "w") as f:
+        f.write("builder rusak")
+    job.items.append(("b.pdf", broken))
+
+    data = b"".join(job.iter_zip())
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        assert zf.namelist() == ["a.pdf", "GAGAL.txt"]
+        assert "b.pdf" in zf.read("GAGAL.txt").decode()
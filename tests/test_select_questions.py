@@ -0,0 +1,64 @@
+from conftest import current_question
+from extensions import db
+from models import Answer, Question, Quiz, Submission
+from quiz_cache import get_snapshot
+
+
+def test_moving_questions_bumps_source_quiz(app, teacher, make_quiz, login):
+    target_id = make_quiz(teacher, 1, "DST")
+    source_id = make_quiz(teacher, 2, "SRC")
+    with app.app_context():
+        source = db.session.get(Quiz, source_id)
+        # Snapshot quiz asal sudah ter-cache sebelum soalnya dipindah
+        assert len(get_snapshot(source).questions) == 2
+        version = source.version or 0
+        moved = Question.query.filter_by(quiz_id=source_id).order_by(Question.id).first().id
+
+    r = login(teacher).post(f"/quiz_select_questions/{target_id}", data={"question_ids": [moved]})
+    assert r.status_code == 302
+
+    with app.app_context():
+        source = db.session.get(Quiz, source_id)
+        assert source.version == version + 1
+        assert [q.id for q in get_snapshot(source).questions] == [
+            q.id for q in Question.query.filter_by(quiz_id=source_id)
+        ]
+        assert moved not in {q.id for q in get_snapshot(source).questions}
+
+
+def test_deselecting_an_answered_question(app, teacher, make_student, make_quiz, login):
+    quiz_id = make_quiz(teacher, 2, "DSL")
+    siswa = login(make_student("s1"))
+    url = siswa.get(f"/quiz/{quiz_id}/start").headers["Location"]
+    question_id, choice_ids = current_question(siswa.get(url).data.decode())
+    siswa.post(url, data={"question_id": question_id, "choice": choice_ids[0]})
+
+    with app.app_context():
+        kept = Question.query.filter(Question.quiz_id == quiz_id, Question.id != question_id).one().id
+    r = login(teacher).post(f"/quiz_select_questions/{quiz_id}", data={"question_ids": [kept]})
+    assert r.status_code == 302
+
+    with app.app_context():
+        assert [q.id for q in Question.query.filter_by(quiz_id=quiz_id)] == [kept]
+        answer = Answer.query.one()
+        assert answer.question_id is None and answer.choice_id is None
+        assert db.session.get(Submission, answer.submission_id).answered_count == 0
+        assert db.session.get(Quiz, quiz_id).question_count == 1
+
+
+def test_deleting_quiz_whose_question_was_answered_elsewhere(app, teacher, make_student, make_quiz, login):
+    source_id = make_quiz(teacher, 1, "OLD")
+    siswa = login(make_student("s1"))
+    url = siswa.get(f"/quiz/{source_id}/start").headers["Location"]
+    question_id, choice_ids = current_question(siswa.get(url).data.decode())
+    siswa.post(url, data={"question_id": question_id, "choice": choice_ids[0]})
+
+    # Soal yang sudah dijawab dipindah ke quiz lain, lalu quiz itu dihapus
+    target_id = make_quiz(teacher, 0, "NEW")
+    guru = login(teacher)
+    guru.post(f"/quiz_select_questions/{target_id}", data={"question_ids": [question_id]})
+    assert guru.post(f"/teacher/quiz/{target_id}/delete").status_code == 302
+
+    with app.app_context():
+        assert db.session.get(Quiz, target_id) is None
+        assert Answer.query.one().question_id is None
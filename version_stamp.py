@@ -0,0 +1,30 @@
+import os
+import uuid
+
+
+# -----------------------------
+# PENANDA VERSI LINTAS WORKER
+# -----------------------------
+class VersionStamp:
+    """Penanda versi berbasis file untuk semua worker di satu host.
+
+    bump() mengganti file secara atomik; current() hanya os.stat, jadi cek
+    versi tidak perlu round trip ke database.
+    """
+
+    def __init__(self, directory, name):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, name)
+
+    def current(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns)
+
+    def bump(self):
+        tmp = "%s.%s.tmp" % (self.path, uuid.uuid4().hex)
+        with open(tmp, "w") as f:
+            f.write(uuid.uuid4().hex)
+        os.replace(tmp, self.path)
@@ -0,0 +1,147 @@
+import os
+import random
+import time
+from contextlib import contextmanager
+from threading import Lock
+
+from sqlalchemy.exc import OperationalError
+
+from extensions import db
+
+try:
+    import fcntl
+except ImportError:  # Windows (development)
+    fcntl = None
+
+
+class WriteBusy(Exception):
+    """Database tetap terkunci sampai batas percobaan/waktu habis."""
+
+
+_LOCK_ERRORS = ("database is locked", "database table is locked", "database is busy")
+
+
+def is_lock_error(exc):
+    orig = getattr(exc, "orig", exc)
+    if getattr(orig, "sqlite_errorname", "").startswith(("SQLITE_BUSY", "SQLITE_LOCKED")):
+        return True
+    return any(text in str(orig).lower() for text in _LOCK_ERRORS)
+
+
+# -----------------------------
+# KOORDINASI TULIS (RETRY + SATU PENULIS)
+# -----------------------------
+class WriteCoordinator:
+    """Jalankan satu unit tulis + commit, ulangi bila SQLite terkunci.
+
+    busy_timeout tidak menolong bila transaksi yang sudah membaca lalu
+    menulis kalah dari penulis lain (SQLITE_BUSY_SNAPSHOT di WAL): error
+    langsung muncul. Di sini sesi di-rollback, lalu `work()` dijalankan ulang
+    setelah backoff eksponensial ber-jitter, sampai `attempts` kali atau
+    `max_wait` detik. Dengan `single_writer`, setiap unit tulis memegang lock
+    (thread + lock file) sehingga semua worker menulis bergantian.
+    """
+
+    def __init__(self, attempts=6, base_ms=20, max_ms=500, max_wait=8, single_writer=False, lock_path=None):
+        self.attempts = max(1, attempts)
+        self.base = base_ms / 1000.0
+        self.cap = max_ms / 1000.0
+        self.max_wait = max_wait
+        self.single_writer = single_writer and lock_path is not None
+        self.lock_path = lock_path
+        if self.single_writer:
+            os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+        self._thread_lock = Lock()
+        self._stats_lock = Lock()
+        self._stats = {
+            "writes": 0,
+            "retries": 0,
+            "gave_up": 0,
+            "lock_timeouts": 0,
+            "max_attempts_used": 0,
+            "backoff_ms": 0.0,
+            "lock_wait_ms": 0.0,
+            "max_lock_wait_ms": 0.0,
+        }
+
+    def run(self, work):
+        """`work()` menyiapkan perubahan di db.session; commit dilakukan di sini.
+
+        Mengembalikan hasil `work()`. Melempar WriteBusy bila tetap terkunci.
+        """
+        deadline = time.monotonic() + self.max_wait
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                with self._writer(deadline):
+                    result = work()
+                    db.session.commit()
+            except OperationalError as e:
+                db.session.rollback()
+                if not is_lock_error(e):
+                    raise
+                delay = random.uniform(0, min(self.cap, self.base * (2 ** (attempt - 1))))
+                if attempt >= self.attempts or time.monotonic() + delay >= deadline:
+                    self._count(attempt, gave_up=1)
+                    raise WriteBusy(str(e.orig)) from e
+                self._count(retries=1, backoff_ms=delay * 1000)
+                time.sleep(delay)
+            except Exception:
+                db.session.rollback()
+                raise
+            else:
+                self._count(attempt, writes=1)
+                return result
+
+    def stats(self):
+        with self._stats_lock:
+            data = dict(self._stats)
+        data["single_writer"] = self.single_writer
+        data["lock_wait_ms"] = round(data["lock_wait_ms"], 3)
+        data["max_lock_wait_ms"] = round(data["max_lock_wait_ms"], 3)
+        data["backoff_ms"] = round(data["backoff_ms"], 3)
+        return data
+
+    def _count(self, attempt=0, **deltas):
+        with self._stats_lock:
+            for key, value in deltas.items():
+                self._stats[key] += value
+            if attempt > self._stats["max_attempts_used"]:
+                self._stats["max_attempts_used"] = attempt
+
+    def _wait_ms(self, waited):
+        with self._stats_lock:
+            self._stats["lock_wait_ms"] += waited
+            if waited > self._stats["max_lock_wait_ms"]:
+                self._stats["max_lock_wait_ms"] = waited
+
+    @contextmanager
+    def _writer(self, deadline):
+        if not self.single_writer:
+            yield
+            return
+
+        started = time.perf_counter()
+        if not self._thread_lock.acquire(timeout=max(0, deadline - time.monotonic())):
+            self._wait_ms((time.perf_counter() - started) * 1000)
+            self._count(lock_timeouts=1)
+            raise WriteBusy("lock penulis tunggal tidak didapat")
+        try:
+            with open(self.lock_path, "a") as lock_file:
+                if fcntl is not None:
+                    while True:
+                        try:
+                            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                            break
+                        except OSError:
+                            if time.monotonic() >= deadline:
+                                self._wait_ms((time.perf_counter() - started) * 1000)
+                                self._count(lock_timeouts=1)
+                                raise WriteBusy("lock penulis tunggal tidak didapat")
+                            time.sleep(0.002)
+                self._wait_ms((time.perf_counter() - started) * 1000)
+                # flock dilepas otomatis saat file ditutup
+                yield
+        finally:
+            self._thread_lock.release()